@@ -0,0 +1,108 @@
+"""
+Compara filas/s del camino DRF (ModelSerializer + JSONRenderer) frente al
+camino rápido (values_list + orjson) y verifica que los bytes sean idénticos.
+
+Uso (desde el directorio Django/):
+    python -m benchmarks.bench_serializers --rows 20000 --repeat 5
+"""
+import argparse
+import datetime
+import os
+import random
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "genomics.settings")
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from genes.models import Gene  # noqa: E402
+from genes.serializers import GeneSerializer  # noqa: E402
+from genomics.fastpath import FastSerializer  # noqa: E402
+from reports.models import PatientVariantReport  # noqa: E402
+from reports.serializers import ReportSerializer  # noqa: E402
+from variants.models import GeneticVariant  # noqa: E402
+from variants.serializers import VariantSerializer  # noqa: E402
+
+
+def seed(rows):
+    genes = Gene.objects.bulk_create(
+        Gene(symbol=f"G{i}", fullName=f"Gene {i}", functionSummary="Función sintética")
+        for i in range(max(rows // 100, 1))
+    )
+    variants = GeneticVariant.objects.bulk_create(
+        (
+            GeneticVariant(
+                gene=random.choice(genes), chromosome=str(random.randint(1, 22)),
+                position=random.randint(1, 250_000_000), referenceBase="A",
+                alternateBase="T", impact=random.choice(["HIGH", "MODERATE", "LOW"]),
+            )
+            for _ in range(rows)
+        ),
+        batch_size=5000,
+    )
+    PatientVariantReport.objects.bulk_create(
+        (
+            PatientVariantReport(
+                patientId=f"P-{random.randint(1, rows)}", variant=random.choice(variants),
+                detectionDate=datetime.date(2024, 1, 1) + datetime.timedelta(days=random.randint(0, 365)),
+                alleleFrequency=f"{random.random():.3f}",
+            )
+            for _ in range(rows)
+        ),
+        batch_size=5000,
+    )
+
+
+def best_of(repeat, func):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(repeat):
+    renderer = JSONRenderer()
+    cases = [
+        ("genes", Gene.objects.all(), GeneSerializer),
+        ("variants", GeneticVariant.objects.all(), VariantSerializer),
+        ("reports", PatientVariantReport.objects.all(), ReportSerializer),
+    ]
+    for name, queryset, serializer_class in cases:
+        count = queryset.count()
+        fast = FastSerializer(serializer_class)
+        drf_time, drf_bytes = best_of(
+            repeat, lambda: renderer.render(serializer_class(queryset.all(), many=True).data)
+        )
+        fast_time, fast_bytes = best_of(repeat, lambda: fast.dumps(fast.rows(queryset.all())))
+        identical = "sí" if drf_bytes == fast_bytes else "NO"
+        print(
+            f"{name:<9} {count:>8} filas  DRF {count / drf_time:>10.0f} filas/s  "
+            f"rápido {count / fast_time:>10.0f} filas/s  x{drf_time / fast_time:.1f}  "
+            f"bytes idénticos: {identical}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000,
+                        help="Filas sintéticas a generar (0 usa los datos existentes)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Los datos sintéticos se descartan al terminar
+    with transaction.atomic():
+        if args.rows:
+            seed(args.rows)
+        run(args.repeat)
+        transaction.set_rollback(True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compara dos resultados de benchmarks.loadtest escenario por escenario.
+
+Uso (desde el directorio Django/):
+    python -m benchmarks.compare antes.json despues.json
+"""
+import argparse
+import json
+
+
+def load(path):
+    with open(path) as file:
+        report = json.load(file)
+    return report, {scenario["name"]: scenario for scenario in report["scenarios"]}
+
+
+def ratio(before, after):
+    if not before or after is None:
+        return "      -"
+    return f"{after / before:>6.2f}x"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    before_report, before = load(args.before)
+    after_report, after = load(args.after)
+    for name, report in (("antes", before_report), ("después", after_report)):
+        environment = report["environment"]
+        print(f"{name}: {report['label'] or '-'}  commit {environment['commit']}  "
+              f"{environment['database']}  {report['dataset']}")
+
+    print(f"\n{'escenario':<28} {'req/s':>27}  {'p50 ms':>27}  {'p99 ms':>27}  {'RSS MB':>16}")
+    for name in [name for name in before if name in after]:
+        old, new = before[name], after[name]
+        columns = []
+        for get in (
+            lambda s: s["throughput_rps"],
+            lambda s: s["latency_ms"]["p50"],
+            lambda s: s["latency_ms"]["p99"],
+        ):
+            columns.append(f"{get(old) or 0:>8.1f} → {get(new) or 0:>8.1f} {ratio(get(old), get(new))}")
+        rss = f"{old['peak_rss_mb'] or 0:>6.0f} → {new['peak_rss_mb'] or 0:>6.0f}"
+        errors = "" if not (old["errors"] or new["errors"]) else f"  errores {old['errors']} → {new['errors']}"
+        print(f"{name:<28} {'  '.join(columns)}  {rss}{errors}")
+
+    missing = sorted(set(before) ^ set(after))
+    if missing:
+        print(f"\nEscenarios solo en uno de los archivos: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
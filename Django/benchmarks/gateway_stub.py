@@ -0,0 +1,65 @@
+"""
+Stub local del gateway de Clínica para las pruebas de carga. Responde 200 a
+cualquier documento salvo los que contienen "missing" (404), con una latencia
+fija configurable.
+
+Uso independiente (p. ej. para un servidor levantado aparte):
+    python -m benchmarks.gateway_stub --port 3000 --latency 0.02
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PATIENT_PATH = "/api/v1/clinica/gestion-pacientes/searchPatient?document="
+
+
+class GatewayStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        found = "missing" not in self.path
+        body = b'{"found":true}' if found else b'{"error":"Paciente no encontrado"}'
+        self.send_response(200 if found else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.0):
+    handler = type("Handler", (GatewayStubHandler,), {"latency": latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start(latency=0.0):
+    # Arranca en un hilo y devuelve (servidor, URL base de búsqueda de pacientes)
+    server = make_server(latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}{PATIENT_PATH}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos por respuesta")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency)
+    print(f"Gateway stub en http://{args.host}:{args.port}{PATIENT_PATH}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Prueba de carga reproducible de todos los endpoints de genomics/urls.py.
+
+Levanta la API en un servidor WSGI embebido (o usa --base-url), apunta el
+gateway de Clínica a un stub local y, por escenario, mide latencia p50/p95/p99,
+throughput y pico de RSS. El resultado se guarda en JSON para compararlo con
+benchmarks.compare.
+
+Uso (desde el directorio Django/, con datos de benchmarks.seed):
+    BENCH_SQLITE=/tmp/bench.sqlite3 python -m benchmarks.loadtest --output antes.json
+    python -m benchmarks.loadtest --concurrency 16 --duration 30 --heavy --output despues.json
+
+Los escenarios "pesados" (listados completos y exportaciones de tablas
+grandes) solo se ejecutan con --heavy. No se lanzan PUT ni DELETE para no
+alterar los datos entre corridas; los POST añaden unas pocas filas.
+"""
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+import numpy as np  # noqa: E402
+import requests  # noqa: E402
+from django.core.servers.basehttp import (  # noqa: E402
+    ThreadedWSGIServer,
+    WSGIRequestHandler,
+    get_internal_wsgi_application,
+)
+from django.db import connection  # noqa: E402
+
+from benchmarks import gateway_stub  # noqa: E402
+from genes.models import Gene  # noqa: E402
+from genomics.pagination import encode_cursor  # noqa: E402
+from reports import gateway  # noqa: E402
+from reports.models import PatientVariantReport  # noqa: E402
+from variants.models import GeneticVariant  # noqa: E402
+
+ARROW = {"Accept": "application/vnd.apache.arrow.stream"}
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+class Sample:
+    """IDs reales de la base sobre los que se construyen las peticiones."""
+
+    def __init__(self, size):
+        self.genes = list(Gene.objects.order_by("pk").values_list("pk", "symbol")[:size])
+        variants = list(
+            GeneticVariant.objects.order_by("pk").values_list("pk", "chromosome", "position")[:size]
+        )
+        self.variant_ids = [str(pk) for pk, _, _ in variants]
+        self.loci = [(chromosome, position) for _, chromosome, position in variants]
+        self.report_ids = [str(pk) for pk in PatientVariantReport.objects.order_by("pk")
+                           .values_list("pk", flat=True)[:size]]
+        self.patient_ids = sorted(set(
+            PatientVariantReport.objects.order_by("pk").values_list("patientId", flat=True)[:size]
+        ))
+        if not (self.genes and self.variant_ids and self.report_ids):
+            raise SystemExit("La base está vacía: ejecute antes python -m benchmarks.seed")
+
+
+class Scenario:
+    def __init__(self, name, build, expected=(200,), heavy=False):
+        self.name = name
+        self.build = build
+        self.expected = expected
+        self.heavy = heavy
+
+
+def report_body(rng, sample, missing_ratio=0.0):
+    patient = rng.choice(sample.patient_ids)
+    if rng.random() < missing_ratio:
+        patient = f"missing-{rng.randrange(10**9)}"
+    return {
+        "patientId": patient,
+        "variantId": rng.choice(sample.variant_ids),
+        "detectionDate": str(datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randrange(365))),
+        "alleleFrequency": round(rng.random(), 3),
+    }
+
+
+def vcf_body(rng, sample, records=100):
+    lines = ["##fileformat=VCFv4.2", "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO"]
+    for _ in range(records):
+        _, symbol = rng.choice(sample.genes)
+        lines.append(
+            f"{rng.choice(['1', '2', 'X'])}\t{rng.randint(1, 248_000_000)}\t.\tA\tG\t.\tPASS\t"
+            f"GENE={symbol};IMPACT=MODERATE"
+        )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def region(rng, sample, width=100_000):
+    chromosome, position = rng.choice(sample.loci)
+    start = max(position - width // 2, 1)
+    return f"/variants/region/?chrom={chromosome}&start={start}&end={start + width}"
+
+
+def scenarios():
+    def get(path_func, headers=None):
+        return lambda rng, s: ("GET", path_func(rng, s), {"headers": headers or {}})
+
+    def post(path, body_func):
+        return lambda rng, s: ("POST", path, {"json": body_func(rng, s)})
+
+    return [
+        # Genes
+        Scenario("genes.list", get(lambda r, s: "/genes/")),
+        Scenario("genes.list.page", get(lambda r, s: "/genes/?limit=100")),
+        Scenario("genes.list.stream", get(lambda r, s: "/genes/?stream=ndjson")),
+        Scenario("genes.list.fields", get(lambda r, s: "/genes/?fields=symbol")),
+        # Autocompletado: prefijo del símbolo
+        Scenario("genes.search", get(lambda r, s: f"/genes/search/?q={r.choice(s.genes)[1][:4]}")),
+        Scenario("genes.detail", get(lambda r, s: f"/genes/{r.choice(s.genes)[0]}/")),
+        Scenario("genes.create", post("/genes/", lambda r, s: {
+            "symbol": f"BN{r.randrange(10**6)}", "fullName": "Benchmark",
+            "functionSummary": "Creado por la prueba de carga",
+        }), expected=(201,)),
+        # Variantes
+        Scenario("variants.list", get(lambda r, s: "/variants/"), heavy=True),
+        Scenario("variants.list.stream", get(lambda r, s: "/variants/?stream=ndjson"), heavy=True),
+        Scenario("variants.list.arrow", get(lambda r, s: "/variants/", ARROW), heavy=True),
+        Scenario("variants.list.page", get(
+            lambda r, s: f"/variants/?limit=100&cursor={encode_cursor(r.choice(s.variant_ids))}")),
+        Scenario("variants.list.page.expand", get(
+            lambda r, s: f"/variants/?limit=100&expand=gene&cursor={encode_cursor(r.choice(s.variant_ids))}")),
+        Scenario("variants.list.page.msgpack", get(
+            lambda r, s: f"/variants/?limit=100&cursor={encode_cursor(r.choice(s.variant_ids))}", MSGPACK)),
+        Scenario("variants.list.filter", get(
+            lambda r, s: f"/variants/?impact=HIGH&chromosome={r.choice(s.loci)[0]}"
+                         "&fields=position,referenceBase,alternateBase&limit=100")),
+        Scenario("variants.list.filter.ordered", get(
+            lambda r, s: f"/variants/?chromosome={r.choice(s.loci)[0]}&ordering=position&limit=100")),
+        Scenario("variants.detail", get(lambda r, s: f"/variants/{r.choice(s.variant_ids)}/")),
+        Scenario("variants.detail.expand", get(
+            lambda r, s: f"/variants/{r.choice(s.variant_ids)}/?expand=gene")),
+        Scenario("variants.region", get(region)),
+        # Con la misma semilla una segunda corrida repite loci: 400 por locus duplicado
+        Scenario("variants.create", post("/variants/", lambda r, s: {
+            "geneId": r.choice(s.genes)[0], "chromosome": r.choice(["1", "2", "X"]),
+            "position": r.randint(1, 248_000_000), "referenceBase": "C",
+            "alternateBase": "T", "impact": "LOW",
+        }), expected=(201, 400)),
+        # Loci del genoma mitocondrial (seed no lo usa): al repetirse predominan las actualizaciones
+        Scenario("variants.upsert", post("/variants/upsert/", lambda r, s: [{
+            "geneId": r.choice(s.genes)[0], "chromosome": "MT", "position": r.randint(1, 16_569),
+            "referenceBase": "G", "alternateBase": "A", "impact": r.choice(["LOW", "MODERATE"]),
+        } for _ in range(100)])),
+        Scenario("variants.upsert.symbol", post("/variants/upsert/", lambda r, s: [{
+            "geneSymbol": r.choice(s.genes)[1], "chromosome": "MT", "position": r.randint(1, 16_569),
+            "referenceBase": "G", "alternateBase": "C", "impact": r.choice(["LOW", "MODERATE"]),
+        } for _ in range(100)])),
+        Scenario("variants.import", lambda r, s: (
+            "POST", "/variants/import/", {"files": {"file": ("bench.vcf", vcf_body(r, s))}},
+        ), expected=(201,)),
+        # Solo mide el encolado; los trabajos los ejecuta run_jobs si está corriendo
+        Scenario("variants.import.async", lambda r, s: (
+            "POST", "/variants/import/?async=true", {"files": {"file": ("bench.vcf", vcf_body(r, s))}},
+        ), expected=(202,)),
+        # Reportes
+        Scenario("reports.list", get(lambda r, s: "/reports/"), heavy=True),
+        Scenario("reports.list.arrow", get(lambda r, s: "/reports/", ARROW), heavy=True),
+        Scenario("reports.list.page", get(
+            lambda r, s: f"/reports/?limit=100&cursor={encode_cursor(r.choice(s.report_ids))}")),
+        Scenario("reports.list.filter", get(
+            lambda r, s: "/reports/?from=2023-01-01&to=2023-03-31&minAlleleFrequency=0.5"
+                         "&ordering=-detectionDate&limit=100")),
+        Scenario("reports.detail", get(lambda r, s: f"/reports/{r.choice(s.report_ids)}/")),
+        Scenario("reports.detail.expand", get(
+            lambda r, s: f"/reports/{r.choice(s.report_ids)}/?expand=variant,gene")),
+        Scenario("reports.patient", get(lambda r, s: f"/reports/patient/{r.choice(s.patient_ids)}/")),
+        Scenario("reports.patient.summary", get(
+            lambda r, s: f"/reports/patient/{r.choice(s.patient_ids)}/summary/")),
+        Scenario("reports.patient.async", get(
+            lambda r, s: f"/reports/async/patient/{r.choice(s.patient_ids)}/")),
+        Scenario("reports.create", post("/reports/", report_body), expected=(201,)),
+        Scenario("reports.create.async", post("/reports/async/", report_body), expected=(201,)),
+        Scenario("reports.bulk", post(
+            "/reports/bulk/", lambda r, s: [report_body(r, s, missing_ratio=0.05) for _ in range(100)],
+        ), expected=(201, 207)),
+        Scenario("reports.export", post("/reports/export/", lambda r, s: {"format": "arrow"}),
+                 expected=(202,)),
+        Scenario("reports.daily", get(
+            lambda r, s: "/reports/daily/?from=2023-01-01&to=2023-12-31&impact=HIGH,MODERATE&period=month")),
+        Scenario("reports.cohort", get(lambda r, s: "/reports/cohort/?impact=HIGH,MODERATE&from=2021-01-01")),
+        Scenario("reports.patient_cache", get(lambda r, s: "/reports/patient-cache/")),
+        # Transversales
+        Scenario("metrics", get(lambda r, s: "/metrics")),
+        Scenario("openapi", get(lambda r, s: "/openapi/")),
+        Scenario("swagger", get(lambda r, s: "/swagger/")),
+        Scenario("admin.login", get(lambda r, s: "/admin/login/")),
+    ]
+
+
+def read_peak_rss(pid):
+    # VmHWM es el pico de memoria residente; se puede reiniciar por escenario
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid == os.getpid():
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return None
+
+
+def reset_peak_rss(pid):
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class RequestHandler(WSGIRequestHandler):
+    # Sin Nagle: cabeceras y cuerpo van en escrituras separadas y, con
+    # keep-alive, el ACK retardado del cliente añadiría ~40 ms por petición
+    disable_nagle_algorithm = True
+
+
+def start_server():
+    server = ThreadedWSGIServer(("127.0.0.1", 0), RequestHandler)
+    server.set_app(get_internal_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def run_scenario(base_url, scenario, sample, concurrency, duration, max_requests, warmup, seed, pid):
+    session = requests.Session()
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        method, path, kwargs = scenario.build(rng, sample)
+        session.request(method, base_url + path, timeout=600, **kwargs).content
+
+    lock = threading.Lock()
+    latencies, sizes, statuses = [], [], {}
+    issued = 0
+    rss_reset = reset_peak_rss(pid)
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def worker(index):
+        nonlocal issued
+        worker_session = requests.Session()
+        worker_rng = random.Random(seed * 1000 + index)
+        while True:
+            with lock:
+                if issued >= max_requests or time.perf_counter() >= deadline:
+                    return
+                issued += 1
+            method, path, kwargs = scenario.build(worker_rng, sample)
+            request_started = time.perf_counter()
+            try:
+                response = worker_session.request(method, base_url + path, timeout=600, **kwargs)
+                size, code = len(response.content), response.status_code
+            except requests.RequestException:
+                size, code = 0, "error"
+            elapsed = time.perf_counter() - request_started
+            with lock:
+                latencies.append(elapsed)
+                sizes.append(size)
+                statuses[code] = statuses.get(code, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latency_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latency_ms, [50, 95, 99]) if len(latencies) else (None,) * 3
+    errors = sum(count for code, count in statuses.items() if code not in scenario.expected)
+    return {
+        "name": scenario.name,
+        "heavy": scenario.heavy,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items(), key=str)},
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": round(float(p50), 3) if p50 is not None else None,
+            "p95": round(float(p95), 3) if p95 is not None else None,
+            "p99": round(float(p99), 3) if p99 is not None else None,
+            "mean": round(float(latency_ms.mean()), 3) if len(latencies) else None,
+            "max": round(float(latency_ms.max()), 3) if len(latencies) else None,
+        },
+        "bytes_mean": round(sum(sizes) / len(sizes)) if sizes else None,
+        "peak_rss_mb": read_peak_rss(pid) if pid else None,
+        # Sin /proc/<pid>/clear_refs solo se conoce el pico acumulado del proceso
+        "peak_rss_scope": "scenario" if rss_reset else "process",
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": connection.vendor,
+        "commit": commit,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="API ya levantada (por defecto se levanta una embebida)")
+    parser.add_argument("--server-pid", type=int,
+                        help="PID del servidor externo para medir su RSS (con --base-url)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por escenario")
+    parser.add_argument("--max-requests", type=int, default=100_000, help="Tope de peticiones por escenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Peticiones previas no medidas")
+    parser.add_argument("--heavy", action="store_true",
+                        help="Incluye listados completos y exportaciones de tablas grandes")
+    parser.add_argument("--heavy-requests", type=int, default=3,
+                        help="Peticiones (secuenciales) por escenario pesado")
+    parser.add_argument("--scenarios", default="*", help="Patrones separados por coma, p. ej. 'variants.*'")
+    parser.add_argument("--gateway-latency", type=float, default=0.005,
+                        help="Latencia simulada del gateway de Clínica en segundos")
+    parser.add_argument("--sample-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="", help="Etiqueta libre (p. ej. 'antes' o 'despues')")
+    parser.add_argument("--output", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    patterns = [pattern.strip() for pattern in args.scenarios.split(",")]
+    selected = [
+        scenario for scenario in scenarios()
+        if (args.heavy or not scenario.heavy)
+        and any(fnmatch.fnmatch(scenario.name, pattern) for pattern in patterns)
+    ]
+    sample = Sample(args.sample_size)
+    dataset = {
+        "genes": Gene.objects.count(),
+        "variants": GeneticVariant.objects.count(),
+        "reports": PatientVariantReport.objects.count(),
+    }
+
+    if args.base_url:
+        base_url, pid = args.base_url.rstrip("/"), args.server_pid
+    else:
+        _, stub_url = gateway_stub.start(args.gateway_latency)
+        gateway.GATEWAY_PATIENT_URL = stub_url
+        _, base_url = start_server()
+        pid = os.getpid()
+
+    results = []
+    for scenario in selected:
+        concurrency = 1 if scenario.heavy else args.concurrency
+        max_requests = args.heavy_requests if scenario.heavy else args.max_requests
+        result = run_scenario(
+            base_url, scenario, sample, concurrency, args.duration, max_requests,
+            0 if scenario.heavy else args.warmup, args.seed, pid,
+        )
+        results.append(result)
+        latency = result["latency_ms"]
+        print(
+            f"{scenario.name:<28} {result['requests']:>7} req  {result['throughput_rps'] or 0:>9.1f} req/s  "
+            f"p50 {latency['p50'] or 0:>9.2f}  p95 {latency['p95'] or 0:>9.2f}  p99 {latency['p99'] or 0:>9.2f} ms  "
+            f"errores {result['errors']}"
+        )
+
+    report = {
+        "label": args.label,
+        "started": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "environment": environment(),
+        "dataset": dataset,
+        "config": vars(args),
+        "scenarios": results,
+        "peak_rss_mb": max((r["peak_rss_mb"] for r in results if r["peak_rss_mb"]), default=None),
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Resultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
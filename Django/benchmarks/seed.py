@@ -0,0 +1,174 @@
+"""
+Genera datos sintéticos reproducibles (genes, variantes y reportes) para las
+pruebas de carga. Con la misma semilla se obtienen los mismos IDs y valores.
+
+Uso (desde el directorio Django/):
+    BENCH_SQLITE=/tmp/bench.sqlite3 python manage.py migrate --settings benchmarks.settings
+    BENCH_SQLITE=/tmp/bench.sqlite3 python -m benchmarks.seed --scale small
+    python -m benchmarks.seed --genes 20000 --variants 5000000 --reports 10000000   # MySQL
+"""
+import argparse
+import datetime
+import hashlib
+import os
+import random
+import sys
+import time
+import uuid
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+from django.db import transaction  # noqa: E402
+
+from genes.models import Gene  # noqa: E402
+from reports import rollup  # noqa: E402
+from reports.models import PatientVariantReport, PatientVariantSummary, ReportDailyRollup  # noqa: E402
+from reports.summary import rebuild  # noqa: E402
+from variants.models import GeneticVariant  # noqa: E402
+
+SCALES = {
+    "small": {"genes": 200, "variants": 50_000, "reports": 100_000, "patients": 5_000},
+    "medium": {"genes": 2_000, "variants": 500_000, "reports": 1_000_000, "patients": 50_000},
+    "large": {"genes": 20_000, "variants": 5_000_000, "reports": 10_000_000, "patients": 500_000},
+}
+
+CHROMOSOMES = [str(i) for i in range(1, 23)] + ["X", "Y"]
+BASES = "ACGT"
+IMPACTS = ["HIGH", "MODERATE", "LOW", "MODIFIER"]
+IMPACT_WEIGHTS = [1, 4, 10, 25]
+FIRST_DATE = datetime.date(2020, 1, 1)
+
+
+def derived_uuid(kind, index, seed):
+    # UUID determinista a partir del índice: no hace falta guardar los IDs de
+    # millones de variantes en memoria para referenciarlos desde los reportes
+    digest = hashlib.blake2b(f"{kind}{index}".encode(), digest_size=16, key=str(seed).encode())
+    return uuid.UUID(bytes=digest.digest(), version=4)
+
+
+def patient_id(index, seed):
+    return str(derived_uuid("patient", index, seed))
+
+
+def variant_id(index, seed):
+    # Ordenado por índice como los uuid7 de la aplicación (un milisegundo por
+    # variante a partir de FIRST_DATE): la carga inserta al final del índice
+    random_bits = derived_uuid("variant", index, seed).int & ((1 << 74) - 1)
+    ms = int(datetime.datetime(FIRST_DATE.year, FIRST_DATE.month, FIRST_DATE.day, tzinfo=datetime.timezone.utc).timestamp() * 1000) + index
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | ((random_bits >> 62) << 64) | (0b10 << 62)
+                     | (random_bits & ((1 << 62) - 1)))
+
+
+def insert_batches(model, rows, total, batch_size, label):
+    started = time.perf_counter()
+    batch = []
+    done = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            done += len(batch)
+            batch = []
+            rate = done / (time.perf_counter() - started)
+            print(f"\r{label}: {done}/{total} ({rate:,.0f} filas/s)", end="", file=sys.stderr)
+    if batch:
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        done += len(batch)
+    print(f"\r{label}: {done}/{total} en {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def flush():
+    # Borrado directo sin cascada en Python (resúmenes, conteo diario, reportes, variantes y genes)
+    for model in (PatientVariantSummary, ReportDailyRollup, PatientVariantReport, GeneticVariant, Gene):
+        model.objects.all()._raw_delete(model.objects.db)
+
+
+def seed(genes, variants, reports, patients, batch_size=10_000, seed=42):
+    rng = random.Random(seed)
+
+    insert_batches(
+        Gene,
+        (
+            Gene(symbol=f"BG{i}", fullName=f"Benchmark gene {i}",
+                 functionSummary="Gen sintético para pruebas de carga")
+            for i in range(genes)
+        ),
+        genes, batch_size, "genes",
+    )
+    # MySQL no devuelve los IDs autoincrementales en bulk_create
+    gene_ids = list(Gene.objects.order_by("pk").values_list("pk", flat=True))
+
+    # Cada variante cae en su propio tramo del cromosoma: el locus es clave única
+    stride = max(248_000_000 // -(-variants // len(CHROMOSOMES)), 1) if variants else 1
+
+    def variant_rows():
+        for i in range(variants):
+            reference = rng.choice(BASES)
+            slot, chromosome = divmod(i, len(CHROMOSOMES))
+            yield GeneticVariant(
+                id=variant_id(i, seed),
+                gene_id=rng.choice(gene_ids),
+                chromosome=CHROMOSOMES[chromosome],
+                position=slot * stride + rng.randint(1, stride),
+                referenceBase=reference,
+                alternateBase=rng.choice(BASES.replace(reference, "")),
+                impact=rng.choices(IMPACTS, IMPACT_WEIGHTS)[0],
+            )
+
+    insert_batches(GeneticVariant, variant_rows(), variants, batch_size, "variantes")
+
+    def report_rows():
+        for _ in range(reports):
+            yield PatientVariantReport(
+                patientId=patient_id(rng.randrange(patients), seed),
+                variant_id=variant_id(rng.randrange(variants), seed),
+                detectionDate=FIRST_DATE + datetime.timedelta(days=rng.randrange(5 * 365)),
+                alleleFrequency=f"{rng.random():.3f}",
+            )
+
+    if variants:
+        insert_batches(PatientVariantReport, report_rows(), reports, batch_size, "reportes")
+
+    # bulk_create no mantiene los resúmenes por paciente ni el conteo diario
+    started = time.perf_counter()
+    groups = rebuild()
+    print(f"resúmenes: {groups} grupos en {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    started = time.perf_counter()
+    rows = rollup.rebuild()
+    print(f"conteo diario: {rows} filas en {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="small",
+                        help="Tamaño base; cada cantidad se puede sobrescribir por separado")
+    parser.add_argument("--genes", type=int)
+    parser.add_argument("--variants", type=int)
+    parser.add_argument("--reports", type=int)
+    parser.add_argument("--patients", type=int, help="Pacientes distintos entre los reportes")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--flush", action="store_true",
+                        help="Borra genes, variantes y reportes existentes antes de generar")
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for name in counts:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+
+    if args.flush:
+        flush()
+    elif Gene.objects.exists():
+        parser.error("La base ya tiene datos; use --flush para regenerarlos")
+
+    seed(batch_size=args.batch_size, seed=args.seed, **counts)
+
+
+if __name__ == "__main__":
+    main()
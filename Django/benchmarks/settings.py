@@ -0,0 +1,27 @@
+"""
+Settings para los benchmarks: los del proyecto, con la opción de usar SQLite
+(BENCH_SQLITE=/ruta/bench.sqlite3) en lugar del MySQL configurado.
+"""
+import os
+
+from genomics.settings import *  # noqa: F401,F403
+
+if os.environ.get("BENCH_SQLITE"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ["BENCH_SQLITE"],
+            # Varios hilos del servidor escriben a la vez durante la carga
+            "OPTIONS": {"timeout": 30},
+        }
+    }
+
+# Sin log de cada petición del servidor embebido ni de las peticiones lentas
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "loggers": {
+        "django.server": {"level": "ERROR"},
+        "genomics.slow_requests": {"level": "ERROR"},
+    },
+}
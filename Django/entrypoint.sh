@@ -8,6 +8,10 @@ done
 
 echo "Base de datos disponible, ejecutando migraciones..."
 python manage.py migrate --noinput
+# Tabla de la caché compartida (CACHES['shared'])
+python manage.py createcachetable
 
-echo "Arrancando Gunicorn..."
-gunicorn genomics.wsgi:application --bind 0.0.0.0:8000
+# ASGI: los endpoints /reports/async/ atienden muchas validaciones contra
+# Clínica en paralelo desde un mismo worker
+echo "Arrancando Uvicorn..."
+exec uvicorn genomics.asgi:application --host 0.0.0.0 --port 8000 --workers "${UVICORN_WORKERS:-2}"
@@ -3,8 +3,20 @@ from django.contrib import admin
 # Register your models here.
 from django.contrib import admin
 from .models import Gene
+from .search import gene_search
 
 @admin.register(Gene)
 class GeneAdmin(admin.ModelAdmin):
     list_display = ("id", "symbol", "fullName")
     search_fields = ("symbol", "fullName")
+
+    def get_search_results(self, request, queryset, search_term):
+        # Índice en memoria (términos y prefijos) en lugar de LIKE '%x%' sobre la
+        # tabla completa; si no encuentra nada se busca por subcadena en
+        # search_fields (p. ej. "RCA1" -> BRCA1)
+        if not search_term.strip():
+            return queryset, False
+        ids = [gene_id for gene_id, *_ in gene_search.search(search_term, limit=None)]
+        if not ids:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=ids), False
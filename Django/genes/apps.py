@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class GenesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'genes'
+
+    def ready(self):
+        from genomics.metrics import register_collector
+        from genomics.response_cache import cache_metrics
+        from . import signals  # noqa: F401
+        from .registry import registry_metrics
+
+        register_collector(cache_metrics)
+        register_collector(registry_metrics)
@@ -1,6 +1,17 @@
-from pydantic import BaseModel
+from django.conf import settings
+from pydantic import BaseModel, Field, field_validator
 
 class GeneDTO(BaseModel):
     symbol: str
     fullName: str
     functionSummary: str
+
+
+class GeneSearchDTO(BaseModel):
+    q: str = Field(min_length=1)
+    limit: int = Field(20, ge=1)
+
+    @field_validator("limit")
+    @classmethod
+    def cap_limit(cls, value):
+        return min(value, settings.GENE_SEARCH_MAX_RESULTS)
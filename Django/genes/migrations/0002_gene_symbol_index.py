@@ -0,0 +1,18 @@
+# Generated by Django 4.2.26 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('genes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gene',
+            name='symbol',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+    ]
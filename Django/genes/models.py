@@ -2,7 +2,7 @@ from django.db import models
 
 class Gene(models.Model):
     id = models.AutoField(primary_key=True)
-    symbol = models.CharField(max_length=20)
+    symbol = models.CharField(max_length=20, db_index=True)
     fullName = models.CharField(max_length=255)
     functionSummary = models.TextField()
 
@@ -0,0 +1,169 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from genomics.db_router import primary_reads
+
+from .models import Gene
+
+VERSION_KEY = "gene-registry-version"
+
+
+class GeneRegistry:
+    """Mapa id <-> símbolo de todos los genes, en memoria de cada proceso.
+
+    La tabla de genes es chica y casi estática: con el registro, comprobar que
+    un gen existe o resolver su símbolo no consulta la BD. Cada escritura
+    confirmada actualiza la copia local y renueva un sello de versión en la
+    caché compartida (GENE_REGISTRY['CACHE_ALIAS'], por defecto en la BD); los
+    demás workers lo comparan cada CHECK_INTERVAL segundos y recargan si
+    cambió. La recarga completa cada TTL segundos cubre los cambios hechos
+    fuera de la aplicación.
+    """
+
+    def __init__(self, config):
+        self.check_interval = config["CHECK_INTERVAL"]
+        self.ttl = config["TTL"]
+        self._cache = caches[config["CACHE_ALIAS"]]
+        self._lock = threading.Lock()
+        self._symbols = {}
+        self._ids = {}
+        self._version = None
+        self._loaded_at = None
+        self._checked_at = 0.0
+        self.reloads = 0
+
+    def _shared_version(self):
+        version = self._cache.get(VERSION_KEY)
+        if version is None:
+            self._cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+            version = self._cache.get(VERSION_KEY)
+        return version
+
+    def load(self):
+        # Se lee el sello antes que la tabla: una escritura concurrente deja la
+        # copia marcada con la versión vieja y se recarga en la siguiente comprobación
+        version = self._shared_version()
+        symbols, ids = {}, {}
+        # Las lecturas del registro van al primario aunque se hagan en un GET: la
+        # copia dura todo el TTL y una réplica atrasada dejaría genes fuera
+        with primary_reads():
+            for gene_id, symbol in Gene.objects.order_by("id").values_list("id", "symbol").iterator(chunk_size=10000):
+                symbols[gene_id] = symbol
+                # Con símbolos repetidos gana el gen más antiguo
+                ids.setdefault(symbol, gene_id)
+        with self._lock:
+            self._symbols, self._ids = symbols, ids
+            self._version = version
+            self._loaded_at = self._checked_at = time.monotonic()
+            self.reloads += 1
+
+    def _fresh(self):
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.ttl:
+            self.load()
+        elif now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            if self._shared_version() != self._version:
+                self.load()
+        return self
+
+    def exists(self, gene_id):
+        if gene_id in self._fresh()._symbols:
+            return True
+        # Un gen recién creado en otro worker puede no estar aún en la copia local
+        with primary_reads():
+            symbol = Gene.objects.filter(id=gene_id).values_list("symbol", flat=True).first()
+        if symbol is None:
+            return False
+        self._put(gene_id, symbol)
+        return True
+
+    def existing(self, gene_ids):
+        """Subconjunto de gene_ids que existen (una consulta solo por los que falten)."""
+        symbols = self._fresh()._symbols
+        found = {gene_id for gene_id in gene_ids if gene_id in symbols}
+        missing = set(gene_ids) - found
+        if missing:
+            with primary_reads():
+                rows = list(Gene.objects.filter(id__in=missing).values_list("id", "symbol"))
+            for gene_id, symbol in rows:
+                self._put(gene_id, symbol)
+                found.add(gene_id)
+        return found
+
+    def id_for(self, symbol):
+        gene_id = self._fresh()._ids.get(symbol)
+        if gene_id is None:
+            with primary_reads():
+                gene_id = Gene.objects.filter(symbol=symbol).order_by("id").values_list("id", flat=True).first()
+            if gene_id is not None:
+                self._put(gene_id, symbol)
+        return gene_id
+
+    def symbol_for(self, gene_id):
+        return self._fresh()._symbols.get(gene_id)
+
+    def _put(self, gene_id, symbol):
+        with self._lock:
+            previous = self._symbols.get(gene_id)
+            self._symbols[gene_id] = symbol
+            if previous is not None and previous != symbol:
+                self._reindex(previous)
+            if gene_id < self._ids.get(symbol, gene_id + 1):
+                self._ids[symbol] = gene_id
+
+    def _reindex(self, symbol):
+        # El símbolo dejó de pertenecer a un gen: pasa al siguiente que lo use
+        candidates = [gene_id for gene_id, other in self._symbols.items() if other == symbol]
+        if candidates:
+            self._ids[symbol] = min(candidates)
+        else:
+            self._ids.pop(symbol, None)
+
+    def _bump(self):
+        # Si otro worker ya había renovado el sello, la copia local no tiene su
+        # cambio: se conserva la versión vieja para recargar en la próxima comprobación
+        current = self._cache.get(VERSION_KEY) == self._version
+        version = uuid.uuid4().hex
+        self._cache.set(VERSION_KEY, version, None)
+        if current:
+            with self._lock:
+                self._version = version
+
+    def saved(self, gene):
+        # Llamar tras el commit
+        if self._loaded_at is not None:
+            self._put(gene.pk, gene.symbol)
+        self._bump()
+
+    def forget(self, gene_id):
+        # Solo la copia local (p. ej. un gen borrado por un trabajo en otro proceso)
+        if self._loaded_at is not None:
+            with self._lock:
+                symbol = self._symbols.pop(gene_id, None)
+                if symbol is not None:
+                    self._reindex(symbol)
+
+    def deleted(self, gene_id):
+        self.forget(gene_id)
+        self._bump()
+
+    def stats(self):
+        return {"size": len(self._symbols), "reloads": self.reloads}
+
+
+def registry_metrics():
+    stats = gene_registry.stats()
+    return [
+        "# TYPE genomics_gene_registry_size gauge",
+        f"genomics_gene_registry_size {stats['size']}",
+        "# TYPE genomics_gene_registry_reloads_total counter",
+        f"genomics_gene_registry_reloads_total {stats['reloads']}",
+    ]
+
+
+gene_registry = GeneRegistry(settings.GENE_REGISTRY)
@@ -0,0 +1,183 @@
+import bisect
+import math
+import re
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+
+from genomics.db_router import primary_reads
+
+from .models import Gene
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Peso de un término según el campo en que aparece
+FIELD_WEIGHTS = (
+    ("symbol", 10.0),
+    ("fullName", 3.0),
+    ("functionSummary", 1.0),
+)
+# Un término que solo coincide por prefijo (autocompletado) pesa menos que uno exacto
+PREFIX_FACTOR = 0.5
+# Bonificaciones cuando la consulta completa es el símbolo o su comienzo
+SYMBOL_EXACT_BOOST = 100.0
+SYMBOL_PREFIX_BOOST = 50.0
+# Mayor que cualquier carácter: [p, p + PREFIX_END) son los valores que empiezan por p
+PREFIX_END = "\U0010ffff"
+
+
+def normalize(text):
+    # Minúsculas y sin acentos: "Proteína" y "proteina" son el mismo término
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text))
+
+
+class GeneSearchIndex:
+    """Índice invertido en memoria sobre symbol, fullName y functionSummary.
+
+    Cada término apunta a {gene_id: peso}; el vocabulario ordenado permite
+    resolver el último término de la consulta por prefijo (autocompletado) con
+    bisect, y los símbolos normalizados ordenados resuelven el prefijo del
+    símbolo completo (p. ej. "hla-" -> HLA-A, HLA-B). La relevancia suma, por
+    término, su peso por campo multiplicado por su IDF.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._docs = {}
+        self._postings = {}
+        self._vocabulary = []
+        self._symbols = []
+
+    def _stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at >= settings.GENE_SEARCH_TTL
+
+    def _ensure_built(self):
+        if not self._stale():
+            return
+        rows = Gene.objects.values_list("id", "symbol", "fullName", "functionSummary")
+        self._docs, self._postings, self._vocabulary, self._symbols = {}, {}, [], []
+        # El índice vive más que el GET que lo construye: se lee del primario
+        with primary_reads():
+            for gene_id, symbol, full_name, summary in rows.iterator(chunk_size=10000):
+                self._add(gene_id, symbol, full_name, summary, insort=False)
+        self._vocabulary.sort()
+        self._symbols.sort()
+        self._built_at = time.monotonic()
+
+    def _add(self, gene_id, symbol, full_name, summary, insort=True):
+        terms = {}
+        for (_, weight), text in zip(FIELD_WEIGHTS, (symbol, full_name, summary)):
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+        key = (normalize(symbol), gene_id)
+        self._docs[gene_id] = (symbol, full_name, terms, key)
+        for token, weight in terms.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                if insort:
+                    bisect.insort(self._vocabulary, token)
+                else:
+                    self._vocabulary.append(token)
+            posting[gene_id] = weight
+        if insort:
+            bisect.insort(self._symbols, key)
+        else:
+            self._symbols.append(key)
+
+    def _remove(self, gene_id):
+        doc = self._docs.pop(gene_id, None)
+        if doc is None:
+            return
+        _, _, terms, key = doc
+        for token in terms:
+            posting = self._postings[token]
+            posting.pop(gene_id, None)
+            if not posting:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+        del self._symbols[bisect.bisect_left(self._symbols, key)]
+
+    @staticmethod
+    def _prefixed(sorted_values, low, high):
+        # Rango [low, high) del arreglo ordenado
+        return sorted_values[bisect.bisect_left(sorted_values, low):bisect.bisect_left(sorted_values, high)]
+
+    def _term_scores(self, term, prefix):
+        total = len(self._docs)
+        scores = {}
+        tokens = self._prefixed(self._vocabulary, term, term + PREFIX_END) if prefix else [term]
+        for token in tokens:
+            posting = self._postings.get(token)
+            if not posting:
+                continue
+            factor = math.log(1 + total / len(posting))
+            if token != term:
+                factor *= PREFIX_FACTOR
+            for gene_id, weight in posting.items():
+                score = weight * factor
+                if score > scores.get(gene_id, 0.0):
+                    scores[gene_id] = score
+        return scores
+
+    def search(self, query, limit=20):
+        """Genes que contienen todos los términos de la consulta (el último se
+        completa por prefijo), ordenados por relevancia:
+        [(gene_id, symbol, fullName, score)]. limit=None devuelve todos."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        normalized = normalize(query.strip())
+        with self._lock:
+            self._ensure_built()
+            scores = {}
+            for position, term in enumerate(terms):
+                found = self._term_scores(term, prefix=position == len(terms) - 1)
+                if position == 0:
+                    scores = found
+                else:
+                    scores = {gene_id: score + found[gene_id] for gene_id, score in scores.items()
+                              if gene_id in found}
+                if not scores:
+                    break
+            # El símbolo completo admite caracteres que separan términos (HLA-A)
+            for symbol, gene_id in self._prefixed(self._symbols, (normalized,), (normalized + PREFIX_END,)):
+                boost = SYMBOL_EXACT_BOOST if symbol == normalized else SYMBOL_PREFIX_BOOST
+                scores[gene_id] = scores.get(gene_id, 0.0) + boost
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self._docs[item[0]][0]))
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [
+                (gene_id, self._docs[gene_id][0], self._docs[gene_id][1], round(score, 3))
+                for gene_id, score in ranked
+            ]
+
+    def update(self, gene):
+        # Actualización incremental; si el índice aún no se construyó no hay nada que hacer
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(gene.pk)
+            self._add(gene.pk, gene.symbol, gene.fullName, gene.functionSummary)
+
+    def remove(self, gene_id):
+        with self._lock:
+            self._remove(gene_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+
+# Índice por proceso; las señales de Gene lo actualizan en el worker que
+# escribe y, en los demás, se reconstruye tras GENE_SEARCH_TTL segundos.
+gene_search = GeneSearchIndex()
@@ -1,7 +1,22 @@
 from rest_framework import serializers
 from .models import Gene
+from genomics.filtering import Filter
 
 class GeneSerializer(serializers.ModelSerializer):
     class Meta:
         model = Gene
         fields = "__all__"
+
+
+class GeneSearchResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    symbol = serializers.CharField()
+    fullName = serializers.CharField()
+    score = serializers.FloatField()
+
+
+GENE_FILTERS = [
+    Filter("symbol", "symbol", many=True, description="Símbolo exacto del gen."),
+]
+
+GENE_ORDERINGS = ["symbol"]
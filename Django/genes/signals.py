@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from genomics.response_cache import response_cache
+from .models import Gene
+from .registry import gene_registry
+from .search import gene_search
+
+
+@receiver(post_save, sender=Gene)
+def gene_saved(sender, instance, **kwargs):
+    response_cache.invalidate("gene", instance.pk)
+    transaction.on_commit(lambda: gene_search.update(instance))
+    transaction.on_commit(lambda: gene_registry.saved(instance))
+
+
+@receiver(post_delete, sender=Gene)
+def gene_deleted(sender, instance, **kwargs):
+    # La cascada emite post_delete por cada variante; el listado de variantes
+    # se invalida igualmente por si se borraron en bloque
+    response_cache.invalidate("gene", instance.pk)
+    response_cache.invalidate("variant")
+    transaction.on_commit(lambda: gene_search.remove(instance.pk))
+    transaction.on_commit(lambda: gene_registry.deleted(instance.pk))
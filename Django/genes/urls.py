@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import GeneListCreateView, GeneDetailView
+from .views import GeneListCreateView, GeneDetailView, GenePurgeView, GeneSearchView
 
 urlpatterns = [
     path("", GeneListCreateView.as_view(), name="gene-list-create"),
+    path("search/", GeneSearchView.as_view(), name="gene-search"),
     path("<int:id>/", GeneDetailView.as_view(), name="gene-detail"),
+    path("<int:id>/purge/", GenePurgeView.as_view(), name="gene-purge"),
 ]
\ No newline at end of file
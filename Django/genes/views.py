@@ -1,11 +1,22 @@
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .models import Gene
-from .serializers import GeneSerializer
-from .dtos import GeneDTO
+from .serializers import GENE_FILTERS, GENE_ORDERINGS, GeneSearchResultSerializer, GeneSerializer
+from .dtos import GeneDTO, GeneSearchDTO
+from .search import gene_search
+from genomics.fastpath import fast_serializer_for
+from genomics.filtering import filter_parameters, ordering_parameter
+from genomics.pagination import LIST_PARAMETERS, list_response
+from genomics.response_cache import cached_response
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from jobs.views import accepted_response
+from reports.purge import gene_purge_size, purge_gene
 from drf_spectacular.utils import (
     extend_schema,
+    OpenApiParameter,
     OpenApiRequest,
     OpenApiResponse,
     OpenApiExample,
@@ -14,13 +25,15 @@ from drf_spectacular.utils import (
 class GeneListCreateView(APIView):
     @extend_schema(
         summary="Obtener lista de genes",
-        description="Retorna todos los genes almacenados en el sistema.",
+        description="Retorna todos los genes almacenados en el sistema. "
+                    "Admite filtros, orden (ordering), proyección de campos (fields), "
+                    "paginación por cursor (limit/cursor) y streaming (stream).",
+        parameters=LIST_PARAMETERS + filter_parameters(GENE_FILTERS) + [ordering_parameter(GENE_ORDERINGS)],
         responses=OpenApiResponse(GeneSerializer(many=True)),
     )
+    @cached_response("gene")
     def get(self, request):
-        genes = Gene.objects.all()
-        serializer = GeneSerializer(genes, many=True)
-        return Response(serializer.data)
+        return list_response(request, Gene.objects.all(), GeneSerializer, GENE_FILTERS, GENE_ORDERINGS)
 
     @extend_schema(
         summary="Crear un gen",
@@ -54,6 +67,35 @@ class GeneListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class GeneSearchView(APIView):
+    @extend_schema(
+        summary="Buscar genes",
+        description="Búsqueda de texto sobre symbol, fullName y functionSummary con un "
+                    "índice invertido en memoria. Todos los términos deben aparecer; el "
+                    "último se completa por prefijo (autocompletado) y los símbolos que "
+                    "coinciden con la consulta o empiezan por ella van primero.",
+        parameters=[
+            OpenApiParameter("q", str, required=True, description="Texto a buscar, p. ej. brc o dna repair"),
+            OpenApiParameter("limit", int, description="Máximo de resultados (por defecto 20)"),
+        ],
+        responses={
+            200: GeneSearchResultSerializer(many=True),
+            400: OpenApiResponse(description="Parámetros inválidos"),
+        }
+    )
+    def get(self, request):
+        try:
+            dto = GeneSearchDTO(**request.query_params.dict())
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = gene_search.search(dto.q, limit=dto.limit)
+        return Response([
+            {"id": gene_id, "symbol": symbol, "fullName": full_name, "score": score}
+            for gene_id, symbol, full_name, score in results
+        ])
+
+
 class GeneDetailView(APIView):
     def get_object(self, id):
         try:
@@ -68,7 +110,15 @@ class GeneDetailView(APIView):
             404: OpenApiResponse(description="Gen no encontrado"),
         }
     )
+    @cached_response("gene", object_kwarg="id")
     def get(self, request, id):
+        fast = fast_serializer_for(request, GeneSerializer)
+        if fast is not None:
+            row = fast.get(Gene.objects.filter(id=id))
+            if row is None:
+                return Response({"error": "Gen no encontrato"}, status=status.HTTP_404_NOT_FOUND)
+            return fast.response(row)
+
         gene = self.get_object(id)
         if gene is None:
             return Response({"error": "Gen no encontrato"}, status=status.HTTP_404_NOT_FOUND)
@@ -102,11 +152,38 @@ class GeneDetailView(APIView):
 
     @extend_schema(
         summary="Eliminar gen",
-        responses={204: OpenApiResponse(description="Gen eliminado")}
+        description="Borra el gen, sus variantes y los reportes de estas por lotes SQL. Si "
+                    "entre variantes y reportes pasan de PURGE_SYNC_LIMIT filas, el borrado "
+                    "se encola como POST /genes/{id}/purge/ y se responde 202 con el trabajo.",
+        responses={
+            202: OpenApiResponse(JobSerializer, description="Gen grande: borrado en cola"),
+            204: OpenApiResponse(description="Gen eliminado"),
+            404: OpenApiResponse(description="Gen no encontrado"),
+        }
     )
     def delete(self, request, id):
-        gene = self.get_object(id)
-        if gene is None:
+        if not Gene.objects.filter(id=id).exists():
+            return Response({"error": "Gen no encontrato"}, status=status.HTTP_404_NOT_FOUND)
+        if gene_purge_size(id, settings.PURGE_SYNC_LIMIT + 1) > settings.PURGE_SYNC_LIMIT:
+            return accepted_response(enqueue("genes.purge", {"gene_id": id}))
+        if purge_gene(id) is None:
             return Response({"error": "Gen no encontrato"}, status=status.HTTP_404_NOT_FOUND)
-        gene.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class GenePurgeView(APIView):
+    @extend_schema(
+        summary="Purgar gen en segundo plano",
+        description="Encola el borrado del gen con sus variantes y reportes (reportes, luego "
+                    "variantes y al final el gen, en lotes de PURGE_CHUNK_SIZE con una "
+                    "transacción por lote). El progreso se consulta en /jobs/{id}/.",
+        request=None,
+        responses={
+            202: OpenApiResponse(JobSerializer, description="Trabajo en cola"),
+            404: OpenApiResponse(description="Gen no encontrado"),
+        }
+    )
+    def post(self, request, id):
+        if not Gene.objects.filter(id=id).exists():
+            return Response({"error": "Gen no encontrato"}, status=status.HTTP_404_NOT_FOUND)
+        return accepted_response(enqueue("genes.purge", {"gene_id": id}))
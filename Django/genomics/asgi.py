@@ -14,3 +14,17 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'genomics.settings')
 
 application = get_asgi_application()
+
+# Servidor de producción (uvicorn, ver entrypoint.sh): un único event loop por
+# worker, así que el cliente httpx del gateway se comparte entre peticiones
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+
+from genes.registry import gene_registry  # noqa: E402
+from reports import gateway  # noqa: E402
+
+gateway.SHARED_ASYNC_CLIENT = True
+# Como en wsgi.py, el registro de genes se carga al arrancar el worker. uvicorn
+# importa la app con el event loop en marcha, donde el ORM no se puede usar:
+# la carga va en un hilo aparte
+with ThreadPoolExecutor(max_workers=1) as pool:
+    pool.submit(gene_registry.load).result()
@@ -0,0 +1,80 @@
+"""
+Lecturas a la réplica (alias 'replica', opcional) y escrituras al primario.
+
+Solo se lee de la réplica cuando se pide explícitamente: durante los GET (lo
+activa ReplicaRoutingMiddleware) y dentro de replica_reads() (p. ej. las
+exportaciones en segundo plano). Cualquier escritura fija el resto de la
+petición al primario y el middleware extiende esa fijación unos segundos a
+las siguientes peticiones del mismo cliente (lee sus propias escrituras).
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_DB_ALIAS = "replica"
+# La cola de trabajos coordina workers: siempre se lee del primario
+PRIMARY_ONLY_APPS = {"jobs", "django_cache"}
+# Tablas de DatabaseCache: escribir en ellas no es una escritura del cliente
+UNPINNED_APPS = {"django_cache"}
+
+
+class RoutingState:
+    __slots__ = ("replica", "pin", "wrote")
+
+    def __init__(self, replica, pin=True):
+        self.replica = replica
+        # pin: una escritura pasa las lecturas siguientes al primario
+        self.pin = pin
+        self.wrote = False
+
+
+current_routing = contextvars.ContextVar("genomics_db_routing", default=None)
+
+
+def replica_enabled():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def routing(replica, pin=True):
+    state = RoutingState(replica and replica_enabled(), pin)
+    token = current_routing.set(state)
+    try:
+        yield state
+    finally:
+        current_routing.reset(token)
+
+
+def replica_reads():
+    """Lecturas analíticas fuera de una petición: toleran el retraso de la réplica
+    y sus propias escrituras (p. ej. el progreso del trabajo) no las desvían."""
+    return routing(True, pin=False)
+
+
+def primary_reads():
+    """Lecturas que no pueden ver datos atrasados aunque se esté en un GET."""
+    return routing(False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = current_routing.get()
+        if (state is not None and state.replica and not state.wrote
+                and model._meta.app_label not in PRIMARY_ONLY_APPS):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = current_routing.get()
+        if state is not None and state.pin and model._meta.app_label not in UNPINNED_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mismos datos en ambos alias
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,25 @@
+from drf_spectacular.utils import OpenApiParameter
+
+
+class ExpandError(ValueError):
+    pass
+
+
+def expand_parameter(allowed):
+    return OpenApiParameter(
+        "expand", str,
+        description="Relaciones a anidar en la respuesta, separadas por coma: "
+                    + ", ".join(allowed) + ". Se resuelven con una única consulta (select_related).",
+    )
+
+
+def parse_expand(request, allowed):
+    raw = request.query_params.get("expand", "")
+    expand = {item.strip() for item in raw.split(",") if item.strip()}
+    unknown = expand - set(allowed)
+    if unknown:
+        raise ExpandError(
+            f"Valores de expand no soportados: {', '.join(sorted(unknown))}. "
+            f"Use: {', '.join(allowed)}"
+        )
+    return expand
@@ -0,0 +1,79 @@
+import io
+
+import pyarrow as pa
+from django.conf import settings
+from django.db import models
+from django.http import StreamingHttpResponse
+
+from .filtering import Ordering
+from .renderers import ArrowStreamRenderer
+
+
+def arrow_type(field):
+    if field.is_relation:
+        return arrow_type(field.target_field)
+    if isinstance(field, models.UUIDField):
+        return pa.binary(16)
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, (models.BigIntegerField, models.BigAutoField)):
+        return pa.int64()
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return pa.int32()
+    return pa.string()
+
+
+def export_columns(model, names):
+    # Columnas en el mismo orden y con los mismos nombres que el serializer
+    fields = [model._meta.get_field(name) for name in names]
+    schema = pa.schema([pa.field(field.name, arrow_type(field)) for field in fields])
+    return [field.attname for field in fields], schema
+
+
+def iter_value_chunks(queryset, attnames, chunk_size, ordering=None):
+    # Keyset igual que el streaming JSON (por PK salvo otro orden); el PK va
+    # siempre primero
+    ordering = ordering or Ordering(queryset.model)
+    columns = [queryset.model._meta.pk.attname, *attnames]
+    extra, key = ordering.key_reader(columns)
+    queryset = queryset.order_by(*ordering.order_by).values_list(*columns, *extra)
+    last_key = None
+    while True:
+        page = queryset if last_key is None else ordering.after(queryset, last_key)
+        rows = list(page[:chunk_size])
+        if not rows:
+            return
+        last_key = key(rows[-1])
+        # Las columnas agregadas solo para la clave no se entregan
+        yield [row[:len(columns)] for row in rows] if extra else rows
+        if len(rows) < chunk_size:
+            return
+
+
+def record_batch(rows, schema):
+    columns = list(zip(*rows))[1:]
+    arrays = []
+    for column, field in zip(columns, schema):
+        if pa.types.is_fixed_size_binary(field.type):
+            column = [value.bytes if value is not None else None for value in column]
+        arrays.append(pa.array(column, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def arrow_stream_response(queryset, names, ordering=None):
+    attnames, schema = export_columns(queryset.model, names)
+
+    def content():
+        buffer = io.BytesIO()
+        with pa.ipc.new_stream(buffer, schema) as writer:
+            for rows in iter_value_chunks(queryset, attnames, settings.LIST_STREAM_CHUNK_SIZE, ordering):
+                writer.write_batch(record_batch(rows, schema))
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        # Esquema (si no hubo filas) y marca de fin de stream
+        yield buffer.getvalue()
+
+    return StreamingHttpResponse(content(), content_type=ArrowStreamRenderer.media_type)
@@ -0,0 +1,80 @@
+import orjson
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+
+class FastSerializer:
+    """Serialización de solo lectura desde .values_list() codificada con orjson.
+
+    Produce los mismos bytes que el ModelSerializer renderizado con el
+    JSONRenderer de DRF, sin instanciar modelos ni recorrer los campos de DRF
+    fila por fila. Solo admite serializers planos (sin anidados).
+    """
+
+    def __init__(self, serializer_class):
+        fields = serializer_class().fields
+        model = serializer_class.Meta.model
+        self.names = list(fields)
+        self.attnames = [model._meta.get_field(name).attname for name in self.names]
+        self.pk_name = model._meta.pk.name
+        # Los decimales se formatean con el propio campo de DRF (cuantizado a
+        # string); el resto de tipos los codifica orjson igual que DRF.
+        self.converters = [
+            (index, field.to_representation)
+            for index, field in enumerate(fields.values())
+            if isinstance(field, serializers.DecimalField)
+        ]
+
+    @staticmethod
+    def supports(serializer_class):
+        return not any(
+            isinstance(field, serializers.BaseSerializer)
+            for field in serializer_class().fields.values()
+        )
+
+    def row(self, values):
+        if self.converters:
+            values = list(values)
+            for index, convert in self.converters:
+                if values[index] is not None:
+                    values[index] = convert(values[index])
+        return dict(zip(self.names, values))
+
+    def rows(self, queryset):
+        return [self.row(values) for values in queryset.values_list(*self.attnames)]
+
+    def get(self, queryset):
+        values = queryset.values_list(*self.attnames).first()
+        return None if values is None else self.row(values)
+
+    @staticmethod
+    def dumps(data):
+        # Igual que JSONRenderer: U+2028 y U+2029 siempre escapados
+        return (
+            orjson.dumps(data)
+            .replace("\u2028".encode(), b"\\u2028")
+            .replace("\u2029".encode(), b"\\u2029")
+        )
+
+    def response(self, data, status=200):
+        return HttpResponse(self.dumps(data), status=status, content_type=JSONRenderer.media_type)
+
+
+_fast_serializers = {}
+
+
+def fast_serializer_for(request, serializer_class):
+    # Solo para JSON sin parámetros de formato (p. ej. indent) y serializers planos
+    if not settings.FAST_SERIALIZATION:
+        return None
+    if not isinstance(getattr(request, "accepted_renderer", None), JSONRenderer):
+        return None
+    if ";" in (request.accepted_media_type or ""):
+        return None
+    if serializer_class not in _fast_serializers:
+        _fast_serializers[serializer_class] = (
+            FastSerializer(serializer_class) if FastSerializer.supports(serializer_class) else None
+        )
+    return _fast_serializers[serializer_class]
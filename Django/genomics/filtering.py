@@ -0,0 +1,228 @@
+"""
+Filtros, orden y proyección de campos (?fields=) de los listados.
+
+Cada recurso declara sus filtros y los campos por los que se puede ordenar
+junto a sus expansiones (p. ej. VARIANT_FILTERS en variants/serializers.py);
+genomics.pagination.list_response los aplica a todos los formatos de salida.
+"""
+import base64
+import binascii
+import json
+import uuid
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+
+class ListParamError(ValueError):
+    pass
+
+
+def _parse_int(raw):
+    return int(raw)
+
+
+def _parse_decimal(raw):
+    value = Decimal(raw)
+    if not value.is_finite():
+        raise ValueError(raw)
+    return value
+
+
+PARSERS = {
+    str: str,
+    int: _parse_int,
+    date: date.fromisoformat,
+    Decimal: _parse_decimal,
+    uuid.UUID: uuid.UUID,
+}
+
+
+class Filter:
+    """Parámetro de consulta -> lookup del ORM. Con many=True admite varios
+    valores separados por coma (lookup __in)."""
+
+    def __init__(self, param, lookup, type=str, many=False, description=""):
+        self.param = param
+        self.lookup = f"{lookup}__in" if many else lookup
+        self.parse = PARSERS[type]
+        self.type = type
+        self.many = many
+        self.description = description
+
+    def value(self, raw):
+        items = [item.strip() for item in raw.split(",")] if self.many else [raw.strip()]
+        try:
+            values = [self.parse(item) for item in items if item]
+        except (ValueError, InvalidOperation):
+            raise ListParamError(f"Valor inválido para {self.param}: {raw}")
+        if not values:
+            raise ListParamError(f"El parámetro {self.param} no puede estar vacío")
+        return values if self.many else values[0]
+
+    def parameter(self):
+        description = self.description
+        if self.many:
+            description += " Admite varios valores separados por coma."
+        # Las listas separadas por coma y las fechas se documentan como texto
+        kind = self.type if self.type in (int, Decimal) and not self.many else str
+        return OpenApiParameter(self.param, kind, description=description)
+
+
+def filter_parameters(filters):
+    return [item.parameter() for item in filters]
+
+
+def apply_filters(request, queryset, filters):
+    conditions = {}
+    for item in filters:
+        raw = request.query_params.get(item.param)
+        if raw is not None:
+            conditions[item.lookup] = item.value(raw)
+    return queryset.filter(**conditions) if conditions else queryset
+
+
+class Ordering:
+    """Orden de un listado: un campo opcional y la PK como desempate.
+
+    La clave de cada fila es (campo, pk) o solo (pk,). Es lo que guardan los
+    cursores y lo que usan los recorridos por keyset para seguir donde quedó
+    la página anterior.
+    """
+
+    def __init__(self, model, name=None, descending=False):
+        self.pk = model._meta.pk
+        self.field = model._meta.get_field(name) if name else None
+        self.descending = descending
+        key_fields = ([self.field] if self.field is not None else []) + [self.pk]
+        self.key_attnames = [field.attname for field in key_fields]
+        self.key_fields = key_fields
+
+    @property
+    def order_by(self):
+        sign = "-" if self.descending else ""
+        return [f"{sign}{attname}" for attname in self.key_attnames]
+
+    def object_key(self, instance):
+        return tuple(getattr(instance, attname) for attname in self.key_attnames)
+
+    def key_reader(self, attnames):
+        # Columnas que hay que agregar a values_list(*attnames) para conocer la
+        # clave de cada fila, y la función que la extrae
+        attnames = list(attnames)
+        extra = [attname for attname in self.key_attnames if attname not in attnames]
+        columns = attnames + extra
+        positions = [columns.index(attname) for attname in self.key_attnames]
+        return extra, lambda row: tuple(row[index] for index in positions)
+
+    def after(self, queryset, key):
+        lookup = "lt" if self.descending else "gt"
+        if self.field is None:
+            return queryset.filter(**{f"pk__{lookup}": key[0]})
+        value, pk = key
+        # (campo, pk) > (valor, último pk), escrito con OR para que use el índice
+        return queryset.filter(
+            Q(**{f"{self.field.attname}__{lookup}": value})
+            | Q(**{self.field.attname: value, f"pk__{lookup}": pk})
+        )
+
+    def encode(self, key):
+        # Sin campo de orden se mantiene el formato original (solo la PK)
+        raw = str(key[0]) if self.field is None else json.dumps([str(value) for value in key])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode(self, cursor):
+        padded = cursor + "=" * (-len(cursor) % 4)
+        try:
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            values = [raw] if self.field is None else json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.key_fields):
+                raise ValueError(raw)
+            return tuple(
+                field.target_field.to_python(value) if field.is_relation else field.to_python(value)
+                for field, value in zip(self.key_fields, values)
+            )
+        except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError):
+            raise ListParamError("Cursor inválido")
+
+
+def ordering_parameter(allowed):
+    return OpenApiParameter(
+        "ordering", str,
+        description="Campo por el que ordenar (prefijo - para descendente): "
+                    + ", ".join(allowed) + ". La PK desempata; compatible con limit/cursor.",
+    )
+
+
+def parse_ordering(request, model, allowed):
+    """Devuelve el Ordering pedido en ?ordering=, o None si no se indicó."""
+    raw = request.query_params.get("ordering", "").strip()
+    if not raw:
+        return None
+    name = raw[1:] if raw.startswith("-") else raw
+    if name not in allowed:
+        raise ListParamError(f"Orden no soportado: {raw}. Use: {', '.join(allowed)}")
+    return Ordering(model, name, descending=raw.startswith("-"))
+
+
+FIELDS_PARAMETER = OpenApiParameter(
+    "fields", str,
+    description="Campos a incluir en cada fila, separados por coma (el id se incluye "
+                "siempre). La consulta solo lee esas columnas.",
+)
+
+_projections = {}
+
+
+def project_serializer(serializer_class, raw):
+    """Subclase del serializer que solo expone los campos pedidos, en el orden
+    del serializer original. Se cachea por combinación de campos."""
+    available = list(serializer_class().fields)
+    requested = {item.strip() for item in raw.split(",") if item.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise ListParamError(
+            f"Campos no soportados: {', '.join(sorted(unknown))}. Use: {', '.join(available)}"
+        )
+    requested.add(serializer_class.Meta.model._meta.pk.name)
+    names = tuple(name for name in available if name in requested)
+    key = (serializer_class, names)
+    if key not in _projections:
+        def get_fields(self):
+            fields = super(projected, self).get_fields()
+            return {name: fields[name] for name in names}
+
+        projected = type(serializer_class.__name__, (serializer_class,), {"get_fields": get_fields})
+        _projections[key] = projected
+    return _projections[key]
+
+
+def project_queryset(queryset, serializer_class):
+    """Limita las columnas leídas a las del serializer (proyectado). Las
+    relaciones anidadas que no se pidieron dejan de cargarse."""
+    only, related = [], []
+    for name, field in serializer_class().fields.items():
+        only.append(name)
+        if isinstance(field, serializers.BaseSerializer):
+            related.append(name)
+    queryset = queryset.only(*only)
+    if isinstance(queryset.query.select_related, dict):
+        # select_related de relaciones no pedidas chocaría con el .only()
+        kept = {name: value for name, value in queryset.query.select_related.items() if name in related}
+        queryset = queryset.select_related(None)
+        if kept:
+            queryset = queryset.select_related(*_related_paths(kept))
+    return queryset
+
+
+def _related_paths(tree, prefix=""):
+    for name, children in tree.items():
+        path = f"{prefix}{name}"
+        if children:
+            yield from _related_paths(children, f"{path}__")
+        else:
+            yield path
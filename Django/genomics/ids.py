@@ -0,0 +1,34 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+# rand_a (12 bits) se usa como contador dentro del mismo milisegundo
+MAX_COUNTER = 0xFFF
+
+
+def uuid7():
+    """UUID versión 7 (RFC 9562): milisegundos Unix en los 48 bits altos, luego
+    un contador de 12 bits y 62 bits aleatorios.
+
+    Los ids nuevos quedan ordenados por creación, así que los INSERT van al
+    final del índice clúster de InnoDB en lugar de repartirse por todo el
+    árbol como con uuid4. Dentro de un proceso son estrictamente crecientes.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms, _counter = ms, 0
+        else:
+            # Mismo milisegundo (o reloj atrasado): se sigue desde el último
+            _counter += 1
+            if _counter > MAX_COUNTER:
+                _last_ms, _counter = _last_ms + 1, 0
+        ms, counter = _last_ms, _counter
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b)
@@ -0,0 +1,123 @@
+import bisect
+import contextvars
+import threading
+import time
+
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: (list(counts), total, count)
+                        for labels, (counts, total, count) in self._series.items()}
+        for (endpoint, method), (counts, total, count) in sorted(snapshot.items()):
+            base = f'endpoint="{endpoint}",method="{method}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "genomics_request_duration_seconds", "Tiempo total de la petición", DURATION_BUCKETS)
+DB_QUERIES = Histogram(
+    "genomics_db_queries", "Consultas SQL por petición", QUERY_BUCKETS)
+DB_DURATION = Histogram(
+    "genomics_db_duration_seconds", "Tiempo en la base de datos por petición", DURATION_BUCKETS)
+GATEWAY_DURATION = Histogram(
+    "genomics_gateway_duration_seconds", "Tiempo en el gateway de Clínica por petición", DURATION_BUCKETS)
+RESPONSE_BYTES = Histogram(
+    "genomics_response_bytes", "Tamaño del cuerpo de la respuesta", BYTES_BUCKETS)
+
+HISTOGRAMS = [REQUEST_DURATION, DB_QUERIES, DB_DURATION, GATEWAY_DURATION, RESPONSE_BYTES]
+
+# Funciones que devuelven líneas adicionales (p. ej. la caché de pacientes)
+_collectors = []
+
+
+def register_collector(collector):
+    _collectors.append(collector)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "gateway_time", "sql", "max_sql", "_lock")
+
+    def __init__(self, max_sql):
+        self.queries = 0
+        self.db_time = 0.0
+        self.gateway_time = 0.0
+        self.sql = []
+        self.max_sql = max_sql
+        self._lock = threading.Lock()
+
+    def record_query(self, sql, elapsed):
+        self.queries += 1
+        self.db_time += elapsed
+        if len(self.sql) < self.max_sql:
+            self.sql.append(sql)
+
+    def record_gateway(self, elapsed):
+        # El lote de reportes valida pacientes desde varios hilos
+        with self._lock:
+            self.gateway_time += elapsed
+
+
+current_stats = contextvars.ContextVar("genomics_request_stats", default=None)
+
+
+class gateway_timer:
+    # Acumula en la petición en curso el tiempo pasado esperando al gateway
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        stats = current_stats.get()
+        if stats is not None:
+            stats.record_gateway(time.perf_counter() - self.started)
+        return False
+
+
+def observe_request(labels, stats, duration, size):
+    REQUEST_DURATION.observe(labels, duration)
+    GATEWAY_DURATION.observe(labels, stats.gateway_time)
+    DB_QUERIES.observe(labels, stats.queries)
+    DB_DURATION.observe(labels, stats.db_time)
+    if size is not None:
+        RESPONSE_BYTES.observe(labels, size)
+
+
+def metrics_view(request):
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.expose())
+    for collector in _collectors:
+        lines.extend(collector())
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4")
@@ -0,0 +1,242 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .db_router import RoutingState, current_routing, replica_enabled
+from .metrics import RequestStats, current_stats, observe_request
+
+logger = logging.getLogger("genomics.slow_requests")
+
+_END = object()
+
+
+@contextmanager
+def instrument_queries(stats):
+    def wrapper(execute, sql, params, many, context):
+        query_started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats.record_query(sql, time.perf_counter() - query_started)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def record_query(execute, sql, params, many, context):
+    # Instalado en todas las conexiones: mide si en el contexto hay una petición
+    # en curso. Bajo ASGI las consultas corren en el hilo de sync_to_async, que
+    # hereda el contexto pero tiene su propia conexión
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    query_started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record_query(sql, time.perf_counter() - query_started)
+
+
+def instrument_connection(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsMiddleware:
+    """Registra por endpoint (nombre de URL resuelto) el tiempo total, las
+    consultas y el tiempo en BD, el tiempo en el gateway y los bytes de la
+    respuesta, y deja en el log las peticiones lentas con su SQL."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.METRICS_ENABLED
+        if self.enabled:
+            # Cada hilo abre su conexión: se instrumentan al crearse
+            connection_created.connect(instrument_connection, dispatch_uid="genomics-metrics")
+            for connection in connections.all(initialized_only=True):
+                instrument_connection(connection)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = RequestStats(settings.METRICS_MAX_CAPTURED_SQL)
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        stats = RequestStats(settings.METRICS_MAX_CAPTURED_SQL)
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats, started)
+
+    def finish(self, request, response, stats, started):
+        match = getattr(request, "resolver_match", None)
+        labels = ((match.url_name or match.view_name) if match else "unresolved", request.method)
+
+        if not response.streaming:
+            self.observe(request, labels, stats, started, len(response.content))
+            return response
+
+        # En streaming el cuerpo se mide al terminar de enviarse
+        content = response.streaming_content
+        if response.is_async:
+            async def measured():
+                size = 0
+                async for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+                self.observe(request, labels, stats, started, size)
+        else:
+            # Las consultas del streaming se ejecutan al iterar el cuerpo, ya
+            # fuera del contexto de la petición (bajo ASGI, en su mismo hilo)
+            def measured():
+                size = 0
+                with instrument_queries(stats):
+                    for chunk in content:
+                        size += len(chunk)
+                        yield chunk
+                self.observe(request, labels, stats, started, size)
+        response.streaming_content = measured()
+        return response
+
+    def observe(self, request, labels, stats, started, size):
+        duration = time.perf_counter() - started
+        observe_request(labels, stats, duration, size)
+        if duration >= settings.METRICS_SLOW_REQUEST_SECONDS:
+            logger.warning(
+                "Petición lenta %s %s (%s): %.3fs, %d consultas en %.3fs, gateway %.3fs, %s bytes\n%s",
+                request.method, request.get_full_path(), labels[0], duration,
+                stats.queries, stats.db_time, stats.gateway_time, size,
+                "\n".join(stats.sql),
+            )
+
+
+class ReplicaRoutingMiddleware:
+    """Los GET leen de la réplica salvo que el cliente haya escrito hace menos
+    de DATABASE_REPLICA_PIN_SECONDS: tras una escritura se le entrega una
+    cookie que fija sus lecturas al primario durante ese lapso."""
+
+    sync_capable = True
+    async_capable = True
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+    PIN_COOKIE = "db_primary"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = replica_enabled()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def reads_replica(self, request):
+        return request.method in self.SAFE_METHODS and self.PIN_COOKIE not in request.COOKIES
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        state = RoutingState(self.reads_replica(request))
+        token = current_routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+
+        if response.streaming and not response.is_async:
+            # Las consultas del streaming se ejecutan al iterar el cuerpo
+            content = response.streaming_content
+
+            def routed():
+                token = current_routing.set(state)
+                try:
+                    yield from content
+                finally:
+                    current_routing.reset(token)
+            response.streaming_content = routed()
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        state = RoutingState(self.reads_replica(request))
+        token = current_routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.finish(request, response, state)
+
+    def finish(self, request, response, state):
+        if state.wrote or request.method not in self.SAFE_METHODS:
+            response.set_cookie(
+                self.PIN_COOKIE, "1", max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True, samesite="Lax",
+            )
+        return response
+
+
+async def _chunks(content):
+    # Cada fragmento se pide por separado en el hilo de la petición (el de la
+    # vista y su conexión a la BD)
+    iterator = iter(content)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await next_chunk(iterator, _END)
+        if chunk is _END:
+            return
+        yield chunk
+
+
+class AsyncStreamingMiddleware:
+    """Bajo ASGI, Django 4.2 consume de una vez (sync_to_async(list)) los cuerpos
+    en streaming con iterador síncrono, así que un listado o una exportación
+    completa quedaría en memoria. Aquí se entregan como iterador asíncrono que
+    genera un fragmento a la vez. Bajo WSGI no hace nada."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if response.streaming and not response.is_async:
+            response.streaming_content = _chunks(response.streaming_content)
+        return response
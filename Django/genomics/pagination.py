@@ -0,0 +1,207 @@
+import base64
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+
+from .exports import arrow_stream_response, iter_value_chunks
+from .fastpath import fast_serializer_for
+from .filtering import (
+    FIELDS_PARAMETER,
+    ListParamError,
+    Ordering,
+    apply_filters,
+    parse_ordering,
+    project_queryset,
+    project_serializer,
+)
+
+STREAM_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+# Arrow exporta la tabla plana y completa: no anida relaciones ni pagina
+ARROW_UNSUPPORTED_PARAMS = ("expand", "stream", "limit", "cursor")
+
+# Parámetros comunes de los listados, para documentarlos en Swagger
+LIST_PARAMETERS = [
+    OpenApiParameter(
+        "limit", int,
+        description="Tamaño de página. Activa la paginación por cursor (keyset sobre la PK).",
+    ),
+    OpenApiParameter(
+        "cursor", str,
+        description="Cursor opaco devuelto en el campo `next` de la página anterior.",
+    ),
+    OpenApiParameter(
+        "stream", str, enum=list(STREAM_CONTENT_TYPES),
+        description="Devuelve el listado completo en streaming (NDJSON o arreglo JSON).",
+    ),
+    FIELDS_PARAMETER,
+]
+
+
+class CursorError(ListParamError):
+    pass
+
+
+def encode_cursor(pk) -> str:
+    # Cursor del orden por defecto (solo la PK)
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def parse_limit(value) -> int:
+    if value in (None, ""):
+        return settings.LIST_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise CursorError("El parámetro limit debe ser un entero")
+    if limit < 1:
+        raise CursorError("El parámetro limit debe ser mayor que 0")
+    return min(limit, settings.LIST_MAX_PAGE_SIZE)
+
+
+def _dumps(data) -> str:
+    # Mismo formato que el JSONRenderer de DRF (compacto y sin escapar unicode)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_keyset_chunks(queryset, chunk_size, ordering=None):
+    # Recorre la tabla por rangos de la clave de orden (la PK por defecto). Se
+    # evita .iterator() porque mysqlclient bufferiza el resultado completo en el
+    # cliente aunque se pida por chunks.
+    ordering = ordering or Ordering(queryset.model)
+    queryset = queryset.order_by(*ordering.order_by)
+    last_key = None
+    while True:
+        page = queryset if last_key is None else ordering.after(queryset, last_key)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_key = ordering.object_key(chunk[-1])
+
+
+def stream_queryset(queryset, serializer_class, fmt, fast=None, ordering=None):
+    chunk_size = settings.LIST_STREAM_CHUNK_SIZE
+
+    if fast is not None:
+        # Camino rápido: filas desde values_list codificadas con orjson
+        def chunks():
+            for rows in iter_value_chunks(queryset, fast.attnames, chunk_size, ordering):
+                yield [fast.dumps(fast.row(values[1:])) for values in rows]
+        sep, newline, open_, close = b",", b"\n", b"[", b"]"
+    else:
+        def chunks():
+            for chunk in iter_keyset_chunks(queryset, chunk_size, ordering):
+                yield [_dumps(row) for row in serializer_class(chunk, many=True).data]
+        sep, newline, open_, close = ",", "\n", "[", "]"
+
+    def ndjson():
+        for rows in chunks():
+            yield newline.join(rows) + newline
+
+    def json_array():
+        yield open_
+        first = True
+        for rows in chunks():
+            body = sep.join(rows)
+            yield body if first else sep + body
+            first = False
+        yield close
+
+    content = ndjson() if fmt == "ndjson" else json_array()
+    return StreamingHttpResponse(content, content_type=STREAM_CONTENT_TYPES[fmt])
+
+
+def keyset_page(request, queryset, serializer_class, fast=None, ordering=None):
+    limit = parse_limit(request.query_params.get("limit"))
+    cursor = request.query_params.get("cursor")
+
+    ordering = ordering or Ordering(queryset.model)
+    queryset = queryset.order_by(*ordering.order_by)
+    if cursor:
+        try:
+            queryset = ordering.after(queryset, ordering.decode(cursor))
+        except ListParamError:
+            raise CursorError("Cursor inválido")
+
+    if fast is not None:
+        # La clave del cursor puede requerir columnas fuera de la proyección
+        extra, key = ordering.key_reader(fast.attnames)
+        values = list(queryset.values_list(*fast.attnames, *extra)[:limit + 1])
+    else:
+        values = list(queryset[:limit + 1])
+
+    next_url = None
+    if len(values) > limit:
+        values = values[:limit]
+        last_key = key(values[-1]) if fast is not None else ordering.object_key(values[-1])
+        next_url = replace_query_param(
+            request.build_absolute_uri(), "cursor", ordering.encode(last_key)
+        )
+
+    if fast is not None:
+        size = len(fast.attnames)
+        rows = [fast.row(row[:size]) for row in values]
+        return fast.response({"next": next_url, "results": rows})
+    return Response({
+        "next": next_url,
+        "results": serializer_class(values, many=True).data,
+    })
+
+
+def list_response(request, queryset, serializer_class, filters=(), orderings=()):
+    """Listado con filtros (filters), orden (orderings: campos admitidos en
+    ?ordering=) y proyección (?fields=) en todos los formatos de salida."""
+    params = request.query_params
+    try:
+        queryset = apply_filters(request, queryset, filters)
+        ordering = parse_ordering(request, queryset.model, orderings)
+        if params.get("fields"):
+            serializer_class = project_serializer(serializer_class, params["fields"])
+            queryset = project_queryset(queryset, serializer_class)
+    except ListParamError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Arrow es siempre una exportación completa y columnar, sin pasar por el
+    # serializer; MessagePack reutiliza el camino normal con otro renderer.
+    if getattr(request.accepted_renderer, "format", None) == "arrow":
+        unsupported = [name for name in ARROW_UNSUPPORTED_PARAMS if name in params]
+        if unsupported:
+            return Response(
+                {"error": f"Parámetros no soportados con el formato Arrow: {', '.join(unsupported)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return arrow_stream_response(queryset, list(serializer_class().fields), ordering)
+
+    fast = fast_serializer_for(request, serializer_class)
+
+    # Sin parámetros se mantiene la respuesta original (lista completa)
+    try:
+        fmt = params.get("stream")
+        if fmt:
+            if fmt not in STREAM_CONTENT_TYPES:
+                raise CursorError("Formato de stream no soportado: use ndjson o json")
+            return stream_queryset(queryset, serializer_class, fmt, fast, ordering)
+
+        if "limit" in params or "cursor" in params:
+            return keyset_page(request, queryset, serializer_class, fast, ordering)
+    except CursorError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if ordering is not None:
+        queryset = queryset.order_by(*ordering.order_by)
+    if fast is not None:
+        return fast.response(fast.rows(queryset))
+    serializer = serializer_class(queryset, many=True)
+    return Response(serializer.data)
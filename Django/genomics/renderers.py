@@ -0,0 +1,80 @@
+import datetime
+import decimal
+import re
+import uuid
+
+import msgpack
+import pyarrow as pa
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+
+# Tipo de extensión MessagePack de los UUID: sus 16 bytes en lugar del texto de 36
+UUID_EXT_TYPE = 1
+# Solo la forma canónica (minúsculas con guiones), la que devuelve str(UUID): el
+# cliente recupera exactamente el texto original
+UUID_TEXT_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def _pack_uuids(data):
+    # Los serializers de DRF entregan los UUID como texto
+    if isinstance(data, str):
+        if len(data) == 36 and UUID_TEXT_RE.fullmatch(data):
+            return msgpack.ExtType(UUID_EXT_TYPE, uuid.UUID(data).bytes)
+        return data
+    if isinstance(data, dict):
+        return {key: _pack_uuids(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_pack_uuids(value) for value in data]
+    return data
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, obj.bytes)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Tipo no serializable en MessagePack: {type(obj).__name__}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Los UUID (los ids y cualquier texto con forma de UUID canónico) van como
+    extensión UUID_EXT_TYPE con sus 16 bytes; decimales y fechas, como texto."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(_pack_uuids(data), default=_msgpack_default, use_bin_type=True)
+
+
+class ArrowStreamRenderer(BaseRenderer):
+    # Los listados construyen el stream Arrow directamente (ver genomics.exports);
+    # este renderer cubre el resto de respuestas, p. ej. los errores.
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        table = pa.Table.from_pylist(rows)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+# Renderers de los listados exportables: JSON por defecto más los binarios
+EXPORT_RENDERERS = list(api_settings.DEFAULT_RENDERER_CLASSES) + [
+    MessagePackRenderer,
+    ArrowStreamRenderer,
+]
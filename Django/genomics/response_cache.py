@@ -0,0 +1,196 @@
+import functools
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from .cache import TTLLRUCache
+from .db_router import primary_reads
+
+VERSION_PREFIX = "response-version:"
+# Versión de lo que no se escribió desde que se creó la caché compartida: leer
+# no escribe sellos. Si la caché se vacía se genera otra época y todo lo
+# guardado antes deja de ser alcanzable
+EPOCH_KEY = "response-epoch"
+
+
+class ResponseCache:
+    """Respuestas GET renderizadas, con clave por recurso y versión.
+
+    Cada recurso tiene una versión de colección y cada objeto la suya; las
+    escrituras las renuevan (al confirmar la transacción) en lugar de borrar
+    entradas. Las versiones están en una caché compartida por todos los
+    procesos (VERSION_ALIAS) y cada uno las recuerda VERSION_CHECK_INTERVAL
+    segundos: tras ese lapso ningún worker sirve datos anteriores a la última
+    escritura confirmada.
+    """
+
+    def __init__(self, config):
+        self.enabled = config["ENABLED"]
+        self.ttl = config["TTL"]
+        self.max_entry_bytes = config["MAX_ENTRY_BYTES"]
+        self.backend = config["BACKEND"]
+        if self.backend == "django":
+            self._store = caches[config["CACHE_ALIAS"]]
+        else:
+            self._store = TTLLRUCache(config["MAX_SIZE"], self.ttl)
+        self._shared = caches[config["VERSION_ALIAS"]]
+        self._versions = TTLLRUCache(config["MAX_SIZE"], config["VERSION_CHECK_INTERVAL"])
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def versions(self, names):
+        keys = [VERSION_PREFIX + name for name in names]
+        found = {key: self._versions.get(key) for key in keys}
+        missing = [key for key, version in found.items() if version is None]
+        if missing:
+            # Una sola consulta a la caché compartida por las que no se recuerden
+            shared = self._shared.get_many([EPOCH_KEY, *missing])
+            epoch = shared.get(EPOCH_KEY)
+            if epoch is None:
+                self._shared.add(EPOCH_KEY, uuid.uuid4().hex, None)
+                epoch = self._shared.get(EPOCH_KEY)
+            for key in missing:
+                found[key] = shared.get(key, epoch)
+                self._versions.set(key, found[key])
+        return [found[key] for key in keys]
+
+    def version(self, name):
+        return self.versions([name])[0]
+
+    def bump(self, name):
+        key = VERSION_PREFIX + name
+        version = uuid.uuid4().hex
+        self._shared.set(key, version, None)
+        self._versions.set(key, version)
+
+    def invalidate(self, resource, object_id=None):
+        # Tras el commit: antes, otra petición podría cachear los datos viejos
+        # con la versión nueva
+        def bump():
+            self.bump(resource)
+            if object_id is not None:
+                self.bump(f"{resource}:{object_id}")
+        transaction.on_commit(bump)
+
+    def key(self, request, resource, object_id=None, depends=()):
+        names = [resource if object_id is None else f"{resource}:{object_id}", *depends]
+        raw = "|".join([
+            request.get_host(),
+            request.get_full_path(),
+            request.accepted_media_type or "",
+            *self.versions(names),
+        ])
+        return f"response:{resource}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    def get(self, key):
+        entry = self._store.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key, etag, content, content_type):
+        if len(content) <= self.max_entry_bytes:
+            self._store.set(key, (etag, content, content_type), self.ttl)
+
+    def clear(self):
+        self._store.clear()
+        self._versions.clear()
+
+    def stats(self):
+        stats = {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "notModified": self.not_modified,
+        }
+        if isinstance(self._store, TTLLRUCache):
+            stats["size"] = len(self._store)
+            stats["evictions"] = self._store.evictions
+        return stats
+
+    def conditional(self, request, etag, response):
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            if "*" in etags or etag in etags or f"W/{etag}" in etags:
+                with self._lock:
+                    self.not_modified += 1
+                response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE)
+
+
+def etag_for(content):
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def cached_response(resource, object_kwarg=None, depends=()):
+    """Cachea el GET de un APIView (ya negociado el formato) y responde 304
+    cuando el If-None-Match coincide. Solo se guardan respuestas 200 que no
+    sean streaming."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if not response_cache.enabled:
+                return method(view, request, *args, **kwargs)
+
+            object_id = kwargs.get(object_kwarg) if object_kwarg else None
+            key = response_cache.key(request, resource, object_id, depends)
+            entry = response_cache.get(key)
+            if entry is not None:
+                etag, content, content_type = entry
+                return response_cache.conditional(
+                    request, etag, HttpResponse(content, content_type=content_type)
+                )
+
+            # Lo que se guarda no puede venir de la réplica: con su retraso
+            # quedarían datos viejos bajo la versión ya renovada
+            with primary_reads():
+                response = method(view, request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            # Se renderiza aquí para poder guardar los bytes; dispatch vuelve a
+            # finalizarla pero el render ya no se repite
+            response = view.finalize_response(request, response, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            etag = etag_for(response.content)
+            response_cache.set(key, etag, response.content, response["Content-Type"])
+            return response_cache.conditional(request, etag, response)
+        return wrapper
+    return decorator
+
+
+def cache_metrics():
+    stats = response_cache.stats()
+    lines = [
+        "# TYPE genomics_response_cache_hits_total counter",
+        f"genomics_response_cache_hits_total {stats['hits']}",
+        "# TYPE genomics_response_cache_misses_total counter",
+        f"genomics_response_cache_misses_total {stats['misses']}",
+        "# TYPE genomics_response_cache_not_modified_total counter",
+        f"genomics_response_cache_not_modified_total {stats['notModified']}",
+    ]
+    if "size" in stats:
+        lines += [
+            "# TYPE genomics_response_cache_size gauge",
+            f"genomics_response_cache_size {stats['size']}",
+            "# TYPE genomics_response_cache_evictions_total counter",
+            f"genomics_response_cache_evictions_total {stats['evictions']}",
+        ]
+    return lines
@@ -42,12 +42,18 @@ INSTALLED_APPS = [
     'genes',
     'variants',
     'reports',
+    'jobs',
     # 'corsheaders',
     'drf_spectacular',
     'drf_spectacular_sidecar',
 ]
 
 MIDDLEWARE = [
+    # Primero: envuelve el streaming que arman los siguientes (solo bajo ASGI)
+    'genomics.middleware.AsyncStreamingMiddleware',
+    'genomics.middleware.MetricsMiddleware',
+    'genomics.middleware.ReplicaRoutingMiddleware',
+    'jobs.middleware.JobInvalidationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     # 'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -100,10 +106,33 @@ DATABASES = {
         'USER': os.environ.get('MYSQL_USER', 'root'),
         'PASSWORD': os.environ.get('MYSQL_PASSWORD', 'Cris123+@'),
         'HOST': os.environ.get('MYSQL_HOST', 'mysql-service'),  # nombre del servicio MySQL en Kubernetes
-        'PORT': os.environ.get('MYSQL_PORT', '3306')
+        'PORT': os.environ.get('MYSQL_PORT', '3306'),
+        # Una conexión por petición: bajo ASGI (uvicorn, el servidor de la imagen)
+        # cada petición corre en un hilo nuevo, así que una conexión persistente
+        # no se reutiliza y queda abierta hasta que se recolecta el hilo. Solo
+        # conviene subirlo sirviendo por WSGI; las persistentes se comprueban
+        # antes de usarlas tras un error o un reinicio de MySQL
+        'CONN_MAX_AGE': int(os.environ.get('MYSQL_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Réplica de lectura opcional (MYSQL_REPLICA_HOST): los GET y las exportaciones
+# leen de ella; las escrituras y las lecturas tras una escritura van al primario
+if os.environ.get('MYSQL_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['MYSQL_REPLICA_HOST'],
+        'PORT': os.environ.get('MYSQL_REPLICA_PORT', DATABASES['default']['PORT']),
+        'USER': os.environ.get('MYSQL_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('MYSQL_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['genomics.db_router.PrimaryReplicaRouter']
+# Segundos durante los que un cliente que escribió sigue leyendo del primario
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get('DATABASE_REPLICA_PIN_SECONDS', '5'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -156,3 +185,130 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
 }
 
+# Paginación por cursor y streaming de los listados
+LIST_PAGE_SIZE = int(os.environ.get('LIST_PAGE_SIZE', '100'))
+LIST_MAX_PAGE_SIZE = int(os.environ.get('LIST_MAX_PAGE_SIZE', '1000'))
+LIST_STREAM_CHUNK_SIZE = int(os.environ.get('LIST_STREAM_CHUNK_SIZE', '2000'))
+
+# Índice de intervalos en memoria para consultas por región (segundos de vigencia)
+VARIANT_INDEX_TTL = int(os.environ.get('VARIANT_INDEX_TTL', '300'))
+
+# Índice de búsqueda de genes en memoria (segundos de vigencia en los workers
+# que no recibieron la escritura)
+GENE_SEARCH_TTL = int(os.environ.get('GENE_SEARCH_TTL', '300'))
+GENE_SEARCH_MAX_RESULTS = int(os.environ.get('GENE_SEARCH_MAX_RESULTS', '100'))
+
+# Registro en memoria id <-> símbolo de los genes. El sello de versión vive en
+# CACHES[CACHE_ALIAS], que debe ser compartida entre workers (por defecto la de
+# la BD); se comprueba cada CHECK_INTERVAL segundos y la copia se recarga
+# siempre tras TTL
+GENE_REGISTRY = {
+    'CACHE_ALIAS': os.environ.get('GENE_REGISTRY_CACHE_ALIAS', 'shared'),
+    'CHECK_INTERVAL': float(os.environ.get('GENE_REGISTRY_CHECK_INTERVAL', '1')),
+    'TTL': int(os.environ.get('GENE_REGISTRY_TTL', '300')),
+}
+
+# Importación masiva de VCF
+VCF_IMPORT_BATCH_SIZE = int(os.environ.get('VCF_IMPORT_BATCH_SIZE', '5000'))
+# Upsert masivo de variantes por clave natural (elementos por petición)
+VARIANT_UPSERT_MAX_ITEMS = int(os.environ.get('VARIANT_UPSERT_MAX_ITEMS', '10000'))
+
+# Cliente del gateway de Clínica
+GATEWAY_CONNECT_TIMEOUT = float(os.environ.get('GATEWAY_CONNECT_TIMEOUT', '1'))
+GATEWAY_TIMEOUT = float(os.environ.get('GATEWAY_TIMEOUT', '5'))
+GATEWAY_RETRIES = int(os.environ.get('GATEWAY_RETRIES', '2'))
+GATEWAY_BACKOFF_FACTOR = float(os.environ.get('GATEWAY_BACKOFF_FACTOR', '0.1'))
+GATEWAY_BACKOFF_JITTER = float(os.environ.get('GATEWAY_BACKOFF_JITTER', '0.1'))
+# Fallos consecutivos que abren el circuito y segundos hasta la prueba half-open
+GATEWAY_BREAKER_THRESHOLD = int(os.environ.get('GATEWAY_BREAKER_THRESHOLD', '5'))
+GATEWAY_BREAKER_RESET = float(os.environ.get('GATEWAY_BREAKER_RESET', '30'))
+GATEWAY_POOL_SIZE = int(os.environ.get('GATEWAY_POOL_SIZE', '20'))
+GATEWAY_MAX_WORKERS = int(os.environ.get('GATEWAY_MAX_WORKERS', '20'))
+REPORT_BULK_MAX_ITEMS = int(os.environ.get('REPORT_BULK_MAX_ITEMS', '10000'))
+
+# Caché de existencia de pacientes. BACKEND 'local' (LRU por proceso) o
+# 'django' (usa CACHES[CACHE_ALIAS], compartida entre workers si el backend lo es)
+PATIENT_CACHE = {
+    'BACKEND': os.environ.get('PATIENT_CACHE_BACKEND', 'local'),
+    'CACHE_ALIAS': os.environ.get('PATIENT_CACHE_ALIAS', 'default'),
+    'TTL': int(os.environ.get('PATIENT_CACHE_TTL', '300')),
+    'NEGATIVE_TTL': int(os.environ.get('PATIENT_CACHE_NEGATIVE_TTL', '30')),
+    'MAX_SIZE': int(os.environ.get('PATIENT_CACHE_MAX_SIZE', '10000')),
+}
+
+# Serialización rápida (values + orjson) en los GET de listados y detalle
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', '1') == '1'
+
+# Métricas por endpoint expuestas en /metrics (formato Prometheus, por proceso)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_SLOW_REQUEST_SECONDS = float(os.environ.get('METRICS_SLOW_REQUEST_SECONDS', '1'))
+METRICS_MAX_CAPTURED_SQL = int(os.environ.get('METRICS_MAX_CAPTURED_SQL', '50'))
+
+# Caché de Django para los backends 'django' de PATIENT_CACHE y RESPONSE_CACHE.
+# Redis: CACHE_BACKEND=django.core.cache.backends.redis.RedisCache y
+# CACHE_LOCATION=redis://redis-service:6379/0 (requiere redis); memcached local:
+# django.core.cache.backends.memcached.PyMemcacheCache y 127.0.0.1:11211 (requiere pymemcache)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+    # Compartida entre todos los procesos: sellos de versión de la caché de
+    # respuestas y del registro de genes. Por defecto en la BD (tabla creada con
+    # python manage.py createcachetable); con Redis o memcached se puede apuntar
+    # SHARED_CACHE_BACKEND/SHARED_CACHE_LOCATION al mismo servidor que 'default'
+    'shared': {
+        'BACKEND': os.environ.get('SHARED_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.environ.get('SHARED_CACHE_LOCATION', 'genomics_shared_cache'),
+        # Un sello por recurso y por objeto escrito. Al pasar el límite se vacía
+        # entera (CULL_FREQUENCY 0): descartar solo algunos sellos devolvería
+        # objetos escritos a una versión anterior
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('SHARED_CACHE_MAX_ENTRIES', '100000')),
+            'CULL_FREQUENCY': 0,
+        },
+    },
+}
+
+# Caché de respuestas GET de genes y variantes con ETag / If-None-Match.
+# BACKEND 'local' guarda los cuerpos en cada worker y 'django' en
+# CACHES[CACHE_ALIAS]. Las versiones que invalidan las respuestas viven siempre
+# en CACHES[VERSION_ALIAS] (compartida): una escritura en un worker deja de
+# servirse en los demás a lo sumo VERSION_CHECK_INTERVAL segundos después
+RESPONSE_CACHE = {
+    'ENABLED': os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1',
+    'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'local'),
+    'CACHE_ALIAS': os.environ.get('RESPONSE_CACHE_ALIAS', 'default'),
+    'VERSION_ALIAS': os.environ.get('RESPONSE_CACHE_VERSION_ALIAS', 'shared'),
+    'VERSION_CHECK_INTERVAL': float(os.environ.get('RESPONSE_CACHE_VERSION_CHECK_INTERVAL', '1')),
+    'TTL': int(os.environ.get('RESPONSE_CACHE_TTL', '300')),
+    'MAX_SIZE': int(os.environ.get('RESPONSE_CACHE_MAX_SIZE', '2000')),
+    'MAX_ENTRY_BYTES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRY_BYTES', str(1024 * 1024))),
+}
+
+# Snapshot en memoria de los reportes para las estadísticas de cohorte (segundos
+# de vigencia). Ocupa unos 40 bytes por reporte en cada worker que lo use
+COHORT_STATS_TTL = int(os.environ.get('COHORT_STATS_TTL', '300'))
+
+# Trabajos en segundo plano (python manage.py run_jobs). JOBS_DIR guarda los
+# archivos subidos y generados; debe ser compartido entre la API y los workers
+JOBS_DIR = os.environ.get('JOBS_DIR', str(BASE_DIR / 'job-files'))
+JOBS_WORKER_PROCESSES = int(os.environ.get('JOBS_WORKER_PROCESSES', '2'))
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', '1'))
+# Segundos mínimos entre actualizaciones de progreso (y comprobaciones de cancelación)
+JOBS_PROGRESS_INTERVAL = float(os.environ.get('JOBS_PROGRESS_INTERVAL', '1'))
+# Un trabajo en curso sin latido durante este tiempo vuelve a la cola
+JOBS_STALE_SECONDS = int(os.environ.get('JOBS_STALE_SECONDS', '120'))
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', '3'))
+JOBS_RETENTION_DAYS = int(os.environ.get('JOBS_RETENTION_DAYS', '7'))
+# Las invalidaciones que hace un trabajo solo alcanzan al proceso de run_jobs:
+# cada proceso de la API revisa cada tantos segundos los trabajos terminados y
+# repite las suyas (índices, registro de genes y caché de respuestas), así que
+# sirve datos viejos a lo sumo este lapso aun con las cachés por proceso
+JOBS_INVALIDATION_INTERVAL = float(os.environ.get('JOBS_INVALIDATION_INTERVAL', '2'))
+
+# Filas por lote (y transacción) en el borrado masivo de genes, variantes y reportes
+PURGE_CHUNK_SIZE = int(os.environ.get('PURGE_CHUNK_SIZE', '1000'))
+# DELETE /genes/{id}/ y /variants/{id}/ borran en la petición hasta estas filas
+# (variantes más reportes); con más, encolan el purgado y responden 202
+PURGE_SYNC_LIMIT = int(os.environ.get('PURGE_SYNC_LIMIT', '5000'))
@@ -19,6 +19,7 @@ from django.urls import path, include
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
+from genomics.metrics import metrics_view
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
@@ -40,6 +41,8 @@ urlpatterns = [
     path("genes/", include("genes.urls")),
     path("variants/", include("variants.urls")),
     path("reports/", include("reports.urls")),
+    path("jobs/", include("jobs.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path('openapi/', SpectacularAPIView.as_view(), name='schema'),    # Swagger UI
     path('swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui')
 
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'genomics.settings')
 
 application = get_wsgi_application()
+
+# Registro de genes cargado al arrancar cada worker y no en la primera petición
+# (AppConfig.ready no debe consultar la BD: también corre en migrate)
+from genes.registry import gene_registry  # noqa: E402
+
+gene_registry.load()
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "progress", "total", "attempts", "createdAt", "finishedAt")
+    list_filter = ("status", "kind")
+    readonly_fields = ("createdAt", "startedAt", "finishedAt", "heartbeatAt")
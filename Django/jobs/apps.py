@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self):
+        from genomics.metrics import register_collector
+        from . import tasks  # noqa: F401
+        from .queue import job_metrics
+
+        register_collector(job_metrics)
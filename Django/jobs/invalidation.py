@@ -0,0 +1,84 @@
+"""
+Invalidación en la API de lo que cambió un trabajo en segundo plano.
+
+Los trabajos corren en el proceso de run_jobs: sus invalidaciones solo llegan
+a las copias en memoria de ese proceso (y a las cachés por proceso, que son las
+de por defecto). La tabla de trabajos hace de sello compartido: cada proceso de
+la API busca cada JOBS_INVALIDATION_INTERVAL segundos los trabajos terminados
+desde la última búsqueda y repite localmente las invalidaciones que les tocan.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from genes.registry import gene_registry
+from genes.search import gene_search
+from genomics.response_cache import response_cache
+from variants.intervals import variant_index
+from .models import Job
+
+# Se vuelve a mirar este margen hacia atrás: cubre relojes desfasados entre el
+# worker y la API y trabajos cuyo commit llegó tarde
+MARGIN = timedelta(seconds=30)
+
+
+def _variants_changed(params):
+    variant_index.invalidate()
+    response_cache.invalidate("variant")
+    response_cache.invalidate("variant-bulk")
+
+
+def _gene_purged(params):
+    _variants_changed(params)
+    gene_id = params["gene_id"]
+    response_cache.invalidate("gene", gene_id)
+    gene_search.remove(gene_id)
+    gene_registry.forget(gene_id)
+
+
+# kind -> invalidación local. Vale también para trabajos fallidos o cancelados:
+# los lotes ya confirmados quedan escritos
+INVALIDATIONS = {
+    "variants.import_vcf": _variants_changed,
+    "variants.purge": _variants_changed,
+    "genes.purge": _gene_purged,
+}
+
+
+class JobInvalidations:
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        # Lo terminado antes de arrancar el proceso ya está en lo que se cargue
+        self._since = timezone.now()
+        # Trabajos ya aplicados que siguen dentro del margen
+        self._seen = set()
+
+    def due(self):
+        return time.monotonic() - self._checked_at >= self.interval
+
+    def check(self):
+        if not self.due():
+            return
+        with self._lock:
+            if not self.due():
+                return
+            self._checked_at = time.monotonic()
+            started = timezone.now()
+            finished = Job.objects.filter(
+                kind__in=INVALIDATIONS, status__in=Job.FINISHED, finishedAt__gte=self._since - MARGIN,
+            ).values_list("pk", "kind", "params")
+            seen = set()
+            for pk, kind, params in finished:
+                seen.add(pk)
+                if pk not in self._seen:
+                    INVALIDATIONS[kind](params)
+            self._seen = seen
+            self._since = started
+
+
+job_invalidations = JobInvalidations(settings.JOBS_INVALIDATION_INTERVAL)
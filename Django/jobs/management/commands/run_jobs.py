@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.queue import claim, delete_expired, heartbeat, release, requeue_stale, run_job
+from jobs.worker import init_process
+
+# Segundos entre limpiezas de trabajos vencidos
+CLEANUP_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = ("Worker de trabajos en segundo plano: reclama trabajos de la cola en la BD "
+            "y los ejecuta en un pool de procesos. Se pueden correr varios workers a la vez.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=settings.JOBS_WORKER_PROCESSES,
+                            help="Trabajos simultáneos (procesos del pool)")
+        parser.add_argument("--poll-interval", type=float, default=settings.JOBS_POLL_INTERVAL,
+                            help="Segundos entre consultas a la cola cuando está vacía")
+        parser.add_argument("--once", action="store_true",
+                            help="Termina cuando la cola queda vacía")
+
+    def new_pool(self, processes):
+        return ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_process,
+        )
+
+    def handle(self, *args, **options):
+        processes = options["processes"]
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        stop = threading.Event()
+        # SIGTERM (Kubernetes) o Ctrl+C: deja de reclamar y termina los trabajos en curso
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+        self.stdout.write(f"Worker {worker} con {processes} procesos")
+        pool = self.new_pool(processes)
+        running = {}
+        last_cleanup = 0.0
+        try:
+            while running or not stop.is_set():
+                requeue_stale()
+                heartbeat(running.values())
+                if time.monotonic() - last_cleanup > CLEANUP_INTERVAL:
+                    delete_expired()
+                    last_cleanup = time.monotonic()
+
+                while len(running) < processes and not stop.is_set():
+                    job_id = claim(worker)
+                    if job_id is None:
+                        break
+                    self.stdout.write(f"Trabajo {job_id} iniciado")
+                    running[pool.submit(run_job, job_id)] = job_id
+
+                if not running:
+                    if options["once"] or stop.is_set():
+                        break
+                    stop.wait(options["poll_interval"])
+                    continue
+
+                done, _ = wait(running, timeout=options["poll_interval"], return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job_id = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        self.stdout.write(f"Trabajo {job_id} terminado")
+                        continue
+                    # El proceso murió (p. ej. sin memoria) sin registrar el resultado
+                    self.stderr.write(f"Trabajo {job_id} interrumpido: {error!r}")
+                    release(job_id, f"Proceso del worker interrumpido: {error!r}")
+                    broken = broken or isinstance(error, BrokenProcessPool)
+                if broken:
+                    for job_id in running.values():
+                        release(job_id, "Proceso del worker interrumpido")
+                    running.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self.new_pool(processes)
+        finally:
+            pool.shutdown(wait=True)
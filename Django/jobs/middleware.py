@@ -0,0 +1,28 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from .invalidation import job_invalidations
+
+
+class JobInvalidationMiddleware:
+    """Antes de atender, aplica las invalidaciones de los trabajos terminados
+    en el worker (ver jobs.invalidation). Consulta la BD a lo sumo una vez
+    cada JOBS_INVALIDATION_INTERVAL segundos por proceso."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        job_invalidations.check()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if job_invalidations.due():
+            await sync_to_async(job_invalidations.check, thread_sensitive=True)()
+        return await self.get_response(request)
@@ -0,0 +1,39 @@
+from django.db import models
+
+from genomics.ids import uuid7
+
+
+class Job(models.Model):
+    # Trabajo en segundo plano; la propia tabla es la cola (ver jobs/queue.py)
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    STATUS_CHOICES = [(status, status) for status in (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)]
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    params = models.JSONField(default=dict)
+    progress = models.BigIntegerField(default=0)
+    total = models.BigIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    cancelRequested = models.BooleanField(default=False)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default="")
+    createdAt = models.DateTimeField(auto_now_add=True)
+    startedAt = models.DateTimeField(null=True, blank=True)
+    finishedAt = models.DateTimeField(null=True, blank=True)
+    heartbeatAt = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Reclamo del siguiente trabajo: status = 'queued' ORDER BY createdAt
+            models.Index(fields=["status", "createdAt"], name="job_status_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Job {self.id} {self.kind} ({self.status})"
@@ -0,0 +1,178 @@
+import logging
+import shutil
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger("jobs")
+
+# kind -> función(context, **params); se registran en jobs/tasks.py
+TASKS = {}
+
+
+def task(kind):
+    def decorator(function):
+        TASKS[kind] = function
+        return function
+    return decorator
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def job_dir(job_id):
+    return Path(settings.JOBS_DIR) / str(job_id)
+
+
+def enqueue(kind, params=None, files=None):
+    """Crea un trabajo en cola. files: {nombre: archivo subido} que se copian al
+    directorio del trabajo antes de que un worker pueda reclamarlo."""
+    if kind not in TASKS:
+        raise ValueError(f"Tipo de trabajo desconocido: {kind}")
+    job = Job(kind=kind, params=params or {})
+    if files:
+        directory = job_dir(job.id)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, upload in files.items():
+            with open(directory / name, "wb") as destination:
+                for chunk in upload.chunks():
+                    destination.write(chunk)
+    job.save()
+    return job
+
+
+def cancel(job_id):
+    """Cancela un trabajo en cola al instante; uno en curso se detiene en su
+    siguiente reporte de progreso. Devuelve False si ya había terminado."""
+    now = timezone.now()
+    if Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+        status=Job.CANCELLED, cancelRequested=True, finishedAt=now,
+    ):
+        return True
+    return bool(Job.objects.filter(pk=job_id, status=Job.RUNNING).update(cancelRequested=True))
+
+
+def claim(worker):
+    # skip_locked: varios workers reclaman en paralelo sin esperarse entre sí.
+    # El update condicionado cubre los motores sin SELECT ... FOR UPDATE (SQLite)
+    with transaction.atomic():
+        job_id = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED).order_by("createdAt")
+            .values_list("pk", flat=True).first()
+        )
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, startedAt=now, heartbeatAt=now,
+            attempts=F("attempts") + 1,
+        )
+    return job_id if claimed else None
+
+
+def heartbeat(job_ids):
+    if job_ids:
+        Job.objects.filter(pk__in=list(job_ids), status=Job.RUNNING).update(heartbeatAt=timezone.now())
+
+
+def release(job_id, error):
+    # El proceso que ejecutaba el trabajo murió: se reintenta hasta JOBS_MAX_ATTEMPTS
+    running = Job.objects.filter(pk=job_id, status=Job.RUNNING)
+    running.filter(cancelRequested=True).update(status=Job.CANCELLED, error=error, finishedAt=timezone.now())
+    running.filter(attempts__lt=settings.JOBS_MAX_ATTEMPTS).update(
+        status=Job.QUEUED, worker="", error=error,
+    )
+    running.update(status=Job.FAILED, error=error, finishedAt=timezone.now())
+
+
+def requeue_stale():
+    limit = timezone.now() - timedelta(seconds=settings.JOBS_STALE_SECONDS)
+    for job_id in Job.objects.filter(status=Job.RUNNING, heartbeatAt__lt=limit).values_list("pk", flat=True):
+        logger.warning("Trabajo %s sin latido desde hace %ss", job_id, settings.JOBS_STALE_SECONDS)
+        release(job_id, "El worker dejó de responder")
+
+
+def delete_expired():
+    # Trabajos terminados (y sus archivos) con más de JOBS_RETENTION_DAYS
+    limit = timezone.now() - timedelta(days=settings.JOBS_RETENTION_DAYS)
+    expired = list(
+        Job.objects.filter(status__in=Job.FINISHED, finishedAt__lt=limit).values_list("pk", flat=True)[:1000]
+    )
+    for job_id in expired:
+        shutil.rmtree(job_dir(job_id), ignore_errors=True)
+    Job.objects.filter(pk__in=expired).delete()
+    return len(expired)
+
+
+class JobContext:
+    """Lo que recibe cada tarea: rutas de sus archivos y el reporte de progreso,
+    que también es el punto donde se atiende la cancelación."""
+
+    def __init__(self, job):
+        self.job = job
+        self._reported = 0.0
+
+    def path(self, name):
+        directory = job_dir(self.job.pk)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / name
+
+    def progress(self, done, total=None, force=False):
+        now = time.monotonic()
+        if not force and now - self._reported < settings.JOBS_PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        changes = {"progress": done}
+        if total is not None:
+            changes["total"] = total
+        jobs = Job.objects.filter(pk=self.job.pk)
+        jobs.update(**changes)
+        if jobs.filter(cancelRequested=True).exists():
+            raise JobCancelled()
+
+
+def _finish(job_id, status, **changes):
+    Job.objects.filter(pk=job_id, status=Job.RUNNING).update(
+        status=status, finishedAt=timezone.now(), **changes,
+    )
+
+
+def run_job(job_id):
+    """Ejecuta un trabajo ya reclamado; corre en un proceso del pool del worker."""
+    close_old_connections()
+    try:
+        job = Job.objects.get(pk=job_id)
+        try:
+            result = TASKS[job.kind](JobContext(job), **job.params)
+        except JobCancelled:
+            _finish(job_id, Job.CANCELLED)
+        except Exception as e:
+            logger.exception("Falló el trabajo %s (%s)", job_id, job.kind)
+            _finish(job_id, Job.FAILED, error=f"{type(e).__name__}: {e}")
+        else:
+            # El último reporte de progreso pudo omitirse por JOBS_PROGRESS_INTERVAL
+            _finish(job_id, Job.SUCCEEDED, result=result, error="",
+                    progress=Coalesce("total", "progress"))
+    finally:
+        close_old_connections()
+
+
+def job_metrics():
+    counts = dict(
+        Job.objects.filter(status__in=[Job.QUEUED, Job.RUNNING])
+        .values_list("status").annotate(count=Count("pk")).order_by()
+    )
+    lines = ["# TYPE genomics_jobs gauge"]
+    for status in (Job.QUEUED, Job.RUNNING):
+        lines.append(f'genomics_jobs{{status="{status}"}} {counts.get(status, 0)}')
+    return lines
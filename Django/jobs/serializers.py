@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from .models import Job
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id", "kind", "status", "params", "progress", "total", "result", "error",
+            "cancelRequested", "attempts", "createdAt", "startedAt", "finishedAt",
+        ]
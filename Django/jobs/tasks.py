@@ -0,0 +1,109 @@
+import csv
+import io
+import os
+
+import pyarrow as pa
+from django.conf import settings
+
+from genomics.db_router import replica_reads
+from genomics.exports import export_columns, iter_value_chunks, record_batch
+from reports.models import PatientVariantReport
+from reports.purge import purge_gene, purge_patient_reports, purge_variants
+from reports.serializers import ReportSerializer
+from variants.vcf import import_vcf
+from .queue import task
+
+
+class ArrowExportWriter:
+    def __init__(self, file, schema):
+        self.schema = schema
+        self.writer = pa.ipc.new_stream(file, schema)
+
+    def write(self, rows):
+        self.writer.write_batch(record_batch(rows, self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class CsvExportWriter:
+    def __init__(self, file, schema):
+        self.text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+        self.writer = csv.writer(self.text)
+        # Las columnas del schema llevan los nombres del serializer
+        self.writer.writerow(schema.names)
+
+    def write(self, rows):
+        # El primer valor de cada fila es el PK del keyset
+        self.writer.writerows(row[1:] for row in rows)
+
+    def close(self):
+        self.text.flush()
+        self.text.detach()
+
+
+# format -> (archivo, content type, writer)
+EXPORT_FORMATS = {
+    "arrow": ("reports.arrow", "application/vnd.apache.arrow.stream", ArrowExportWriter),
+    "csv": ("reports.csv", "text/csv", CsvExportWriter),
+}
+
+
+@task("variants.import_vcf")
+def import_vcf_job(context, batch_size, default_impact):
+    path = context.path("input.vcf")
+    # Progreso en bytes leídos del archivo subido (comprimido o no)
+    total = os.path.getsize(path)
+    context.progress(0, total, force=True)
+    with open(path, "rb") as fileobj:
+        stats = import_vcf(
+            fileobj, batch_size, default_impact,
+            progress=lambda stats: context.progress(fileobj.tell(), total),
+        )
+    context.progress(total, total, force=True)
+    os.remove(path)
+    return stats.as_dict()
+
+
+@task("reports.export")
+def export_reports_job(context, format="arrow", patient_id=None):
+    # Exportación analítica: lee de la réplica si está configurada
+    with replica_reads():
+        queryset = PatientVariantReport.objects.all()
+        if patient_id is not None:
+            queryset = queryset.filter(patientId=patient_id)
+        total = queryset.count()
+        context.progress(0, total, force=True)
+
+        name, content_type, writer_class = EXPORT_FORMATS[format]
+        attnames, schema = export_columns(PatientVariantReport, list(ReportSerializer().fields))
+        # Se escribe a un temporal: el archivo final solo aparece completo
+        path = context.path(name)
+        partial = path.with_suffix(".partial")
+        rows = 0
+        with open(partial, "wb") as file:
+            writer = writer_class(file, schema)
+            for chunk in iter_value_chunks(queryset, attnames, settings.LIST_STREAM_CHUNK_SIZE):
+                writer.write(chunk)
+                rows += len(chunk)
+                context.progress(rows, total)
+            writer.close()
+        partial.rename(path)
+        context.progress(rows, max(total, rows), force=True)
+        return {"format": format, "rows": rows, "bytes": path.stat().st_size,
+                "file": name, "contentType": content_type}
+
+
+@task("genes.purge")
+def purge_gene_job(context, gene_id):
+    return purge_gene(gene_id, progress=context.progress)
+
+
+@task("variants.purge")
+def purge_variants_job(context, variant_ids):
+    return purge_variants(variant_ids, progress=context.progress)
+
+
+@task("reports.purge_patient")
+def purge_patient_job(context, patient_id):
+    return purge_patient_reports(patient_id, progress=context.progress)
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import JobListView, JobDetailView, JobCancelView, JobResultView
+
+urlpatterns = [
+    path("", JobListView.as_view(), name="job-list"),
+    path("<uuid:id>/", JobDetailView.as_view(), name="job-detail"),
+    path("<uuid:id>/cancel/", JobCancelView.as_view(), name="job-cancel"),
+    path("<uuid:id>/result/", JobResultView.as_view(), name="job-result"),
+]
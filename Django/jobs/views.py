@@ -0,0 +1,103 @@
+from django.http import FileResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from .models import Job
+from .queue import cancel, job_dir
+from .serializers import JobSerializer
+
+from drf_spectacular.utils import (
+    extend_schema,
+    OpenApiParameter,
+    OpenApiResponse,
+)
+
+
+def accepted_response(job):
+    # 202 con la ubicación del trabajo para consultar su estado
+    response = Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    response["Location"] = f"/jobs/{job.id}/"
+    return response
+
+
+class JobListView(APIView):
+    # Trabajos más recientes primero
+    MAX_RESULTS = 100
+
+    @extend_schema(
+        summary="Listar trabajos en segundo plano",
+        description=f"Retorna los últimos {MAX_RESULTS} trabajos, opcionalmente filtrados.",
+        parameters=[
+            OpenApiParameter("status", str, description="queued, running, succeeded, failed o cancelled"),
+            OpenApiParameter("kind", str, description="Tipo de trabajo, p. ej. variants.import_vcf"),
+        ],
+        responses=OpenApiResponse(JobSerializer(many=True)),
+    )
+    def get(self, request):
+        jobs = Job.objects.order_by("-createdAt")
+        if "status" in request.query_params:
+            jobs = jobs.filter(status=request.query_params["status"])
+        if "kind" in request.query_params:
+            jobs = jobs.filter(kind=request.query_params["kind"])
+        return Response(JobSerializer(jobs[:self.MAX_RESULTS], many=True).data)
+
+
+class JobDetailView(APIView):
+    @extend_schema(
+        summary="Estado y progreso de un trabajo",
+        description="progress/total están en las unidades de cada tarea (bytes leídos "
+                    "en importaciones, filas en exportaciones).",
+        responses={
+            200: JobSerializer,
+            404: OpenApiResponse(description="Trabajo no encontrado"),
+        }
+    )
+    def get(self, request, id):
+        job = Job.objects.filter(id=id).first()
+        if job is None:
+            return Response({"error": "Trabajo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(JobSerializer(job).data)
+
+
+class JobCancelView(APIView):
+    @extend_schema(
+        summary="Cancelar un trabajo",
+        description="Un trabajo en cola se cancela al instante; uno en curso se detiene "
+                    "en su siguiente reporte de progreso (los lotes ya confirmados se conservan).",
+        request=None,
+        responses={
+            202: JobSerializer,
+            404: OpenApiResponse(description="Trabajo no encontrado"),
+            409: OpenApiResponse(description="El trabajo ya terminó"),
+        }
+    )
+    def post(self, request, id):
+        if not Job.objects.filter(id=id).exists():
+            return Response({"error": "Trabajo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        if not cancel(id):
+            return Response({"error": "El trabajo ya terminó"}, status=status.HTTP_409_CONFLICT)
+        return Response(JobSerializer(Job.objects.get(id=id)).data, status=status.HTTP_202_ACCEPTED)
+
+
+class JobResultView(APIView):
+    @extend_schema(
+        summary="Descargar el archivo generado por un trabajo",
+        responses={
+            (200, "application/octet-stream"): OpenApiResponse(description="Archivo del resultado"),
+            404: OpenApiResponse(description="Trabajo no encontrado o sin archivo"),
+            409: OpenApiResponse(description="El trabajo aún no terminó correctamente"),
+        }
+    )
+    def get(self, request, id):
+        job = Job.objects.filter(id=id).first()
+        if job is None:
+            return Response({"error": "Trabajo no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        if job.status != Job.SUCCEEDED:
+            return Response({"error": f"El trabajo está en estado {job.status}"},
+                            status=status.HTTP_409_CONFLICT)
+        name = (job.result or {}).get("file")
+        path = job_dir(job.id) / name if name else None
+        if path is None or not path.exists():
+            return Response({"error": "El trabajo no generó archivo"}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=name,
+                            content_type=job.result.get("contentType"))
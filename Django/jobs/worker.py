@@ -0,0 +1,11 @@
+import signal
+
+import django
+
+
+def init_process():
+    # Inicializador de los procesos del pool de run_jobs. Se crean con spawn (no
+    # heredan las conexiones del padre), así que este módulo no debe importar
+    # modelos: se carga antes de django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
@@ -2,10 +2,26 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import PatientVariantReport
+from .models import PatientVariantReport, PatientVariantSummary, ReportDailyRollup
 
 @admin.register(PatientVariantReport)
 class PatientVariantReportAdmin(admin.ModelAdmin):
     list_display = ("id", "patientId", "variant", "detectionDate", "alleleFrequency")
     list_filter = ("detectionDate",)
-    search_fields = ("patientId",)
\ No newline at end of file
+    search_fields = ("patientId",)
+    # __str__ de la variante accede a su gen
+    list_select_related = ("variant__gene",)
+
+
+@admin.register(PatientVariantSummary)
+class PatientVariantSummaryAdmin(admin.ModelAdmin):
+    list_display = ("patientId", "gene", "impact", "reportCount", "maxAlleleFrequency", "latestDetectionDate")
+    search_fields = ("patientId",)
+    list_select_related = ("gene",)
+
+
+@admin.register(ReportDailyRollup)
+class ReportDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "gene", "impact", "reportCount")
+    list_filter = ("impact",)
+    list_select_related = ("gene",)
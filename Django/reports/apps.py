@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reports'
+
+    def ready(self):
+        from genomics.metrics import register_collector
+        from . import signals  # noqa: F401
+        from .gateway import breaker_metrics
+        from .patient_cache import cache_metrics
+
+        register_collector(cache_metrics)
+        register_collector(breaker_metrics)
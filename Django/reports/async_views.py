@@ -0,0 +1,67 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import serializers, status
+
+from .dtos import ReportDTO
+from .gateway import GatewayError, apatient_exists
+from .models import PatientVariantReport
+from .serializers import ReportSerializer
+from variants.models import GeneticVariant
+
+# Versiones asíncronas (ASGI) de los endpoints de reportes. No bloquean un
+# hilo mientras se espera al gateway de Clínica. La imagen sirve la app con
+# uvicorn (genomics.asgi); bajo WSGI (runserver) funcionan, pero cada
+# petición ocupa un hilo y abre su propio event loop y cliente httpx.
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncReportCreateView(View):
+    allele_frequency_field = serializers.DecimalField(max_digits=5, decimal_places=3)
+
+    async def post(self, request):
+        try:
+            dto = ReportDTO(**json.loads(request.body))
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            frequency = self.allele_frequency_field.run_validation(dto.alleleFrequency)
+        except serializers.ValidationError as e:
+            return JsonResponse({"alleleFrequency": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validar paciente en el microservicio de Clínica a través del gateway
+        token = request.headers.get("Authorization", "")
+        try:
+            exists = await apatient_exists(dto.patientId, token)
+        except GatewayError as exc:
+            return JsonResponse({"error": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
+
+        if not exists:
+            return JsonResponse({"error": "Paciente no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        # Validar variante
+        try:
+            variant = await GeneticVariant.objects.aget(id=dto.variantId)
+        except (GeneticVariant.DoesNotExist, ValidationError):
+            return JsonResponse({"error": "Variante genética no encontrada "}, status=status.HTTP_404_NOT_FOUND)
+
+        report = await PatientVariantReport.objects.acreate(
+            patientId=dto.patientId,
+            variant=variant,
+            detectionDate=dto.detectionDate,
+            alleleFrequency=frequency,
+        )
+        return JsonResponse(ReportSerializer(report).data, status=status.HTTP_201_CREATED)
+
+
+class AsyncPatientReportsView(View):
+    async def get(self, request, patientId):
+        reports = [
+            report async for report in PatientVariantReport.objects.filter(patientId=patientId)
+        ]
+        return JsonResponse(ReportSerializer(reports, many=True).data, safe=False)
@@ -0,0 +1,211 @@
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from genes.models import Gene
+from genomics.db_router import primary_reads
+from genomics.exports import iter_value_chunks
+from variants.models import GeneticVariant
+from .models import PatientVariantReport
+
+
+class CohortColumns:
+    """Columnas de todos los reportes como arreglos NumPy codificados.
+
+    Pacientes, variantes, genes e impactos se guardan como códigos enteros. Los
+    reportes se ordenan por (variante, paciente) para contar portadores
+    distintos comparando vecinos, y se guarda además la permutación que los
+    ordena por (gen, paciente) para la carga por gen.
+    """
+
+    def __init__(self, patients, variants, frequencies, dates, variant_ids, variant_genes,
+                 variant_impacts, gene_ids, impacts, patient_count):
+        order = np.lexsort((patients, variants))
+        self.patients = patients[order]
+        self.variants = variants[order]
+        self.frequencies = frequencies[order]
+        self.dates = dates[order]
+        self.genes = variant_genes[self.variants]
+        self.impact_codes = variant_impacts[self.variants]
+        self.by_gene = np.lexsort((self.patients, self.genes))
+        self.variant_ids = variant_ids
+        self.variant_genes = variant_genes
+        self.gene_ids = gene_ids
+        self.impacts = impacts
+        self.patient_count = patient_count
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def load(cls, chunk_size):
+        # Una sola transacción para leer variantes y reportes del mismo snapshot,
+        # en el primario: el snapshot se comparte en el proceso durante su vigencia
+        with primary_reads(), transaction.atomic():
+            variant_codes, variant_ids, variant_gene_ids, variant_impacts = {}, bytearray(), [], []
+            impact_codes = {}
+            for rows in iter_value_chunks(GeneticVariant.objects.all(), ["gene_id", "impact"], chunk_size):
+                for pk, gene_id, impact in rows:
+                    variant_codes[pk] = len(variant_codes)
+                    variant_ids += pk.bytes
+                    variant_gene_ids.append(gene_id)
+                    variant_impacts.append(impact_codes.setdefault(impact, len(impact_codes)))
+
+            patient_codes = {}
+            patients, variants, frequencies, dates = [], [], [], []
+            report_columns = ["patientId", "variant_id", Cast("alleleFrequency", FloatField()), "detectionDate"]
+            for rows in iter_value_chunks(PatientVariantReport.objects.all(), report_columns, chunk_size):
+                _, patient_column, variant_column, frequency_column, date_column = zip(*rows)
+                patients.append(np.fromiter(
+                    (patient_codes.setdefault(patient, len(patient_codes)) for patient in patient_column),
+                    dtype=np.int32, count=len(rows),
+                ))
+                variants.append(np.fromiter(
+                    (variant_codes.get(variant, -1) for variant in variant_column),
+                    dtype=np.int32, count=len(rows),
+                ))
+                frequencies.append(np.array(frequency_column, dtype=np.float64))
+                dates.append(np.array(date_column, dtype="datetime64[D]"))
+
+        gene_ids, variant_genes = np.unique(np.array(variant_gene_ids, dtype=np.int64), return_inverse=True)
+        patients = np.concatenate(patients) if patients else np.empty(0, np.int32)
+        variants = np.concatenate(variants) if variants else np.empty(0, np.int32)
+        frequencies = np.concatenate(frequencies) if frequencies else np.empty(0, np.float64)
+        dates = np.concatenate(dates) if dates else np.empty(0, "datetime64[D]")
+        # Reportes de variantes creadas después de leer las variantes
+        known = variants >= 0
+        return cls(
+            patients[known], variants[known], frequencies[known], dates[known],
+            np.frombuffer(bytes(variant_ids), dtype=np.uint8).reshape(-1, 16),
+            variant_genes.astype(np.int32),
+            np.array(variant_impacts, dtype=np.int16),
+            gene_ids,
+            impact_codes,
+            len(patient_codes),
+        )
+
+    def mask(self, date_from=None, date_to=None, impacts=None, gene_id=None):
+        mask = np.ones(len(self.patients), dtype=bool)
+        if date_from is not None:
+            mask &= self.dates >= np.datetime64(date_from, "D")
+        if date_to is not None:
+            mask &= self.dates <= np.datetime64(date_to, "D")
+        if impacts:
+            codes = [self.impacts[impact] for impact in impacts if impact in self.impacts]
+            mask &= np.isin(self.impact_codes, codes)
+        if gene_id is not None:
+            gene_code = np.searchsorted(self.gene_ids, gene_id)
+            if gene_code == len(self.gene_ids) or self.gene_ids[gene_code] != gene_id:
+                mask[:] = False
+            else:
+                mask &= self.genes == gene_code
+        return mask
+
+    @staticmethod
+    def first_of_pairs(major, minor):
+        # Arreglos ya ordenados por (major, minor): marca la primera fila de cada par
+        first = np.ones(len(major), dtype=bool)
+        first[1:] = (major[1:] != major[:-1]) | (minor[1:] != minor[:-1])
+        return first
+
+    def stats(self, date_from=None, date_to=None, impacts=None, gene_id=None, bins=20, top=20):
+        mask = self.mask(date_from, date_to, impacts, gene_id)
+        frequencies = self.frequencies[mask]
+        patients = self.patients[mask]
+        variants = self.variants[mask]
+
+        result = {
+            "reports": int(mask.sum()),
+            "patients": int(np.count_nonzero(np.bincount(patients, minlength=self.patient_count))),
+            "variants": 0,
+            "alleleFrequency": None,
+            "topVariants": [],
+            "geneBurden": [],
+        }
+        if not len(frequencies):
+            return result
+
+        counts, edges = np.histogram(frequencies, bins=bins, range=(0.0, 1.0))
+        p25, median, p75 = np.percentile(frequencies, [25, 50, 75])
+        result["alleleFrequency"] = {
+            "mean": round(float(frequencies.mean()), 6),
+            "median": round(float(median), 6),
+            "std": round(float(frequencies.std()), 6),
+            "p25": round(float(p25), 6),
+            "p75": round(float(p75), 6),
+            "min": round(float(frequencies.min()), 6),
+            "max": round(float(frequencies.max()), 6),
+            "histogram": {"edges": [round(float(edge), 6) for edge in edges], "counts": counts.tolist()},
+        }
+
+        # Portadores por variante: pares (variante, paciente) distintos
+        variant_count = len(self.variant_ids)
+        carriers = np.bincount(variants[self.first_of_pairs(variants, patients)], minlength=variant_count)
+        reports = np.bincount(variants, minlength=variant_count)
+        frequency_sum = np.bincount(variants, weights=frequencies, minlength=variant_count)
+        result["variants"] = int(np.count_nonzero(reports))
+        for code in self.top_codes(carriers, top):
+            result["topVariants"].append({
+                "variantId": str(uuid.UUID(bytes=self.variant_ids[code].tobytes())),
+                "geneId": int(self.gene_ids[self.variant_genes[code]]),
+                "carriers": int(carriers[code]),
+                "reports": int(reports[code]),
+                "meanAlleleFrequency": round(float(frequency_sum[code] / reports[code]), 6),
+            })
+
+        # Carga por gen: pacientes distintos con al menos un reporte en el gen
+        gene_count = len(self.gene_ids)
+        by_gene = self.by_gene[mask[self.by_gene]]
+        genes, gene_patients = self.genes[by_gene], self.patients[by_gene]
+        gene_carriers = np.bincount(genes[self.first_of_pairs(genes, gene_patients)], minlength=gene_count)
+        gene_reports = np.bincount(genes, minlength=gene_count)
+        gene_frequency_sum = np.bincount(genes, weights=self.frequencies[by_gene], minlength=gene_count)
+        gene_variants = np.bincount(self.variant_genes, weights=reports > 0, minlength=gene_count)
+        top_genes = self.top_codes(gene_carriers, top)
+        symbols = Gene.objects.in_bulk([int(self.gene_ids[code]) for code in top_genes])
+        for code in top_genes:
+            gene_id = int(self.gene_ids[code])
+            result["geneBurden"].append({
+                "geneId": gene_id,
+                "symbol": symbols[gene_id].symbol if gene_id in symbols else None,
+                "carriers": int(gene_carriers[code]),
+                "variants": int(gene_variants[code]),
+                "reports": int(gene_reports[code]),
+                "meanAlleleFrequency": round(float(gene_frequency_sum[code] / gene_reports[code]), 6),
+            })
+        return result
+
+    @staticmethod
+    def top_codes(values, top):
+        # Los `top` mayores (sin ceros), de mayor a menor, sin ordenar todo el arreglo
+        candidates = np.flatnonzero(values)
+        if len(candidates) > top:
+            candidates = candidates[np.argpartition(values[candidates], -top)[-top:]]
+        return candidates[np.argsort(-values[candidates], kind="stable")]
+
+
+class CohortStore:
+    def __init__(self):
+        self._columns = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        ttl = settings.COHORT_STATS_TTL
+        columns = self._columns
+        if columns is not None and time.monotonic() - columns.built_at < ttl:
+            return columns
+        with self._lock:
+            columns = self._columns
+            if columns is None or time.monotonic() - columns.built_at >= ttl:
+                columns = CohortColumns.load(settings.LIST_STREAM_CHUNK_SIZE)
+                self._columns = columns
+        return columns
+
+
+# Snapshot por proceso. No se invalida en cada escritura de reportes (recargar
+# millones de filas por reporte sería peor): caduca tras COHORT_STATS_TTL.
+cohort_store = CohortStore()
@@ -1,8 +1,59 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, RootModel, model_validator
 from datetime import date
+from typing import Literal, Optional
 
 class ReportDTO(BaseModel):
     patientId: str
     variantId: str
     detectionDate: date
     alleleFrequency: float
+
+
+class ReportBulkDTO(RootModel[list[ReportDTO]]):
+    pass
+
+
+class CohortQueryDTO(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    date_from: Optional[date] = Field(None, alias="from")
+    date_to: Optional[date] = Field(None, alias="to")
+    impact: Optional[str] = None
+    gene: Optional[int] = None
+    bins: int = Field(20, ge=1, le=200)
+    top: int = Field(20, ge=1, le=500)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise ValueError("Se requiere from <= to")
+        return self
+
+    @property
+    def impacts(self):
+        return [value.strip() for value in self.impact.split(",") if value.strip()] if self.impact else None
+
+
+class ReportDailyQueryDTO(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    date_from: Optional[date] = Field(None, alias="from")
+    date_to: Optional[date] = Field(None, alias="to")
+    impact: Optional[str] = None
+    gene: Optional[int] = None
+    period: Literal["day", "month"] = "day"
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise ValueError("Se requiere from <= to")
+        return self
+
+    @property
+    def impacts(self):
+        return [value.strip() for value in self.impact.split(",") if value.strip()] if self.impact else None
+
+
+class ReportExportDTO(BaseModel):
+    format: Literal["arrow", "csv"] = "arrow"
+    patientId: Optional[str] = None
@@ -0,0 +1,235 @@
+import asyncio
+import contextvars
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from genomics.metrics import gateway_timer
+from .patient_cache import patient_cache
+
+# URL del gateway que expone el microservicio de Clínica
+GATEWAY_PATIENT_URL = "http://clinica-app-service:3000/api/v1/clinica/gestion-pacientes/searchPatient?document="
+# GATEWAY_PATIENT_URL = "http://localhost:60855/api/v1/clinica/gestion-pacientes/searchPatient?document="
+
+
+class GatewayError(Exception):
+    pass
+
+
+class CircuitOpenError(GatewayError):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        # Con el circuito abierto se falla de inmediato; pasado reset_timeout
+        # se deja pasar una única petición de prueba (half-open).
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Servicio de clínica no disponible (circuito abierto)")
+                self.state = self.HALF_OPEN
+            if self._probing:
+                raise CircuitOpenError("Servicio de clínica no disponible (circuito abierto)")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release(self):
+        # La llamada terminó sin respuesta ni error del gateway (p. ej. la
+        # cancelación de la petición): la siguiente puede volver a probar
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+def build_session():
+    retry = Retry(
+        total=settings.GATEWAY_RETRIES,
+        connect=settings.GATEWAY_RETRIES,
+        # Un timeout de lectura ya esperó lo suyo: no se reintenta
+        read=0,
+        status=settings.GATEWAY_RETRIES,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        backoff_factor=settings.GATEWAY_BACKOFF_FACTOR,
+        backoff_jitter=settings.GATEWAY_BACKOFF_JITTER,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.GATEWAY_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Sesión y circuito compartidos por el proceso: las conexiones keep-alive al
+# gateway se reutilizan y una caída de Clínica se detecta una sola vez.
+session = build_session()
+breaker = CircuitBreaker(settings.GATEWAY_BREAKER_THRESHOLD, settings.GATEWAY_BREAKER_RESET)
+
+
+def _interpret(status_code):
+    # Devuelve (existe, cachear). Un 5xx cuenta como fallo del gateway; un 401
+    # no dice nada sobre la existencia del paciente y no se cachea.
+    if status_code >= 500:
+        breaker.record_failure()
+        raise GatewayError(f"Error al contactar la clinica: HTTP {status_code}")
+    breaker.record_success()
+    if status_code == 200:
+        return True, True
+    return False, status_code == 404
+
+
+def patient_exists(patient_id, token=""):
+    cached = patient_cache.get(patient_id, token)
+    if cached is not None:
+        return cached
+
+    breaker.before_call()
+    try:
+        with gateway_timer():
+            resp = session.get(
+                GATEWAY_PATIENT_URL + patient_id,
+                headers={"Authorization": token} if token else {},
+                timeout=(settings.GATEWAY_CONNECT_TIMEOUT, settings.GATEWAY_TIMEOUT),
+            )
+    except requests.RequestException as exc:
+        breaker.record_failure()
+        raise GatewayError(f"Error al contactar la clinica: {exc}")
+    except BaseException:
+        breaker.release()
+        raise
+
+    exists, cacheable = _interpret(resp.status_code)
+    if cacheable:
+        patient_cache.set(patient_id, token, exists)
+    return exists
+
+
+# Bajo ASGI (lo activa genomics/asgi.py) el event loop dura lo que el proceso y
+# su cliente se reutiliza. Bajo WSGI cada vista async corre en un loop nuevo
+# que se descarta al responder: ahí se usa un cliente por llamada y se cierra.
+SHARED_ASYNC_CLIENT = False
+
+# Un cliente asíncrono por event loop: httpx no permite compartirlos entre loops
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _build_async_client():
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(retries=settings.GATEWAY_RETRIES),
+        limits=httpx.Limits(max_connections=settings.GATEWAY_POOL_SIZE),
+        timeout=httpx.Timeout(settings.GATEWAY_TIMEOUT, connect=settings.GATEWAY_CONNECT_TIMEOUT),
+    )
+
+
+@asynccontextmanager
+async def _async_client():
+    if not SHARED_ASYNC_CLIENT:
+        async with _build_async_client() as client:
+            yield client
+        return
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = _build_async_client()
+    yield client
+
+
+async def apatient_exists(patient_id, token=""):
+    cached = await patient_cache.aget(patient_id, token)
+    if cached is not None:
+        return cached
+
+    breaker.before_call()
+    try:
+        with gateway_timer():
+            async with _async_client() as client:
+                resp = await client.get(
+                    GATEWAY_PATIENT_URL + patient_id,
+                    headers={"Authorization": token} if token else {},
+                )
+    except httpx.HTTPError as exc:
+        breaker.record_failure()
+        raise GatewayError(f"Error al contactar la clinica: {exc}")
+    except BaseException:
+        # Incluye asyncio.CancelledError cuando el cliente ASGI se desconecta
+        breaker.release()
+        raise
+
+    exists, cacheable = _interpret(resp.status_code)
+    if cacheable:
+        await patient_cache.aset(patient_id, token, exists)
+    return exists
+
+
+def check_patients(patient_ids, token=""):
+    # Valida cada paciente una sola vez, en paralelo con un pool acotado.
+    # Devuelve {patientId: True | False | GatewayError}.
+    unique_ids = list(dict.fromkeys(patient_ids))
+    if not unique_ids:
+        return {}
+
+    def check(patient_id):
+        try:
+            return patient_exists(patient_id, token)
+        except GatewayError as exc:
+            return exc
+
+    # Cada tarea lleva una copia del contexto para acumular el tiempo de
+    # gateway en las métricas de la petición
+    workers = min(settings.GATEWAY_MAX_WORKERS, len(unique_ids))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, check, patient_id)
+            for patient_id in unique_ids
+        ]
+        return {patient_id: future.result() for patient_id, future in zip(unique_ids, futures)}
+
+
+def breaker_metrics():
+    states = [CircuitBreaker.CLOSED, CircuitBreaker.HALF_OPEN, CircuitBreaker.OPEN]
+    return [
+        "# TYPE genomics_gateway_circuit_state gauge",
+        *(f'genomics_gateway_circuit_state{{state="{state}"}} {int(breaker.state == state)}'
+          for state in states),
+    ]
@@ -0,0 +1,120 @@
+import datetime
+import json
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from genes.models import Gene
+from reports.models import PatientVariantReport, PatientVariantSummary, ReportDailyRollup
+from variants.models import GeneticVariant
+
+SAMPLE_UUID = uuid.UUID(int=1)
+
+
+def sample(model, field, default):
+    value = model.objects.values_list(field, flat=True).first()
+    return default if value is None else value
+
+
+def hot_queries():
+    # Consultas que emiten las vistas en su camino caliente
+    gene_id = sample(Gene, "id", 1)
+    symbol = sample(Gene, "symbol", "BRAF")
+    variant = (
+        GeneticVariant.objects.values("id", "chromosome", "position", "referenceBase", "alternateBase")
+        .first()
+        or {"id": SAMPLE_UUID, "chromosome": "7", "position": 1,
+            "referenceBase": "A", "alternateBase": "T"}
+    )
+    report_id = sample(PatientVariantReport, "id", SAMPLE_UUID)
+    patient_id = sample(PatientVariantReport, "patientId", "P-12345")
+    detected = sample(PatientVariantReport, "detectionDate", datetime.date(2024, 1, 1))
+    month = (detected.replace(day=1), detected.replace(day=28))
+
+    return [
+        ("gene-detail", Gene.objects.filter(id=gene_id)),
+        ("gene-by-symbol", Gene.objects.filter(symbol=symbol)),
+        ("gene-list-page", Gene.objects.filter(pk__gt=gene_id).order_by("pk")[:100]),
+        ("variant-detail", GeneticVariant.objects.filter(id=variant["id"])),
+        ("variant-detail-expand", GeneticVariant.objects.select_related("gene").filter(id=variant["id"])),
+        ("variant-list-page", GeneticVariant.objects.filter(pk__gt=variant["id"]).order_by("pk")[:100]),
+        ("variant-list-filter", GeneticVariant.objects.filter(chromosome=variant["chromosome"], impact="HIGH")
+            .order_by("pk").values_list("id", "position", "referenceBase", "alternateBase")[:100]),
+        ("variant-list-ordered", GeneticVariant.objects.filter(chromosome=variant["chromosome"])
+            .order_by("position", "pk")[:100]),
+        ("variant-region-index", GeneticVariant.objects.filter(chromosome=variant["chromosome"])
+            .order_by("position").values_list("id", "position", "referenceBase")),
+        ("variant-region-range", GeneticVariant.objects.filter(
+            chromosome=variant["chromosome"], position__gte=1, position__lte=variant["position"])),
+        ("variant-by-impact", GeneticVariant.objects.filter(impact="HIGH")),
+        ("variant-natural-key", GeneticVariant.objects.filter(
+            chromosome=variant["chromosome"], position=variant["position"],
+            referenceBase=variant["referenceBase"], alternateBase=variant["alternateBase"])),
+        ("variant-upsert-lookup", GeneticVariant.objects.filter(
+            chromosome__in=[variant["chromosome"]], position__in=[variant["position"], 1])),
+        ("report-detail", PatientVariantReport.objects.filter(id=report_id)),
+        ("report-detail-expand", PatientVariantReport.objects.select_related("variant__gene").filter(id=report_id)),
+        ("report-list-page", PatientVariantReport.objects.filter(pk__gt=report_id).order_by("pk")[:100]),
+        ("patient-reports", PatientVariantReport.objects.filter(patientId=patient_id)),
+        ("reports-by-variant", PatientVariantReport.objects.filter(variant_id=variant["id"])),
+        ("patient-summary", PatientVariantSummary.objects.filter(patientId=patient_id)),
+        ("report-date-range", PatientVariantReport.objects.filter(detectionDate__range=month)
+            .order_by("detectionDate", "pk")[:100]),
+        ("report-daily-rollup", ReportDailyRollup.objects.filter(day__range=month)
+            .values("gene_id", "impact").annotate(count=Sum("reportCount")).order_by()),
+    ]
+
+
+def full_scans(plan):
+    # Devuelve las tablas recorridas completas según el plan del motor
+    vendor = connection.vendor
+    if vendor == "mysql":
+        scans = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get("access_type") == "ALL":
+                    scans.append(node.get("table_name", "?"))
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(json.loads(plan))
+        return scans
+    if vendor == "sqlite":
+        scans = []
+        for line in plan.splitlines():
+            detail = line.split(" ", 3)[-1]
+            if detail.startswith("SCAN ") and " USING " not in detail:
+                scans.append(detail.split()[1])
+        return scans
+    if vendor == "postgresql":
+        return [line.split(" on ")[1].split()[0] for line in plan.splitlines() if "Seq Scan on" in line]
+    raise CommandError(f"Motor no soportado: {vendor}")
+
+
+class Command(BaseCommand):
+    help = ("Ejecuta EXPLAIN sobre las consultas calientes de las vistas y falla si "
+            "alguna recorre una tabla completa. Conviene ejecutarlo con datos "
+            "representativos: con tablas casi vacías el optimizador puede preferir un scan.")
+
+    def handle(self, *args, **options):
+        explain_options = {"format": "json"} if connection.vendor == "mysql" else {}
+        failures = []
+        for name, queryset in hot_queries():
+            plan = queryset.explain(**explain_options)
+            scans = full_scans(plan)
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN {name}: {', '.join(scans)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"OK        {name}"))
+            if options["verbosity"] > 1:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f"{len(failures)} consultas recorren tablas completas: {', '.join(failures)}")
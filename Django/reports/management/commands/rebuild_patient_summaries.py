@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reports.summary import rebuild
+
+
+class Command(BaseCommand):
+    help = ("Reconstruye desde cero la tabla de resumen por paciente (conteos por gen e "
+            "impacto) a partir de los reportes. Normalmente se mantiene sola al escribir "
+            "reportes; sirve tras cargas directas en la BD o para corregir desvíos.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--patient", action="append", dest="patients",
+                            help="Reconstruir solo este paciente (se puede repetir)")
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Pacientes por transacción")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild(options["patients"], options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{written} grupos de resumen escritos en {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_alter_patientvariantreport_patientid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientvariantreport',
+            index=models.Index(fields=['patientId', 'detectionDate'], name='report_patient_date_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.26 on 2026-10-18 13:07
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+# Pacientes por lote al poblar la tabla
+CHUNK_SIZE = 1000
+
+
+def populate_summaries(apps, schema_editor):
+    # Mismo cálculo que reports.summary.rebuild, con los modelos históricos:
+    # el resumen queda completo para los reportes existentes al migrar
+    db = schema_editor.connection.alias
+    Report = apps.get_model("reports", "PatientVariantReport")
+    Summary = apps.get_model("reports", "PatientVariantSummary")
+    patients = Report.objects.using(db).order_by("patientId").values_list("patientId", flat=True).distinct()
+    previous = None
+    while True:
+        page = patients if previous is None else patients.filter(patientId__gt=previous)
+        chunk = list(page[:CHUNK_SIZE])
+        if not chunk:
+            return
+        groups = (
+            Report.objects.using(db).filter(patientId__gte=chunk[0], patientId__lte=chunk[-1])
+            .values("patientId", "variant__gene_id", "variant__impact")
+            .annotate(count=Count("pk"), frequency=Max("alleleFrequency"), detected=Max("detectionDate"))
+            .order_by()
+        )
+        Summary.objects.using(db).bulk_create(
+            Summary(
+                patientId=group["patientId"], gene_id=group["variant__gene_id"],
+                impact=group["variant__impact"], reportCount=group["count"],
+                maxAlleleFrequency=group["frequency"], latestDetectionDate=group["detected"],
+            )
+            for group in groups
+        )
+        previous = chunk[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('genes', '0002_gene_symbol_index'),
+        ('reports', '0003_report_patient_date_idx'),
+        # Se puebla con las variantes ya fusionadas por locus
+        ('variants', '0004_variant_locus_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientVariantSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patientId', models.CharField(max_length=255)),
+                ('impact', models.CharField(max_length=50)),
+                ('reportCount', models.PositiveIntegerField(default=0)),
+                ('maxAlleleFrequency', models.DecimalField(decimal_places=3, max_digits=5)),
+                ('latestDetectionDate', models.DateField()),
+                ('gene', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patient_summaries', to='genes.gene')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='patientvariantsummary',
+            constraint=models.UniqueConstraint(fields=('patientId', 'gene', 'impact'), name='summary_patient_gene_impact'),
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
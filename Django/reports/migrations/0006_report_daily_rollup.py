@@ -0,0 +1,71 @@
+# Generated by Django 4.2.26 on 2026-10-18 13:37
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+import django.db.models.deletion
+
+# Días de detección por lote al poblar la tabla
+CHUNK_DAYS = 31
+
+
+def populate_rollup(apps, schema_editor):
+    # Mismo cálculo que reports.rollup.rebuild, con los modelos históricos: cada
+    # ventana de días se lee por el índice de detectionDate creado arriba
+    db = schema_editor.connection.alias
+    Report = apps.get_model("reports", "PatientVariantReport")
+    Rollup = apps.get_model("reports", "ReportDailyRollup")
+    reports = Report.objects.using(db)
+    bounds = reports.aggregate(first=Min("detectionDate"), last=Max("detectionDate"))
+    start = bounds["first"]
+    while start is not None and start <= bounds["last"]:
+        end = start + timedelta(days=CHUNK_DAYS)
+        groups = (
+            reports.filter(detectionDate__gte=start, detectionDate__lt=end)
+            .values("detectionDate", "variant__gene_id", "variant__impact")
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+        Rollup.objects.using(db).bulk_create(
+            Rollup(
+                day=group["detectionDate"], gene_id=group["variant__gene_id"],
+                impact=group["variant__impact"], reportCount=group["count"],
+            )
+            for group in groups
+        )
+        start = end
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('genes', '0002_gene_symbol_index'),
+        ('reports', '0005_uuid7_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('impact', models.CharField(max_length=50)),
+                ('reportCount', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='patientvariantreport',
+            index=models.Index(fields=['detectionDate'], name='report_detection_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='reportdailyrollup',
+            name='gene',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_report_rollups', to='genes.gene'),
+        ),
+        migrations.AddConstraint(
+            model_name='reportdailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'gene', 'impact'), name='rollup_day_gene_impact'),
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,57 @@
-import uuid
 from django.db import models
+from genomics.ids import uuid7
+from genes.models import Gene
 from variants.models import GeneticVariant
 
 class PatientVariantReport(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     patientId = models.CharField(max_length=255)
     variant = models.ForeignKey(GeneticVariant, on_delete=models.CASCADE, related_name="patient_reports")
     detectionDate = models.DateField()
     alleleFrequency = models.DecimalField(max_digits=5, decimal_places=3)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["patientId", "detectionDate"], name="report_patient_date_idx"),
+            # Consultas por rango de fechas (?from=&to=) sin recorrer la tabla
+            models.Index(fields=["detectionDate"], name="report_detection_date_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"Report {self.id} for patient {self.patientId}"
+
+
+class PatientVariantSummary(models.Model):
+    # Resumen materializado de los reportes de un paciente por gen e impacto.
+    # Se mantiene incrementalmente desde reports/summary.py
+    patientId = models.CharField(max_length=255)
+    gene = models.ForeignKey(Gene, on_delete=models.CASCADE, related_name="patient_summaries")
+    impact = models.CharField(max_length=50)
+    reportCount = models.PositiveIntegerField(default=0)
+    maxAlleleFrequency = models.DecimalField(max_digits=5, decimal_places=3)
+    latestDetectionDate = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["patientId", "gene", "impact"], name="summary_patient_gene_impact"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Summary {self.patientId} {self.gene_id} {self.impact}"
+
+
+class ReportDailyRollup(models.Model):
+    # Reportes por día de detección, gen e impacto para los tableros de QA.
+    # Se mantiene incrementalmente desde reports/rollup.py
+    day = models.DateField()
+    gene = models.ForeignKey(Gene, on_delete=models.CASCADE, related_name="daily_report_rollups")
+    impact = models.CharField(max_length=50)
+    reportCount = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "gene", "impact"], name="rollup_day_gene_impact"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Rollup {self.day} {self.gene_id} {self.impact}"
@@ -0,0 +1,114 @@
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from genomics.cache import TTLLRUCache
+
+# Generación de las claves en la caché compartida: clear() la renueva en lugar
+# de vaciar CACHES[CACHE_ALIAS], que también guarda otras entradas
+GENERATION_KEY = "patient-exists-generation"
+
+
+class PatientCache:
+    # Resultado de existencia de pacientes en Clínica. La clave incluye un hash
+    # del token para no validar con la respuesta obtenida por otro cliente.
+    def __init__(self, config):
+        self.ttl = config["TTL"]
+        self.negative_ttl = config["NEGATIVE_TTL"]
+        self.backend = config["BACKEND"]
+        if self.backend == "django":
+            self._store = caches[config["CACHE_ALIAS"]]
+        else:
+            self._store = TTLLRUCache(config["MAX_SIZE"], self.ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(patient_id, token, generation=""):
+        digest = hashlib.sha256(token.encode()).hexdigest()[:16]
+        return f"patient-exists:{generation}{digest}:{patient_id}"
+
+    def _generation(self):
+        if self.backend != "django":
+            return ""
+        generation = self._store.get(GENERATION_KEY)
+        if generation is None:
+            self._store.add(GENERATION_KEY, uuid.uuid4().hex[:8], None)
+            generation = self._store.get(GENERATION_KEY)
+        return f"{generation}:"
+
+    async def _ageneration(self):
+        generation = await self._store.aget(GENERATION_KEY)
+        if generation is None:
+            await self._store.aadd(GENERATION_KEY, uuid.uuid4().hex[:8], None)
+            generation = await self._store.aget(GENERATION_KEY)
+        return f"{generation}:"
+
+    def get(self, patient_id, token=""):
+        value = self._store.get(self.key(patient_id, token, self._generation()))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, patient_id, token, exists):
+        ttl = self.ttl if exists else self.negative_ttl
+        self._store.set(self.key(patient_id, token, self._generation()), exists, ttl)
+
+    async def aget(self, patient_id, token=""):
+        if self.backend != "django":
+            return self.get(patient_id, token)
+        value = await self._store.aget(self.key(patient_id, token, await self._ageneration()))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    async def aset(self, patient_id, token, exists):
+        if self.backend != "django":
+            return self.set(patient_id, token, exists)
+        ttl = self.ttl if exists else self.negative_ttl
+        await self._store.aset(self.key(patient_id, token, await self._ageneration()), exists, ttl)
+
+    def clear(self):
+        if self.backend == "django":
+            # Las entradas anteriores quedan inalcanzables y caducan por TTL
+            self._store.set(GENERATION_KEY, uuid.uuid4().hex[:8], None)
+        else:
+            self._store.clear()
+
+    def stats(self):
+        stats = {"backend": self.backend, "hits": self.hits, "misses": self.misses}
+        if isinstance(self._store, TTLLRUCache):
+            stats["size"] = len(self._store)
+            stats["evictions"] = self._store.evictions
+        return stats
+
+
+patient_cache = PatientCache(settings.PATIENT_CACHE)
+
+
+def cache_metrics():
+    stats = patient_cache.stats()
+    lines = [
+        "# TYPE genomics_patient_cache_hits_total counter",
+        f"genomics_patient_cache_hits_total {stats['hits']}",
+        "# TYPE genomics_patient_cache_misses_total counter",
+        f"genomics_patient_cache_misses_total {stats['misses']}",
+    ]
+    if "size" in stats:
+        lines += [
+            "# TYPE genomics_patient_cache_size gauge",
+            f"genomics_patient_cache_size {stats['size']}",
+            "# TYPE genomics_patient_cache_evictions_total counter",
+            f"genomics_patient_cache_evictions_total {stats['evictions']}",
+        ]
+    return lines
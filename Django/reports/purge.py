@@ -0,0 +1,161 @@
+"""
+Borrado masivo por SQL en lotes, sin el collector de Django.
+
+gene.delete() / variant.delete() cargan en Python cada variante y cada reporte
+de la cascada y los borran en una sola transacción. Aquí se borra en orden
+reportes -> variantes -> gen, con un DELETE ... WHERE pk IN (...) por lote y
+una transacción por lote: tras cada commit los datos (y los resúmenes por
+paciente y el conteo diario) quedan consistentes, así que un purgado
+cancelado se puede retomar.
+"""
+from django.conf import settings
+from django.db import connections, router, transaction
+
+from genes.models import Gene
+from genes.registry import gene_registry
+from genes.search import gene_search
+from genomics.response_cache import response_cache
+from variants.intervals import variant_index
+from variants.models import GeneticVariant
+from . import rollup, summary
+from .models import PatientVariantReport, PatientVariantSummary, ReportDailyRollup
+
+
+class Progress:
+    def __init__(self, callback, total):
+        self.callback = callback
+        self.total = total
+        self.deleted = {"reports": 0, "variants": 0, "genes": 0}
+
+    def advance(self, **counts):
+        for name, count in counts.items():
+            self.deleted[name] += count
+        if self.callback is not None:
+            self.callback(sum(self.deleted.values()), self.total)
+
+
+def _raw_delete(model, field_name, values):
+    # DELETE ... WHERE campo IN (...) directo: sin cargar filas, sin la cascada
+    # del ORM ni señales
+    values = list(values)
+    if not values:
+        return 0
+    connection = connections[router.db_for_write(model)]
+    field = model._meta.get_field(field_name)
+    quote = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(field.column)} IN ({placeholders})",
+            [field.get_db_prep_value(value, connection) for value in values],
+        )
+        return cursor.rowcount
+
+
+def _delete_reports(reports, progress, chunk_size):
+    while True:
+        with transaction.atomic():
+            rows = list(reports.values_list(
+                "pk", "patientId", "detectionDate", "variant__gene_id", "variant__impact",
+            )[:chunk_size])
+            if not rows:
+                return
+            _raw_delete(PatientVariantReport, "id", [row[0] for row in rows])
+            # Resúmenes recalculados desde los reportes que quedan
+            summary.rebuild(sorted({row[1] for row in rows}))
+            rollup.discount(row[2:] for row in rows)
+        progress.advance(reports=len(rows))
+
+
+def _delete_variants(variants, progress, chunk_size):
+    while True:
+        ids = list(variants.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return
+        _delete_reports(PatientVariantReport.objects.filter(variant_id__in=ids), progress, chunk_size)
+        with transaction.atomic():
+            # El bloqueo frena nuevos reportes de estas variantes; se borran los
+            # que llegaron mientras tanto
+            list(GeneticVariant.objects.select_for_update().filter(pk__in=ids).values_list("pk"))
+            _delete_reports(PatientVariantReport.objects.filter(variant_id__in=ids), progress, chunk_size)
+            deleted = _raw_delete(GeneticVariant, "id", ids)
+        progress.advance(variants=deleted)
+
+
+def _variants_purged():
+    # Las escrituras directas no emiten post_delete
+    variant_index.invalidate()
+    response_cache.invalidate("variant")
+    response_cache.invalidate("variant-bulk")
+
+
+def _count_up_to(querysets, limit):
+    total = 0
+    for queryset in querysets:
+        total += queryset[:limit - total].count()
+        if total >= limit:
+            break
+    return total
+
+
+def gene_purge_size(gene_id, limit):
+    """Variantes más reportes de un gen, contando a lo sumo hasta limit."""
+    return _count_up_to([
+        GeneticVariant.objects.filter(gene_id=gene_id),
+        PatientVariantReport.objects.filter(variant__gene_id=gene_id),
+    ], limit)
+
+
+def variant_purge_size(variant_ids, limit):
+    """Variantes más sus reportes, contando a lo sumo hasta limit."""
+    return _count_up_to([
+        GeneticVariant.objects.filter(pk__in=variant_ids),
+        PatientVariantReport.objects.filter(variant_id__in=variant_ids),
+    ], limit)
+
+
+def purge_patient_reports(patient_id, progress=None, chunk_size=None):
+    """Borra todos los reportes de un paciente. Devuelve lo borrado."""
+    reports = PatientVariantReport.objects.filter(patientId=patient_id)
+    state = Progress(progress, reports.count())
+    _delete_reports(reports, state, chunk_size or settings.PURGE_CHUNK_SIZE)
+    return state.deleted
+
+
+def purge_variants(variant_ids, progress=None, chunk_size=None):
+    """Borra las variantes indicadas y sus reportes. Devuelve lo borrado."""
+    variants = GeneticVariant.objects.filter(pk__in=variant_ids)
+    state = Progress(progress, variants.count()
+                     + PatientVariantReport.objects.filter(variant_id__in=variant_ids).count())
+    try:
+        _delete_variants(variants, state, chunk_size or settings.PURGE_CHUNK_SIZE)
+    finally:
+        _variants_purged()
+    return state.deleted
+
+
+def purge_gene(gene_id, progress=None, chunk_size=None):
+    """Borra un gen con sus variantes y los reportes de estas. Devuelve lo
+    borrado, o None si el gen no existe."""
+    if not Gene.objects.filter(pk=gene_id).exists():
+        return None
+    chunk_size = chunk_size or settings.PURGE_CHUNK_SIZE
+    variants = GeneticVariant.objects.filter(gene_id=gene_id)
+    state = Progress(progress, variants.count() + 1
+                     + PatientVariantReport.objects.filter(variant__gene_id=gene_id).count())
+    try:
+        _delete_variants(variants, state, chunk_size)
+        with transaction.atomic():
+            list(Gene.objects.select_for_update().filter(pk=gene_id).values_list("pk"))
+            # Variantes creadas mientras tanto y resúmenes que aún apunten al gen
+            _delete_variants(variants, state, chunk_size)
+            _raw_delete(PatientVariantSummary, "gene", [gene_id])
+            _raw_delete(ReportDailyRollup, "gene", [gene_id])
+            deleted = _raw_delete(Gene, "id", [gene_id])
+        state.advance(genes=deleted)
+        gene_search.remove(gene_id)
+        gene_registry.deleted(gene_id)
+    finally:
+        _variants_purged()
+        response_cache.invalidate("gene", gene_id)
+    return state.deleted
@@ -0,0 +1,123 @@
+"""
+Conteo de reportes por día de detección, gen e impacto (ReportDailyRollup).
+
+Se mantiene en cada escritura de reportes con los mismos hechos que el
+resumen por paciente (ver summary.report_facts), así los tableros mensuales
+leen unos cientos de filas por mes en lugar de agrupar la tabla de reportes.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min
+
+from .models import PatientVariantReport, ReportDailyRollup
+
+
+def _keys(facts):
+    # (día, gen, impacto) de cada hecho
+    return Counter((detected, gene_id, impact) for _, gene_id, impact, _, detected in facts)
+
+
+def _rollup_rows(day, gene_id, impact):
+    return ReportDailyRollup.objects.filter(day=day, gene_id=gene_id, impact=impact)
+
+
+def _add_count(day, gene_id, impact, count):
+    rows = _rollup_rows(day, gene_id, impact)
+    if rows.update(reportCount=F("reportCount") + count):
+        return
+    try:
+        with transaction.atomic():
+            ReportDailyRollup.objects.create(day=day, gene_id=gene_id, impact=impact, reportCount=count)
+    except IntegrityError:
+        # Otra transacción creó la fila entre el update y el insert
+        rows.update(reportCount=F("reportCount") + count)
+
+
+def _subtract_count(day, gene_id, impact, count):
+    # Primero se borra la fila que llega a cero; el update no puede dejarla en cero
+    rows = _rollup_rows(day, gene_id, impact)
+    if not rows.filter(reportCount__lte=count).delete()[0]:
+        rows.update(reportCount=F("reportCount") - count)
+
+
+def apply(counts):
+    """Aplica {(día, gene_id, impacto): delta}. Las claves se recorren ordenadas
+    para que dos escrituras concurrentes bloqueen las filas en el mismo orden."""
+    with transaction.atomic():
+        for (day, gene_id, impact), delta in sorted(counts.items()):
+            if delta > 0:
+                _add_count(day, gene_id, impact, delta)
+            elif delta < 0:
+                _subtract_count(day, gene_id, impact, -delta)
+
+
+def add(facts):
+    apply(_keys(facts))
+
+
+def remove(facts):
+    apply({key: -count for key, count in _keys(facts).items()})
+
+
+def discount(keys):
+    # Reportes borrados por SQL directo: [(día, gene_id, impacto)]
+    apply({key: -count for key, count in Counter(keys).items()})
+
+
+def replace(old, new):
+    # Actualización de un reporte: solo cambia algo si se movió de día, gen o impacto
+    counts = _keys([new])
+    counts.subtract(_keys([old]))
+    apply(counts)
+
+
+def _rebuild_range(reports, rollups):
+    with transaction.atomic():
+        rollups.delete()
+        groups = (
+            reports.values("detectionDate", "variant__gene_id", "variant__impact")
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+        created = ReportDailyRollup.objects.bulk_create(
+            ReportDailyRollup(
+                day=group["detectionDate"], gene_id=group["variant__gene_id"],
+                impact=group["variant__impact"], reportCount=group["count"],
+            )
+            for group in groups
+        )
+    return len(created)
+
+
+def rebuild(days=None, chunk_days=31):
+    """Reconstruye el conteo desde los reportes, por ventanas de chunk_days días
+    (cada una en su transacción y leída por el índice de detectionDate).
+    days limita la reconstrucción a esos días. Devuelve las filas escritas."""
+    reports = PatientVariantReport.objects.all()
+    rollups = ReportDailyRollup.objects.all()
+    written = 0
+    if days is not None:
+        days = sorted(set(days))
+        for start in range(0, len(days), chunk_days):
+            chunk = days[start:start + chunk_days]
+            written += _rebuild_range(reports.filter(detectionDate__in=chunk), rollups.filter(day__in=chunk))
+        return written
+
+    bounds = reports.aggregate(first=Min("detectionDate"), last=Max("detectionDate"))
+    if bounds["first"] is None:
+        rollups.delete()
+        return 0
+    # Días que ya no tienen reportes
+    rollups.filter(day__lt=bounds["first"]).delete()
+    rollups.filter(day__gt=bounds["last"]).delete()
+    start = bounds["first"]
+    while start <= bounds["last"]:
+        end = start + timedelta(days=chunk_days)
+        written += _rebuild_range(
+            reports.filter(detectionDate__gte=start, detectionDate__lt=end),
+            rollups.filter(day__gte=start, day__lt=end),
+        )
+        start = end
+    return written
@@ -1,7 +1,65 @@
+import uuid
+from datetime import date
+from decimal import Decimal
 from rest_framework import serializers
-from .models import PatientVariantReport
+from .models import PatientVariantReport, PatientVariantSummary
+from variants.serializers import VariantSerializer, VariantExpandedSerializer
+from genomics.filtering import Filter
 
 class ReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = PatientVariantReport
         fields = "__all__"
+
+
+REPORT_FIELDS = ["id", "patientId", "detectionDate", "alleleFrequency", "variant"]
+
+
+class ReportVariantSerializer(ReportSerializer):
+    # Reporte con la variante anidada (?expand=variant)
+    variant = VariantSerializer(read_only=True)
+
+    class Meta(ReportSerializer.Meta):
+        fields = REPORT_FIELDS
+
+
+class ReportVariantGeneSerializer(ReportSerializer):
+    # Reporte con la variante y su gen anidados (?expand=variant,gene)
+    variant = VariantExpandedSerializer(read_only=True)
+
+    class Meta(ReportSerializer.Meta):
+        fields = REPORT_FIELDS
+
+
+REPORT_EXPANSIONS = ["variant", "gene"]
+
+REPORT_FILTERS = [
+    Filter("patientId", "patientId", many=True, description="Id del paciente."),
+    Filter("variant", "variant_id", uuid.UUID, many=True, description="Id de la variante."),
+    Filter("gene", "variant__gene_id", int, many=True, description="Id del gen de la variante."),
+    Filter("chromosome", "variant__chromosome", many=True, description="Cromosoma de la variante."),
+    Filter("impact", "variant__impact", many=True, description="Impacto de la variante."),
+    Filter("from", "detectionDate__gte", date, description="Fecha de detección mínima (YYYY-MM-DD)."),
+    Filter("to", "detectionDate__lte", date, description="Fecha de detección máxima (YYYY-MM-DD)."),
+    Filter("minAlleleFrequency", "alleleFrequency__gte", Decimal, description="Frecuencia alélica mínima."),
+    Filter("maxAlleleFrequency", "alleleFrequency__lte", Decimal, description="Frecuencia alélica máxima."),
+]
+
+REPORT_ORDERINGS = ["detectionDate", "alleleFrequency", "patientId"]
+
+
+def report_queryset_and_serializer(queryset, expand):
+    # Expandir el gen implica anidar también la variante que lo contiene
+    if "gene" in expand:
+        return queryset.select_related("variant__gene"), ReportVariantGeneSerializer
+    if "variant" in expand:
+        return queryset.select_related("variant"), ReportVariantSerializer
+    return queryset, ReportSerializer
+
+
+class PatientSummarySerializer(serializers.ModelSerializer):
+    geneSymbol = serializers.CharField(source="gene.symbol", read_only=True)
+
+    class Meta:
+        model = PatientVariantSummary
+        fields = ["gene", "geneSymbol", "impact", "reportCount", "maxAlleleFrequency", "latestDetectionDate"]
@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from variants.models import GeneticVariant
+from . import rollup, summary
+from .models import PatientVariantReport
+
+
+@receiver(pre_save, sender=PatientVariantReport)
+def report_saving(sender, instance, **kwargs):
+    # Hecho anterior para descontarlo del resumen tras la actualización
+    instance._summary_previous = None if instance._state.adding else summary.stored_fact(instance.pk)
+
+
+@receiver(post_save, sender=PatientVariantReport)
+def report_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_summary_previous", None)
+    fact = summary.report_facts([instance])[0]
+    if created or previous is None:
+        summary.add([fact])
+        rollup.add([fact])
+    else:
+        summary.replace(previous, fact)
+        rollup.replace(previous, fact)
+
+
+@receiver(post_delete, sender=PatientVariantReport)
+def report_deleted(sender, instance, **kwargs):
+    # En la cascada de una variante sus reportes se borran antes que ella
+    variant = (
+        GeneticVariant.objects.filter(pk=instance.variant_id)
+        .values_list("gene_id", "impact").first()
+    )
+    if variant is None:
+        summary.rebuild([instance.patientId])
+        rollup.rebuild([instance.detectionDate])
+    else:
+        facts = summary.report_facts([instance], {instance.variant_id: variant})
+        summary.remove(facts)
+        rollup.remove(facts)
+
+
+@receiver(pre_save, sender=GeneticVariant)
+def variant_saving(sender, instance, **kwargs):
+    instance._summary_previous = None if instance._state.adding else (
+        GeneticVariant.objects.filter(pk=instance.pk).values_list("gene_id", "impact").first()
+    )
+
+
+@receiver(post_save, sender=GeneticVariant)
+def variant_saved(sender, instance, created, **kwargs):
+    # Cambiar el gen o el impacto de una variante mueve sus reportes de grupo:
+    # se reconstruyen solo los pacientes y los días afectados
+    previous = getattr(instance, "_summary_previous", None)
+    if previous is not None and previous != (instance.gene_id, instance.impact):
+        patients, days = set(), set()
+        for patient_id, detected in instance.patient_reports.values_list("patientId", "detectionDate"):
+            patients.add(patient_id)
+            days.add(detected)
+        if patients:
+            summary.rebuild(sorted(patients))
+            rollup.rebuild(days)
@@ -0,0 +1,172 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Greatest
+
+from variants.models import GeneticVariant
+from .models import PatientVariantReport, PatientVariantSummary
+
+# Un "hecho" es lo que aporta un reporte al resumen:
+# (patientId, gene_id, impact, alleleFrequency, detectionDate)
+
+_frequency_field = PatientVariantReport._meta.get_field("alleleFrequency")
+_date_field = PatientVariantReport._meta.get_field("detectionDate")
+
+
+def report_facts(reports, variants=None):
+    # variants: {variant_id: (gene_id, impact)} si quien llama ya lo tiene
+    if variants is None:
+        variants = {
+            pk: (gene_id, impact)
+            for pk, gene_id, impact in GeneticVariant.objects
+            .filter(pk__in={report.variant_id for report in reports})
+            .values_list("pk", "gene_id", "impact")
+        }
+    facts = []
+    for report in reports:
+        gene_id, impact = variants[report.variant_id]
+        facts.append((
+            report.patientId, gene_id, impact,
+            _frequency_field.to_python(report.alleleFrequency),
+            _date_field.to_python(report.detectionDate),
+        ))
+    return facts
+
+
+def stored_fact(report_id):
+    return (
+        PatientVariantReport.objects.filter(pk=report_id)
+        .values_list("patientId", "variant__gene_id", "variant__impact", "alleleFrequency", "detectionDate")
+        .first()
+    )
+
+
+def _groups(facts):
+    groups = {}
+    for patient_id, gene_id, impact, frequency, detected in facts:
+        group = groups.get((patient_id, gene_id, impact))
+        if group is None:
+            groups[(patient_id, gene_id, impact)] = [1, frequency, detected]
+        else:
+            group[0] += 1
+            group[1] = max(group[1], frequency)
+            group[2] = max(group[2], detected)
+    return groups
+
+
+def _summary_rows(patient_id, gene_id, impact):
+    return PatientVariantSummary.objects.filter(patientId=patient_id, gene_id=gene_id, impact=impact)
+
+
+def _add_group(patient_id, gene_id, impact, count, frequency, detected):
+    rows = _summary_rows(patient_id, gene_id, impact)
+    changes = {
+        "reportCount": F("reportCount") + count,
+        "maxAlleleFrequency": Greatest("maxAlleleFrequency", Value(frequency)),
+        "latestDetectionDate": Greatest("latestDetectionDate", Value(detected)),
+    }
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            PatientVariantSummary.objects.create(
+                patientId=patient_id, gene_id=gene_id, impact=impact, reportCount=count,
+                maxAlleleFrequency=frequency, latestDetectionDate=detected,
+            )
+    except IntegrityError:
+        # Otra transacción creó el grupo entre el update y el insert
+        rows.update(**changes)
+
+
+def recompute_group(patient_id, gene_id, impact):
+    # Solo cuando se retira el máximo o la fecha más reciente del grupo
+    totals = PatientVariantReport.objects.filter(
+        patientId=patient_id, variant__gene_id=gene_id, variant__impact=impact,
+    ).aggregate(count=Count("pk"), frequency=Max("alleleFrequency"), detected=Max("detectionDate"))
+    rows = _summary_rows(patient_id, gene_id, impact)
+    if not totals["count"]:
+        rows.delete()
+    elif not rows.update(reportCount=totals["count"], maxAlleleFrequency=totals["frequency"],
+                         latestDetectionDate=totals["detected"]):
+        _add_group(patient_id, gene_id, impact, totals["count"], totals["frequency"], totals["detected"])
+
+
+def add(facts):
+    with transaction.atomic():
+        for (patient_id, gene_id, impact), (count, frequency, detected) in _groups(facts).items():
+            _add_group(patient_id, gene_id, impact, count, frequency, detected)
+
+
+def remove(facts):
+    with transaction.atomic():
+        for (patient_id, gene_id, impact), (count, frequency, detected) in _groups(facts).items():
+            summary = _summary_rows(patient_id, gene_id, impact).select_for_update().first()
+            if summary is None:
+                continue
+            extreme = frequency >= summary.maxAlleleFrequency or detected >= summary.latestDetectionDate
+            if summary.reportCount <= count or extreme:
+                recompute_group(patient_id, gene_id, impact)
+            else:
+                summary.reportCount -= count
+                summary.save(update_fields=["reportCount"])
+
+
+def replace(old, new):
+    # Actualización de un reporte: el hecho anterior ya no está en la BD
+    if old[:3] != new[:3]:
+        with transaction.atomic():
+            remove([old])
+            add([new])
+        return
+    patient_id, gene_id, impact = new[:3]
+    summary = _summary_rows(patient_id, gene_id, impact).first()
+    if summary is None or old[3] >= summary.maxAlleleFrequency or old[4] >= summary.latestDetectionDate:
+        recompute_group(patient_id, gene_id, impact)
+    else:
+        _summary_rows(patient_id, gene_id, impact).update(
+            maxAlleleFrequency=Greatest("maxAlleleFrequency", Value(new[3])),
+            latestDetectionDate=Greatest("latestDetectionDate", Value(new[4])),
+        )
+
+
+def rebuild(patient_ids=None, chunk_size=1000):
+    """Reconstruye los resúmenes desde los reportes, por rangos de pacientes
+    (cada rango en su transacción). Devuelve el número de grupos escritos."""
+    reports = PatientVariantReport.objects.all()
+    summaries = PatientVariantSummary.objects.all()
+    if patient_ids is not None:
+        reports = reports.filter(patientId__in=patient_ids)
+        summaries = summaries.filter(patientId__in=patient_ids)
+
+    patients = reports.order_by("patientId").values_list("patientId", flat=True).distinct()
+    written = 0
+    previous = None
+    while True:
+        page = patients if previous is None else patients.filter(patientId__gt=previous)
+        chunk = list(page[:chunk_size])
+        last = chunk[-1] if chunk else None
+        with transaction.atomic():
+            # También se borran los pacientes que ya no tienen reportes
+            stale = summaries if previous is None else summaries.filter(patientId__gt=previous)
+            if len(chunk) == chunk_size:
+                stale = stale.filter(patientId__lte=last)
+            stale.delete()
+            if chunk:
+                groups = (
+                    reports.filter(patientId__gte=chunk[0], patientId__lte=last)
+                    .values("patientId", "variant__gene_id", "variant__impact")
+                    .annotate(count=Count("pk"), frequency=Max("alleleFrequency"),
+                              detected=Max("detectionDate"))
+                    .order_by()
+                )
+                created = PatientVariantSummary.objects.bulk_create(
+                    PatientVariantSummary(
+                        patientId=group["patientId"], gene_id=group["variant__gene_id"],
+                        impact=group["variant__impact"], reportCount=group["count"],
+                        maxAlleleFrequency=group["frequency"], latestDetectionDate=group["detected"],
+                    )
+                    for group in groups
+                )
+                written += len(created)
+        if len(chunk) < chunk_size:
+            return written
+        previous = last
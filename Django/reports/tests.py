@@ -0,0 +1,100 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from genes.models import Gene
+from genomics.fastpath import FastSerializer
+from genomics.response_cache import response_cache
+from jobs.invalidation import job_invalidations
+from variants.models import GeneticVariant
+from .models import PatientVariantReport
+
+PATIENT_ID = "5b0f6d1e-8c1a-4a57-9d0e-3f2b6c7a9e10"
+
+
+def create_reports(count, offset=0):
+    genes = Gene.objects.bulk_create(
+        Gene(symbol=f"G{offset + i}", fullName="Gen", functionSummary="Función") for i in range(count)
+    )
+    variants = GeneticVariant.objects.bulk_create(
+        GeneticVariant(gene=gene, chromosome="1", position=offset + i + 1,
+                       referenceBase="A", alternateBase="T", impact="HIGH")
+        for i, gene in enumerate(genes)
+    )
+    # bulk_create no emite señales: los resúmenes no intervienen en el listado
+    PatientVariantReport.objects.bulk_create(
+        PatientVariantReport(patientId=f"P{offset + i}", variant=variant,
+                             detectionDate=datetime.date(2024, 1, 1), alleleFrequency=Decimal("0.5"))
+        for i, variant in enumerate(variants)
+    )
+
+
+@mock.patch.object(response_cache, "enabled", False)
+# Sin la consulta periódica de trabajos terminados, que alteraría los conteos
+@mock.patch.object(job_invalidations, "interval", float("inf"))
+class ReportListQueryCountTests(TestCase):
+    """Las consultas de un listado no crecen con la cantidad de reportes, por el
+    camino rápido (values + orjson) y por el serializer de DRF;
+    ?expand=variant,gene se resuelve con select_related."""
+
+    def get(self, path, fast):
+        # Comprueba además por qué camino se respondió
+        with mock.patch.object(FastSerializer, "response", autospec=True,
+                               side_effect=FastSerializer.response) as fast_response:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(fast_response.called, fast)
+        return response
+
+    def assert_genes_expanded(self, items):
+        expected = {
+            str(report_id): (str(variant_id), symbol)
+            for report_id, variant_id, symbol in PatientVariantReport.objects.values_list(
+                "id", "variant_id", "variant__gene__symbol",
+            )
+        }
+        for item in items:
+            variant_id, symbol = expected[item["id"]]
+            self.assertEqual(item["variant"]["id"], variant_id)
+            self.assertEqual(item["variant"]["gene"]["symbol"], symbol)
+
+    def assert_constant_queries(self, path, fast, patient_id=None):
+        create_reports(2)
+        if patient_id is not None:
+            PatientVariantReport.objects.update(patientId=patient_id)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(path, fast)
+        self.assertEqual(len(response.json()), 2)
+
+        create_reports(40, offset=2)
+        if patient_id is not None:
+            PatientVariantReport.objects.update(patientId=patient_id)
+        with self.assertNumQueries(len(queries)):
+            response = self.get(path, fast)
+        items = response.json()
+        self.assertEqual(len(items), 42)
+        return items
+
+    def test_list_fast_path(self):
+        items = self.assert_constant_queries("/reports/", fast=True)
+        self.assertIsInstance(items[0]["variant"], str)
+
+    @override_settings(FAST_SERIALIZATION=False)
+    def test_list_serializer(self):
+        items = self.assert_constant_queries("/reports/", fast=False)
+        self.assertIsInstance(items[0]["variant"], str)
+
+    def test_list_expand_variant_gene(self):
+        # El camino rápido solo admite serializers planos: con expand responde DRF
+        items = self.assert_constant_queries("/reports/?expand=variant,gene", fast=False)
+        self.assert_genes_expanded(items)
+
+    def test_patient_reports_expand(self):
+        items = self.assert_constant_queries(
+            f"/reports/patient/{PATIENT_ID}/?expand=gene", fast=False, patient_id=PATIENT_ID,
+        )
+        self.assert_genes_expanded(items)
@@ -1,8 +1,18 @@
 from django.urls import path
-from .views import ReportListCreateView, ReportDetailView, PatientReportsView
+from .async_views import AsyncReportCreateView, AsyncPatientReportsView
+from .views import CohortStatsView, ReportDailyView, ReportExportView, PatientReportsPurgeView, ReportListCreateView, ReportBulkCreateView, ReportDetailView, PatientReportsView, PatientSummaryView, PatientCacheStatsView
 
 urlpatterns = [
     path("", ReportListCreateView.as_view(), name="report-list-create"),
+    path("patient-cache/", PatientCacheStatsView.as_view(), name="patient-cache-stats"),
+    path("bulk/", ReportBulkCreateView.as_view(), name="report-bulk-create"),
+    path("export/", ReportExportView.as_view(), name="report-export"),
+    path("cohort/", CohortStatsView.as_view(), name="report-cohort-stats"),
+    path("daily/", ReportDailyView.as_view(), name="report-daily"),
     path("<uuid:id>/", ReportDetailView.as_view(), name="report-detail"),
     path("patient/<uuid:patientId>/", PatientReportsView.as_view(), name="patient-reports"),
+    path("patient/<uuid:patientId>/purge/", PatientReportsPurgeView.as_view(), name="patient-reports-purge"),
+    path("patient/<uuid:patientId>/summary/", PatientSummaryView.as_view(), name="patient-summary"),
+    path("async/", AsyncReportCreateView.as_view(), name="report-create-async"),
+    path("async/patient/<uuid:patientId>/", AsyncPatientReportsView.as_view(), name="patient-reports-async"),
 ]
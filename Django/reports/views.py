@@ -1,32 +1,72 @@
-import requests
+import time
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from .models import PatientVariantReport
-from .serializers import ReportSerializer
-from .dtos import ReportDTO
+from rest_framework import serializers, status
+from . import rollup, summary
+from .models import PatientVariantReport, PatientVariantSummary, ReportDailyRollup
+from .serializers import (
+    REPORT_EXPANSIONS,
+    REPORT_FILTERS,
+    REPORT_ORDERINGS,
+    PatientSummarySerializer,
+    ReportSerializer,
+    report_queryset_and_serializer,
+)
+from .cohort import cohort_store
+from .dtos import CohortQueryDTO, ReportDailyQueryDTO, ReportDTO, ReportBulkDTO, ReportExportDTO
+from .gateway import GatewayError, check_patients, patient_exists
+from .patient_cache import patient_cache
 from variants.models import GeneticVariant
+from genes.registry import gene_registry
+from genomics.expand import ExpandError, expand_parameter, parse_expand
+from genomics.fastpath import fast_serializer_for
+from genomics.filtering import filter_parameters, ordering_parameter
+from genomics.pagination import LIST_PARAMETERS, list_response
+from genomics.renderers import EXPORT_RENDERERS
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from jobs.views import accepted_response
 
 from drf_spectacular.utils import (
     extend_schema,
+    OpenApiParameter,
     OpenApiRequest,
     OpenApiResponse,
     OpenApiExample,
 )
 
-# URL del gateway que expone el microservicio de Clínica
-GATEWAY_PATIENT_URL = "http://clinica-app-service:3000/api/v1/clinica/gestion-pacientes/searchPatient?document="
-# GATEWAY_PATIENT_URL = "http://localhost:60855/api/v1/clinica/gestion-pacientes/searchPatient?document="
-
 class ReportListCreateView(APIView):
+    renderer_classes = EXPORT_RENDERERS
+
     @extend_schema(
         summary="Listar reportes clínicos",
+        description="Admite filtros, orden (ordering), proyección de campos (fields), "
+                    "paginación por cursor (limit/cursor) y streaming (stream). "
+                    "Con Accept application/msgpack responde en MessagePack (los UUID como "
+                    "extensión tipo 1 con sus 16 bytes, decimales y fechas como texto) y con "
+                    "application/vnd.apache.arrow.stream (o ?format=arrow) exporta la "
+                    "tabla completa (filtrada) como stream Arrow IPC columnar; Arrow no "
+                    "admite expand, stream ni limit/cursor (responde 400). "
+                    "El rango from/to se resuelve con el índice de detectionDate.",
+        parameters=LIST_PARAMETERS + filter_parameters(REPORT_FILTERS) + [
+            ordering_parameter(REPORT_ORDERINGS),
+            expand_parameter(REPORT_EXPANSIONS),
+        ],
         responses=OpenApiResponse(ReportSerializer (many=True)),
     )
     def get(self, request):
-        reports = PatientVariantReport.objects.all()
-        serializer = ReportSerializer(reports, many=True)
-        return Response(serializer.data)
+        try:
+            expand = parse_expand(request, REPORT_EXPANSIONS)
+        except ExpandError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        queryset, serializer_class = report_queryset_and_serializer(PatientVariantReport.objects.all(), expand)
+        return list_response(request, queryset, serializer_class, REPORT_FILTERS, REPORT_ORDERINGS)
 
     @extend_schema(
         summary="Crear reporte clínico",
@@ -60,18 +100,11 @@ class ReportListCreateView(APIView):
         # Validar paciente en el microservicio de Clínica a través del gateway
         token = request.headers.get("Authorization", "")
         try:
-            patient_resp = requests.get(
-                GATEWAY_PATIENT_URL + dto.patientId,
-                headers={"Authorization": token} if token else {},
-                timeout=5,
-            )
-        except requests.RequestException as exc:
-            return Response(
-                {"error": f"Error al contactar la clinica: {exc}"},
-                status=status.HTTP_502_BAD_GATEWAY,
-            )
+            exists = patient_exists(dto.patientId, token)
+        except GatewayError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_502_BAD_GATEWAY)
 
-        if patient_resp.status_code != 200:
+        if not exists:
             return Response({"error": "Paciente no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
 
@@ -91,25 +124,130 @@ class ReportListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ReportBulkCreateView(APIView):
+    # Mismas reglas que el campo alleleFrequency del modelo, sin consultar la BD
+    allele_frequency_field = serializers.DecimalField(max_digits=5, decimal_places=3)
+
+    @extend_schema(
+        summary="Crear reportes clínicos en lote",
+        request=OpenApiRequest(ReportBulkDTO),
+        description="Recibe una lista de ReportDTO. Los pacientes se validan una sola vez "
+                    "cada uno y en paralelo contra el gateway, las variantes con una única "
+                    "consulta y los reportes válidos se insertan con bulk_create. "
+                    "Devuelve el resultado de cada elemento en el mismo orden.",
+        responses={
+            201: OpenApiResponse(description="Todos los reportes fueron creados"),
+            207: OpenApiResponse(description="Algunos reportes fallaron; ver results"),
+            400: OpenApiResponse(description="El cuerpo no es una lista válida"),
+        },
+    )
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"error": "Se esperaba una lista de reportes"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.REPORT_BULK_MAX_ITEMS:
+            return Response(
+                {"error": f"Máximo {settings.REPORT_BULK_MAX_ITEMS} reportes por lote"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(items)
+        pending = []
+        for index, item in enumerate(items):
+            try:
+                dto = ReportDTO(**item)
+                variant_id = uuid.UUID(dto.variantId)
+                frequency = self.allele_frequency_field.run_validation(dto.alleleFrequency)
+            except serializers.ValidationError as e:
+                results[index] = {"index": index, "status": 400,
+                                  "error": {"alleleFrequency": e.detail}}
+                continue
+            except Exception as e:
+                results[index] = {"index": index, "status": 400, "error": str(e)}
+                continue
+            pending.append((index, dto, variant_id, frequency))
+
+        token = request.headers.get("Authorization", "")
+        patients = check_patients([dto.patientId for _, dto, _, _ in pending], token)
+        variants = {
+            pk: (gene_id, impact)
+            for pk, gene_id, impact in GeneticVariant.objects
+            .filter(id__in={variant_id for _, _, variant_id, _ in pending})
+            .values_list("id", "gene_id", "impact")
+        }
+
+        to_create = []
+        for index, dto, variant_id, frequency in pending:
+            patient = patients[dto.patientId]
+            if isinstance(patient, GatewayError):
+                results[index] = {"index": index, "status": 502, "error": str(patient)}
+            elif not patient:
+                results[index] = {"index": index, "status": 404, "error": "Paciente no encontrado"}
+            elif variant_id not in variants:
+                results[index] = {"index": index, "status": 404,
+                                  "error": "Variante genética no encontrada"}
+            else:
+                to_create.append((index, PatientVariantReport(
+                    patientId=dto.patientId,
+                    variant_id=variant_id,
+                    detectionDate=dto.detectionDate,
+                    alleleFrequency=frequency,
+                )))
+
+        reports = [report for _, report in to_create]
+        with transaction.atomic():
+            PatientVariantReport.objects.bulk_create(reports)
+            # bulk_create no emite post_save
+            facts = summary.report_facts(reports, variants)
+            summary.add(facts)
+            rollup.add(facts)
+        for index, report in to_create:
+            results[index] = {"index": index, "status": 201, "data": ReportSerializer(report).data}
+
+        created = len(to_create)
+        return Response(
+            {"created": created, "failed": len(items) - created, "results": results},
+            status=status.HTTP_201_CREATED if created == len(items) else status.HTTP_207_MULTI_STATUS,
+        )
+
+
 class ReportDetailView(APIView):
-    def get_object(self, id):
+    def get_object(self, id, queryset=None):
+        if queryset is None:
+            queryset = PatientVariantReport.objects.all()
         try:
-            return PatientVariantReport.objects.get(id=id)
+            return queryset.get(id=id)
         except PatientVariantReport.DoesNotExist:
             return None
 
     @extend_schema(
         summary="Obtener reporte por ID",
+        parameters=[expand_parameter(REPORT_EXPANSIONS)],
         responses={
             200: ReportSerializer,
+            400: OpenApiResponse(description="Parámetro expand inválido"),
             404: OpenApiResponse(description="Reporte no encontrado"),
         }
     )
     def get(self, request, id):
-        report = self.get_object(id)
+        try:
+            expand = parse_expand(request, REPORT_EXPANSIONS)
+        except ExpandError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        queryset, serializer_class = report_queryset_and_serializer(PatientVariantReport.objects.all(), expand)
+
+        fast = fast_serializer_for(request, serializer_class)
+        if fast is not None:
+            row = fast.get(queryset.filter(id=id))
+            if row is None:
+                return Response({"error": "Reporte no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+            return fast.response(row)
+
+        report = self.get_object(id, queryset)
         if report is None:
             return Response({"error": "Reporte no encontrado"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = ReportSerializer(report)
+        serializer = serializer_class(report)
         return Response(serializer.data)
 
     @extend_schema(
@@ -161,11 +299,187 @@ class PatientReportsView(APIView):
                 "required": True,
                 "description": "ID del paciente en el sistema clínico",
                 "schema": {"type": "string"}
-            }
+            },
+            expand_parameter(REPORT_EXPANSIONS),
         ],
         responses=OpenApiResponse(ReportSerializer (many=True)),
     )
     def get(self, request, patientId):
-        reports = PatientVariantReport.objects.filter(patientId=patientId)
-        serializer = ReportSerializer(reports, many=True)
+        try:
+            expand = parse_expand(request, REPORT_EXPANSIONS)
+        except ExpandError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        reports, serializer_class = report_queryset_and_serializer(
+            PatientVariantReport.objects.filter(patientId=patientId), expand
+        )
+        serializer = serializer_class(reports, many=True)
         return Response(serializer.data)
+
+
+class PatientSummaryView(APIView):
+    @extend_schema(
+        summary="Resumen de variantes de un paciente",
+        description="Conteo de reportes por gen e impacto, frecuencia alélica máxima y "
+                    "última fecha de detección, leídos de la tabla de resumen que se "
+                    "mantiene al crear, actualizar o eliminar reportes.",
+        parameters=[
+            {
+                "name": "patientId",
+                "in": "path",
+                "required": True,
+                "description": "ID del paciente en el sistema clínico",
+                "schema": {"type": "string"}
+            },
+        ],
+        responses=OpenApiResponse(description="Totales del paciente y grupos por gen e impacto"),
+    )
+    def get(self, request, patientId):
+        groups = list(
+            PatientVariantSummary.objects.filter(patientId=patientId)
+            .select_related("gene").order_by("gene__symbol", "impact")
+        )
+        data = PatientSummarySerializer(groups, many=True).data
+        return Response({
+            "patientId": str(patientId),
+            "reportCount": sum(group["reportCount"] for group in data),
+            # Mismo formato decimal que en los grupos
+            "maxAlleleFrequency": max((group["maxAlleleFrequency"] for group in data), key=Decimal, default=None),
+            "latestDetectionDate": max((group["latestDetectionDate"] for group in data), default=None),
+            "groups": data,
+        })
+
+
+class CohortStatsView(APIView):
+    @extend_schema(
+        summary="Estadísticas de frecuencia alélica de la cohorte",
+        description="Media, mediana, percentiles e histograma de alleleFrequency, portadores "
+                    "por variante y carga por gen (pacientes distintos), calculados con NumPy "
+                    "sobre un snapshot en memoria de los reportes que se renueva cada "
+                    "COHORT_STATS_TTL segundos.",
+        parameters=[
+            OpenApiParameter("from", str, description="Fecha de detección mínima (YYYY-MM-DD)"),
+            OpenApiParameter("to", str, description="Fecha de detección máxima (YYYY-MM-DD)"),
+            OpenApiParameter("impact", str, description="Impactos separados por coma, p. ej. HIGH,MODERATE"),
+            OpenApiParameter("gene", int, description="ID del gen"),
+            OpenApiParameter("bins", int, description="Intervalos del histograma en [0, 1] (1-200)"),
+            OpenApiParameter("top", int, description="Variantes y genes a listar (1-500)"),
+        ],
+        responses={
+            200: OpenApiResponse(description="Estadísticas de la cohorte filtrada"),
+            400: OpenApiResponse(description="Parámetros inválidos"),
+        },
+    )
+    def get(self, request):
+        try:
+            dto = CohortQueryDTO(**request.query_params.dict())
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        columns = cohort_store.get()
+        stats = columns.stats(dto.date_from, dto.date_to, dto.impacts, dto.gene, dto.bins, dto.top)
+        stats["snapshotAgeSeconds"] = round(time.monotonic() - columns.built_at, 1)
+        return Response(stats)
+
+
+class ReportDailyView(APIView):
+    @extend_schema(
+        summary="Reportes por día (o mes), gen e impacto",
+        description="Conteos leídos de la tabla de conteo diario, que se mantiene al crear, "
+                    "actualizar o eliminar reportes; no recorre la tabla de reportes. "
+                    "Con period=month se suman los días de cada mes.",
+        parameters=[
+            OpenApiParameter("from", str, description="Fecha de detección mínima (YYYY-MM-DD)"),
+            OpenApiParameter("to", str, description="Fecha de detección máxima (YYYY-MM-DD)"),
+            OpenApiParameter("impact", str, description="Impactos separados por coma, p. ej. HIGH,MODERATE"),
+            OpenApiParameter("gene", int, description="ID del gen"),
+            OpenApiParameter("period", str, enum=["day", "month"], description="Agrupar por día (por defecto) o por mes"),
+        ],
+        responses={
+            200: OpenApiResponse(description="Total y conteos por periodo, gen e impacto"),
+            400: OpenApiResponse(description="Parámetros inválidos"),
+        },
+    )
+    def get(self, request):
+        try:
+            dto = ReportDailyQueryDTO(**request.query_params.dict())
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = ReportDailyRollup.objects.all()
+        if dto.date_from:
+            rows = rows.filter(day__gte=dto.date_from)
+        if dto.date_to:
+            rows = rows.filter(day__lte=dto.date_to)
+        if dto.impacts:
+            rows = rows.filter(impact__in=dto.impacts)
+        if dto.gene is not None:
+            rows = rows.filter(gene_id=dto.gene)
+        groups = (
+            rows.values("gene_id", "impact", period=TruncMonth("day") if dto.period == "month" else F("day"))
+            .annotate(count=Sum("reportCount"))
+            .order_by("period", "gene_id", "impact")
+        )
+        data = [
+            {
+                "period": group["period"].isoformat(),
+                "gene": group["gene_id"],
+                "geneSymbol": gene_registry.symbol_for(group["gene_id"]),
+                "impact": group["impact"],
+                "reportCount": group["count"],
+            }
+            for group in groups
+        ]
+        return Response({
+            "period": dto.period,
+            "reportCount": sum(group["reportCount"] for group in data),
+            "groups": data,
+        })
+
+
+class PatientReportsPurgeView(APIView):
+    @extend_schema(
+        summary="Purgar los reportes de un paciente en segundo plano",
+        description="Encola el borrado de todos los reportes del paciente en lotes de "
+                    "PURGE_CHUNK_SIZE (una transacción por lote; el resumen del paciente se "
+                    "mantiene en cada lote). El progreso se consulta en /jobs/{id}/.",
+        request=None,
+        parameters=[
+            OpenApiParameter("patientId", str, OpenApiParameter.PATH,
+                             description="ID del paciente en el sistema clínico"),
+        ],
+        responses={202: OpenApiResponse(JobSerializer, description="Trabajo en cola")},
+    )
+    def post(self, request, patientId):
+        return accepted_response(enqueue("reports.purge_patient", {"patient_id": str(patientId)}))
+
+
+class ReportExportView(APIView):
+    @extend_schema(
+        summary="Exportar reportes en segundo plano",
+        description="Encola la exportación completa (o de un paciente) a Arrow IPC o CSV y "
+                    "responde 202 con el trabajo. El archivo se descarga desde "
+                    "/jobs/{id}/result/ cuando el trabajo termina.",
+        request=OpenApiRequest(ReportExportDTO),
+        responses={
+            202: OpenApiResponse(JobSerializer, description="Trabajo en cola"),
+            400: OpenApiResponse(description="Parámetros inválidos"),
+        },
+    )
+    def post(self, request):
+        try:
+            dto = ReportExportDTO(**request.data)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        job = enqueue("reports.export", {"format": dto.format, "patient_id": dto.patientId})
+        return accepted_response(job)
+
+
+class PatientCacheStatsView(APIView):
+    @extend_schema(
+        summary="Estadísticas de la caché de pacientes",
+        description="Aciertos y fallos de la caché de validación de pacientes contra Clínica "
+                    "(contadores del proceso que atiende la petición).",
+        responses=OpenApiResponse(description="Contadores de la caché"),
+    )
+    def get(self, request):
+        return Response(patient_cache.stats())
@@ -6,3 +6,4 @@ class GeneticVariantAdmin(admin.ModelAdmin):
     list_display = ("id", "gene", "chromosome", "position", "impact")
     list_filter = ("chromosome", "impact")
     search_fields = ("gene__symbol",)
+    list_select_related = ("gene",)
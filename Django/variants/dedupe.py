@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models import Count
+
+LOCUS_FIELDS = ["chromosome", "position", "referenceBase", "alternateBase"]
+
+
+def duplicate_loci(variant_model):
+    return (
+        variant_model.objects.values(*LOCUS_FIELDS)
+        .annotate(copies=Count("pk"))
+        .filter(copies__gt=1)
+        .order_by()
+    )
+
+
+def merge_duplicates(variant_model, report_model, dry_run=False):
+    """Fusiona las variantes con el mismo locus en la de menor id: sus reportes
+    se reasignan a ella y las copias se eliminan.
+
+    Recibe los modelos (la migración 0004 guarda su propia copia de esta
+    lógica con los modelos históricos). Devuelve las estadísticas y los pacientes cuyos reportes cambiaron de gen o impacto
+    (su resumen por paciente debe reconstruirse).
+    """
+    stats = {"loci": 0, "removed": 0, "repointed": 0}
+    moved_patients = set()
+    for locus in list(duplicate_loci(variant_model)):
+        locus.pop("copies")
+        keep, *copies = variant_model.objects.filter(**locus).order_by("pk").values_list("pk", "gene_id", "impact")
+        copy_ids = [pk for pk, _, _ in copies]
+        reports = report_model.objects.filter(variant_id__in=copy_ids)
+        moved = [pk for pk, gene_id, impact in copies if (gene_id, impact) != keep[1:]]
+        if moved:
+            moved_patients.update(
+                report_model.objects.filter(variant_id__in=moved).values_list("patientId", flat=True)
+            )
+
+        stats["loci"] += 1
+        stats["removed"] += len(copy_ids)
+        if dry_run:
+            stats["repointed"] += reports.count()
+            continue
+        with transaction.atomic():
+            stats["repointed"] += reports.update(variant_id=keep[0])
+            variant_model.objects.filter(pk__in=copy_ids).delete()
+    return stats, moved_patients
@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+import uuid
+from typing import Optional
+
+from pydantic import BaseModel, Field, RootModel, model_validator
 
 class VariantDTO(BaseModel):
     geneId: int
@@ -7,3 +10,35 @@ class VariantDTO(BaseModel):
     referenceBase: str
     alternateBase: str
     impact: str
+
+
+class VariantBulkItemDTO(VariantDTO):
+    # En cargas masivas el gen puede indicarse por id o por símbolo
+    geneId: Optional[int] = None
+    geneSymbol: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_gene(self):
+        if (self.geneId is None) == (self.geneSymbol is None):
+            raise ValueError("Indique geneId o geneSymbol (uno de los dos)")
+        return self
+
+
+class VariantBulkDTO(RootModel[list[VariantBulkItemDTO]]):
+    pass
+
+
+class VariantPurgeDTO(BaseModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=10000)
+
+
+class RegionQueryDTO(BaseModel):
+    chrom: str
+    start: int
+    end: int
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.start < 1 or self.end < self.start:
+            raise ValueError("Se requiere 1 <= start <= end")
+        return self
@@ -0,0 +1,88 @@
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+
+from genomics.db_router import primary_reads
+from genomics.exports import iter_value_chunks
+from genomics.filtering import Ordering
+
+from .models import GeneticVariant
+
+
+class ChromosomeIndex:
+    # Posiciones ordenadas de un cromosoma; la búsqueda de solapamiento se
+    # resuelve con searchsorted sobre el arreglo de inicios.
+    def __init__(self, starts, ends, ids):
+        self.starts = starts
+        self.ends = ends
+        self.ids = ids
+        self.max_span = int((ends - starts).max()) + 1 if len(starts) else 1
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def load(cls, chromosome):
+        # Páginas por keyset sobre (position, id): iterator() no evita que
+        # mysqlclient cargue el resultado completo en memoria
+        chunks = iter_value_chunks(
+            GeneticVariant.objects.filter(chromosome=chromosome),
+            ["position", "referenceBase"],
+            settings.LIST_STREAM_CHUNK_SIZE,
+            Ordering(GeneticVariant, "position"),
+        )
+        starts, ends, ids = [], [], bytearray()
+        # Se arma dentro de un GET pero sirve a todo el proceso: no desde la réplica
+        with primary_reads():
+            for rows in chunks:
+                for variant_id, position, reference in rows:
+                    starts.append(position)
+                    ends.append(position + max(len(reference), 1) - 1)
+                    ids += variant_id.bytes
+        return cls(
+            np.array(starts, dtype=np.int64),
+            np.array(ends, dtype=np.int64),
+            np.frombuffer(bytes(ids), dtype=np.uint8).reshape(-1, 16),
+        )
+
+    def overlapping(self, start, end):
+        # Una variante [pos, pos + len(ref) - 1] solapa [start, end] si
+        # pos <= end y su fin >= start; el fin está acotado por max_span.
+        lo = np.searchsorted(self.starts, start - self.max_span + 1, side="left")
+        hi = np.searchsorted(self.starts, end, side="right")
+        mask = self.ends[lo:hi] >= start
+        return [uuid.UUID(bytes=raw.tobytes()) for raw in self.ids[lo:hi][mask]]
+
+
+class VariantIntervalIndex:
+    def __init__(self):
+        self._chromosomes = {}
+        self._lock = threading.Lock()
+
+    def _get(self, chromosome):
+        ttl = settings.VARIANT_INDEX_TTL
+        index = self._chromosomes.get(chromosome)
+        if index is not None and time.monotonic() - index.built_at < ttl:
+            return index
+        with self._lock:
+            index = self._chromosomes.get(chromosome)
+            if index is None or time.monotonic() - index.built_at >= ttl:
+                index = ChromosomeIndex.load(chromosome)
+                self._chromosomes[chromosome] = index
+        return index
+
+    def overlapping(self, chromosome, start, end):
+        return self._get(chromosome).overlapping(start, end)
+
+    def invalidate(self, chromosome=None):
+        with self._lock:
+            if chromosome is None:
+                self._chromosomes.clear()
+            else:
+                self._chromosomes.pop(chromosome, None)
+
+
+# Índice por proceso; se invalida con las señales de GeneticVariant y, entre
+# workers, caduca tras VARIANT_INDEX_TTL segundos.
+variant_index = VariantIntervalIndex()
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from genomics.response_cache import response_cache
+from reports.models import PatientVariantReport
+from reports import rollup
+from reports.summary import rebuild
+from variants.dedupe import merge_duplicates
+from variants.intervals import variant_index
+from variants.models import GeneticVariant
+
+
+class Command(BaseCommand):
+    help = ("Fusiona las variantes repetidas (mismo chromosome, position, referenceBase y "
+            "alternateBase) en la de menor id y reasigna sus reportes. La migración que "
+            "agrega la clave única ya lo hace; sirve para bases restauradas o cargadas "
+            "sin la restricción.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Solo informa lo que se fusionaría")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stats, moved_patients = merge_duplicates(GeneticVariant, PatientVariantReport, options["dry_run"])
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}{stats['loci']} loci repetidos, {stats['removed']} variantes duplicadas, "
+            f"{stats['repointed']} reportes reasignados"
+        )
+        if options["dry_run"] or not stats["removed"]:
+            return
+
+        # Los borrados de la fusión no pasan por los reportes reasignados
+        variant_index.invalidate()
+        response_cache.invalidate("variant")
+        response_cache.invalidate("variant-bulk")
+        if moved_patients:
+            rebuild(sorted(moved_patients))
+            # La fusión no registra los días movidos; el comando ya recorre toda la tabla
+            rollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Fusión completada en {time.perf_counter() - started:.1f}s; "
+            f"{len(moved_patients)} resúmenes de paciente reconstruidos"
+        ))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from variants.vcf import VcfError, import_vcf
+
+
+class Command(BaseCommand):
+    help = "Importa variantes genéticas desde un archivo VCF (plano o bgzip)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Ruta al archivo .vcf o .vcf.gz")
+        parser.add_argument("--batch-size", type=int, default=settings.VCF_IMPORT_BATCH_SIZE)
+        parser.add_argument("--default-impact", default="UNKNOWN",
+                            help="Impacto usado cuando el INFO no lo informa")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size debe ser mayor que 0")
+        try:
+            fileobj = open(options["path"], "rb")
+        except OSError as exc:
+            raise CommandError(f"No se pudo abrir el archivo: {exc}")
+
+        with fileobj:
+            try:
+                stats = import_vcf(fileobj, options["batch_size"], options["default_impact"])
+            except VcfError as exc:
+                raise CommandError(str(exc))
+
+        summary = stats.as_dict()
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['imported']} variantes nuevas, {summary['updated']} actualizadas y "
+            f"{summary['unchanged']} sin cambios en {summary['seconds']}s "
+            f"({summary['rowsPerSecond']} filas/s), {summary['rejected']} rechazadas"
+        ))
+        for rejection in summary["rejections"]:
+            self.stdout.write(f"  línea {rejection['line']}: {rejection['reason']}")
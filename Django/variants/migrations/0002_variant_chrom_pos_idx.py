@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('variants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='geneticvariant',
+            index=models.Index(fields=['chromosome', 'position'], name='variant_chrom_pos_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.26 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('variants', '0002_variant_chrom_pos_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='geneticvariant',
+            index=models.Index(fields=['chromosome', 'position', 'referenceBase', 'alternateBase'], name='variant_locus_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='geneticvariant',
+            index=models.Index(fields=['impact'], name='variant_impact_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='geneticvariant',
+            name='variant_chrom_pos_idx',
+        ),
+    ]
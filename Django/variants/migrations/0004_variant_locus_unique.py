@@ -0,0 +1,45 @@
+# Generated by Django 4.2.26 on 2026-10-18 13:13
+
+from django.db import migrations, models
+from django.db.models import Count
+
+LOCUS_FIELDS = ["chromosome", "position", "referenceBase", "alternateBase"]
+
+
+def merge_duplicate_variants(apps, schema_editor):
+    # La restricción única falla si ya existen loci repetidos: cada locus se
+    # queda con la variante de menor id y sus copias le ceden los reportes.
+    # Copia fija de variants.dedupe.merge_duplicates (la migración no debe
+    # depender del código actual de la app).
+    db = schema_editor.connection.alias
+    GeneticVariant = apps.get_model("variants", "GeneticVariant")
+    PatientVariantReport = apps.get_model("reports", "PatientVariantReport")
+    loci = list(
+        GeneticVariant.objects.using(db).values(*LOCUS_FIELDS)
+        .annotate(copies=Count("pk")).filter(copies__gt=1).order_by()
+    )
+    for locus in loci:
+        locus.pop("copies")
+        keep, *copies = GeneticVariant.objects.using(db).filter(**locus).order_by("pk").values_list("pk", flat=True)
+        PatientVariantReport.objects.using(db).filter(variant_id__in=copies).update(variant_id=keep)
+        GeneticVariant.objects.using(db).filter(pk__in=copies).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('variants', '0003_variant_locus_impact_idx'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_variants, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='geneticvariant',
+            name='variant_locus_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='geneticvariant',
+            constraint=models.UniqueConstraint(fields=('chromosome', 'position', 'referenceBase', 'alternateBase'), name='variant_locus_unique'),
+        ),
+    ]
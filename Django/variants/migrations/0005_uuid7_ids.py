@@ -0,0 +1,25 @@
+# Generated by Django 4.2.26 on 2026-10-18 13:34
+
+from django.db import migrations, models
+import genomics.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('variants', '0004_variant_locus_unique'),
+    ]
+
+    operations = [
+        # El default lo aplica Django al crear la fila: solo cambia el estado,
+        # sin ALTER sobre la tabla
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='geneticvariant',
+                    name='id',
+                    field=models.UUIDField(default=genomics.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -1,9 +1,9 @@
-import uuid
 from django.db import models
+from genomics.ids import uuid7
 from genes.models import Gene
 
 class GeneticVariant(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     gene = models.ForeignKey(Gene, on_delete=models.CASCADE, related_name="variants")
     chromosome = models.CharField(max_length=10)
     position = models.IntegerField()
@@ -11,5 +11,18 @@ class GeneticVariant(models.Model):
     alternateBase = models.CharField(max_length=5)
     impact = models.CharField(max_length=50)
 
+    class Meta:
+        constraints = [
+            # Clave natural; su índice cubre también las consultas por región
+            # (prefijo chromosome, position)
+            models.UniqueConstraint(
+                fields=["chromosome", "position", "referenceBase", "alternateBase"],
+                name="variant_locus_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["impact"], name="variant_impact_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.gene.symbol} {self.chromosome}:{self.position} {self.referenceBase}>{self.alternateBase}"
@@ -1,7 +1,52 @@
 from rest_framework import serializers
 from .models import GeneticVariant
+from genes.models import Gene
+from genes.registry import gene_registry
+from genes.serializers import GeneSerializer
+from genomics.filtering import Filter
+
+class RegistryGeneField(serializers.PrimaryKeyRelatedField):
+    # Valida el gen contra el registro en memoria, sin consultar la BD
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            gene_id = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if not gene_registry.exists(gene_id):
+            self.fail("does_not_exist", pk_value=data)
+        return Gene(pk=gene_id)
+
 
 class VariantSerializer(serializers.ModelSerializer):
+    gene = RegistryGeneField(queryset=Gene.objects.all())
+
     class Meta:
         model = GeneticVariant
         fields = "__all__"
+
+
+class VariantExpandedSerializer(VariantSerializer):
+    # Variante con el gen anidado (?expand=gene); requiere select_related("gene")
+    gene = GeneSerializer(read_only=True)
+
+    class Meta(VariantSerializer.Meta):
+        fields = ["id", "chromosome", "position", "referenceBase", "alternateBase", "impact", "gene"]
+
+
+VARIANT_EXPANSIONS = ["gene"]
+
+VARIANT_FILTERS = [
+    Filter("gene", "gene_id", int, many=True, description="Id del gen."),
+    Filter("chromosome", "chromosome", many=True, description="Cromosoma."),
+    Filter("impact", "impact", many=True, description="Impacto (p. ej. HIGH)."),
+]
+
+VARIANT_ORDERINGS = ["chromosome", "position", "impact"]
+
+
+def variant_queryset_and_serializer(queryset, expand):
+    if "gene" in expand:
+        return queryset.select_related("gene"), VariantExpandedSerializer
+    return queryset, VariantSerializer
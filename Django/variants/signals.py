@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from genomics.response_cache import response_cache
+from .intervals import variant_index
+from .models import GeneticVariant
+
+
+@receiver(post_save, sender=GeneticVariant)
+def variant_saved(sender, instance, created, **kwargs):
+    # En una actualización el cromosoma anterior puede haber cambiado. Tras el
+    # commit: antes, otra petición podría reconstruir el índice sin el cambio
+    chromosome = instance.chromosome if created else None
+    transaction.on_commit(lambda: variant_index.invalidate(chromosome))
+    response_cache.invalidate("variant", instance.pk)
+
+
+@receiver(post_delete, sender=GeneticVariant)
+def variant_deleted(sender, instance, **kwargs):
+    chromosome = instance.chromosome
+    transaction.on_commit(lambda: variant_index.invalidate(chromosome))
+    response_cache.invalidate("variant", instance.pk)
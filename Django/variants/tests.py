@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from genes.models import Gene
+from genomics.fastpath import FastSerializer
+from genomics.response_cache import response_cache
+from jobs.invalidation import job_invalidations
+from .models import GeneticVariant
+
+
+def create_variants(count, offset=0):
+    genes = Gene.objects.bulk_create(
+        Gene(symbol=f"G{offset + i}", fullName="Gen", functionSummary="Función") for i in range(count)
+    )
+    GeneticVariant.objects.bulk_create(
+        GeneticVariant(gene=gene, chromosome="1", position=offset + i + 1,
+                       referenceBase="A", alternateBase="T", impact="HIGH")
+        for i, gene in enumerate(genes)
+    )
+
+
+@mock.patch.object(response_cache, "enabled", False)
+# Sin la consulta periódica de trabajos terminados, que alteraría los conteos
+@mock.patch.object(job_invalidations, "interval", float("inf"))
+class VariantListQueryCountTests(TestCase):
+    """Las consultas de un listado no crecen con las filas, por el camino rápido
+    (values + orjson) y por el serializer de DRF; ?expand=gene se resuelve con
+    select_related."""
+
+    def get(self, path, fast):
+        # Comprueba además por qué camino se respondió
+        with mock.patch.object(FastSerializer, "response", autospec=True,
+                               side_effect=FastSerializer.response) as fast_response:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(fast_response.called, fast)
+        return response
+
+    def assert_genes_expanded(self, items):
+        symbols = dict(GeneticVariant.objects.values_list("id", "gene__symbol"))
+        for item in items:
+            self.assertIsInstance(item["gene"], dict)
+            self.assertEqual(item["gene"]["symbol"], symbols[GeneticVariant._meta.pk.to_python(item["id"])])
+
+    def assert_constant_queries(self, path, fast, results=lambda body: body):
+        create_variants(2)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(path, fast)
+        self.assertEqual(len(results(response.json())), 2)
+
+        create_variants(40, offset=2)
+        with self.assertNumQueries(len(queries)):
+            response = self.get(path, fast)
+        items = results(response.json())
+        self.assertEqual(len(items), 42)
+        return items
+
+    def test_list_fast_path(self):
+        items = self.assert_constant_queries("/variants/", fast=True)
+        self.assertIsInstance(items[0]["gene"], int)
+
+    @override_settings(FAST_SERIALIZATION=False)
+    def test_list_serializer(self):
+        items = self.assert_constant_queries("/variants/", fast=False)
+        self.assertIsInstance(items[0]["gene"], int)
+
+    def test_list_expand_gene(self):
+        # El camino rápido solo admite serializers planos: con expand responde DRF
+        items = self.assert_constant_queries("/variants/?expand=gene", fast=False)
+        self.assert_genes_expanded(items)
+
+    def test_page_fast_path(self):
+        self.assert_constant_queries("/variants/?limit=100", fast=True, results=lambda body: body["results"])
+
+    def test_page_expand_gene(self):
+        items = self.assert_constant_queries(
+            "/variants/?expand=gene&limit=100", fast=False, results=lambda body: body["results"],
+        )
+        self.assert_genes_expanded(items)
@@ -0,0 +1,121 @@
+from django.db import connection, transaction
+
+from genomics.response_cache import response_cache
+from reports import rollup, summary
+from reports.models import PatientVariantReport
+from .dedupe import LOCUS_FIELDS
+from .intervals import variant_index
+from .models import GeneticVariant
+
+INSERTED = "inserted"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+
+def locus(variant):
+    return (variant.chromosome, variant.position, variant.referenceBase, variant.alternateBase)
+
+
+def upsert_chunk(variants):
+    """Inserta o actualiza (gen e impacto) un lote de variantes por su clave natural.
+
+    Una consulta para leer las existentes y una sentencia INSERT ... ON CONFLICT
+    (ON DUPLICATE KEY UPDATE en MySQL) para escribir las nuevas y las que
+    cambian. Si el lote repite un locus gana la última aparición. Devuelve, en
+    el orden recibido, (variante guardada, resultado) y los ids cuyo gen o
+    impacto cambió.
+    """
+    latest = {}
+    for variant in variants:
+        latest[locus(variant)] = variant
+
+    existing = {
+        locus(row): row
+        for row in GeneticVariant.objects.filter(
+            chromosome__in={key[0] for key in latest},
+            position__in={key[1] for key in latest},
+        ).only(*LOCUS_FIELDS, "gene_id", "impact")
+        if locus(row) in latest
+    }
+
+    outcomes, to_write, changed = {}, [], []
+    for key, variant in latest.items():
+        current = existing.get(key)
+        if current is None:
+            outcomes[key] = INSERTED
+            to_write.append(variant)
+            continue
+        # Se conserva el id existente para devolverlo y para que el upsert no lo cambie
+        variant.pk = current.pk
+        if (variant.gene_id, variant.impact) == (current.gene_id, current.impact):
+            outcomes[key] = UNCHANGED
+        else:
+            outcomes[key] = UPDATED
+            to_write.append(variant)
+            changed.append(current.pk)
+
+    if to_write:
+        options = {"update_conflicts": True, "update_fields": ["gene", "impact"]}
+        if connection.features.supports_update_conflicts_with_target:
+            options["unique_fields"] = LOCUS_FIELDS
+        GeneticVariant.objects.bulk_create(to_write, **options)
+        _reread_lost_inserts([variant for variant in to_write if outcomes[locus(variant)] == INSERTED],
+                             outcomes, changed)
+
+    return [(latest[locus(variant)], outcomes[locus(variant)]) for variant in variants], changed
+
+
+def _reread_lost_inserts(inserted, outcomes, changed):
+    # Otra transacción pudo insertar el mismo locus entre la lectura y el
+    # INSERT: el conflicto actualizó esa fila y el id generado aquí no se guardó
+    if not inserted:
+        return
+    keys = {locus(variant) for variant in inserted}
+    stored = {
+        locus(row): row.pk
+        for row in GeneticVariant.objects.filter(
+            chromosome__in={key[0] for key in keys},
+            position__in={key[1] for key in keys},
+        ).only(*LOCUS_FIELDS)
+        if locus(row) in keys
+    }
+    for variant in inserted:
+        key = locus(variant)
+        pk = stored.get(key)
+        if pk is not None and pk != variant.pk:
+            variant.pk = pk
+            outcomes[key] = UPDATED
+            # Se desconoce el gen e impacto que tenía: se tratan como cambiados
+            changed.append(pk)
+
+
+def upsert_variants(variants, batch_size=5000):
+    """Upsert idempotente por lotes (cada uno en su transacción): repetir la
+    misma carga no inserta filas nuevas ni escribe las que no cambiaron."""
+    results, changed = [], []
+    for start in range(0, len(variants), batch_size):
+        with transaction.atomic():
+            chunk_results, chunk_changed = upsert_chunk(variants[start:start + batch_size])
+        results += chunk_results
+        changed += chunk_changed
+    upserted(any(outcome != UNCHANGED for _, outcome in results), changed)
+    return results
+
+
+def upserted(written, changed):
+    # bulk_create no emite post_save: índice, caché de respuestas, resúmenes y conteo diario
+    if not written:
+        return
+    transaction.on_commit(variant_index.invalidate)
+    response_cache.invalidate("variant")
+    if changed:
+        # Los detalles de variantes actualizadas dependen de esta versión
+        response_cache.invalidate("variant-bulk")
+        patients, days = set(), set()
+        for start in range(0, len(changed), 1000):
+            reports = PatientVariantReport.objects.filter(variant_id__in=changed[start:start + 1000])
+            patients.update(reports.values_list("patientId", flat=True).distinct())
+            days.update(reports.values_list("detectionDate", flat=True).distinct())
+        if patients:
+            summary.rebuild(sorted(patients))
+            rollup.rebuild(days)
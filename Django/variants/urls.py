@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import VariantListCreateView, VariantDetailView
+from .views import (
+    VariantListCreateView, VariantDetailView, VariantRegionView, VariantImportView, VariantUpsertView,
+    VariantPurgeView,
+)
 
 urlpatterns = [
     path("", VariantListCreateView.as_view(), name="variant-list-create"),
+    path("region/", VariantRegionView.as_view(), name="variant-region"),
+    path("upsert/", VariantUpsertView.as_view(), name="variant-upsert"),
+    path("purge/", VariantPurgeView.as_view(), name="variant-purge"),
+    path("import/", VariantImportView.as_view(), name="variant-import"),
     path("<uuid:id>/", VariantDetailView.as_view(), name="variant-detail"),
 ]
@@ -0,0 +1,185 @@
+import functools
+import gzip
+import io
+import time
+import zlib
+
+from django.db import transaction
+
+from genes.registry import gene_registry
+from .models import GeneticVariant
+from .upsert import INSERTED, UPDATED, upsert_chunk, upserted
+
+GZIP_MAGIC = b"\x1f\x8b"
+MAX_BASES = GeneticVariant._meta.get_field("referenceBase").max_length
+MAX_CHROMOSOME = GeneticVariant._meta.get_field("chromosome").max_length
+MAX_IMPACT = GeneticVariant._meta.get_field("impact").max_length
+# Cantidad de líneas rechazadas que se devuelven como muestra en el resumen
+MAX_REJECTION_SAMPLES = 100
+
+
+class VcfError(Exception):
+    pass
+
+
+class ImportStats:
+    def __init__(self):
+        self.lines = 0
+        self.imported = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.rejected = 0
+        self.rejections = []
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def reject(self, lineno, reason):
+        self.rejected += 1
+        if len(self.rejections) < MAX_REJECTION_SAMPLES:
+            self.rejections.append({"line": lineno, "reason": reason})
+
+    @property
+    def processed(self):
+        return self.imported + self.updated + self.unchanged
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+
+    def as_dict(self):
+        return {
+            "lines": self.lines,
+            "imported": self.imported,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "rejected": self.rejected,
+            "seconds": round(self.elapsed, 3),
+            "rowsPerSecond": round(self.processed / self.elapsed, 1) if self.elapsed else None,
+            "rejections": self.rejections,
+        }
+
+
+def open_vcf(fileobj):
+    # Acepta VCF plano o comprimido con gzip/bgzip (bgzip es gzip multi-bloque)
+    magic = fileobj.read(2)
+    fileobj.seek(0)
+    if magic == GZIP_MAGIC:
+        fileobj = gzip.GzipFile(fileobj=fileobj)
+    return io.TextIOWrapper(fileobj, encoding="utf-8", errors="replace")
+
+
+def parse_info(info):
+    fields = {}
+    if info in ("", "."):
+        return fields
+    for item in info.split(";"):
+        key, _, value = item.partition("=")
+        fields[key] = value
+    return fields
+
+
+def gene_and_impact(info):
+    # snpEff: ANN=Allele|Annotation|Impact|Gene_Name|...
+    ann = info.get("ANN")
+    if ann:
+        parts = ann.split(",")[0].split("|")
+        if len(parts) > 3:
+            return parts[3], parts[2] or None
+    gene = info.get("GENE") or info.get("GENEINFO", "").split(":")[0] or None
+    return gene, info.get("IMPACT") or None
+
+
+def parse_vcf(lines, gene_id_for, stats, default_impact):
+    for lineno, line in enumerate(lines, start=1):
+        if line.startswith("#"):
+            continue
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+        stats.lines += 1
+
+        columns = line.split("\t")
+        if len(columns) < 8:
+            stats.reject(lineno, "Menos de 8 columnas")
+            continue
+        chrom, pos, _, ref, alts, _, _, info = columns[:8]
+
+        try:
+            position = int(pos)
+        except ValueError:
+            stats.reject(lineno, f"POS inválida: {pos}")
+            continue
+
+        symbol, impact = gene_and_impact(parse_info(info))
+        gene_id = gene_id_for(symbol) if symbol else None
+        if gene_id is None:
+            stats.reject(lineno, f"Gen desconocido: {symbol}")
+            continue
+
+        if len(ref) > MAX_BASES:
+            stats.reject(lineno, f"REF supera {MAX_BASES} bases")
+            continue
+
+        chromosome = chrom[3:] if chrom.lower().startswith("chr") else chrom
+        # En MySQL estricto un valor largo abortaría el lote entero
+        if not chromosome or len(chromosome) > MAX_CHROMOSOME:
+            stats.reject(lineno, f"CHROM inválido o de más de {MAX_CHROMOSOME} caracteres: {chrom}")
+            continue
+        impact = impact or default_impact
+        if len(impact) > MAX_IMPACT:
+            stats.reject(lineno, f"Impacto de más de {MAX_IMPACT} caracteres: {impact}")
+            continue
+
+        for alt in alts.split(","):
+            if alt in (".", "*") or alt.startswith("<") or len(alt) > MAX_BASES:
+                stats.reject(lineno, f"ALT no soportado: {alt}")
+                continue
+            yield GeneticVariant(
+                gene_id=gene_id,
+                chromosome=chromosome,
+                position=position,
+                referenceBase=ref,
+                alternateBase=alt,
+                impact=impact,
+            )
+
+
+def import_vcf(fileobj, batch_size=5000, default_impact="UNKNOWN", progress=None):
+    # progress(stats) se llama tras cada lote confirmado (lo usan los trabajos en segundo plano)
+    stats = ImportStats()
+    # Símbolos desde el registro en memoria; los desconocidos se consultan una sola vez
+    gene_id_for = functools.lru_cache(maxsize=None)(gene_registry.id_for)
+
+    changed = []
+
+    def flush(batch):
+        # Upsert por clave natural: reimportar el mismo archivo no duplica variantes
+        with transaction.atomic():
+            batch_results, batch_changed = upsert_chunk(batch)
+        for _, outcome in batch_results:
+            if outcome == INSERTED:
+                stats.imported += 1
+            elif outcome == UPDATED:
+                stats.updated += 1
+            else:
+                stats.unchanged += 1
+        changed.extend(batch_changed)
+        if progress is not None:
+            progress(stats)
+
+    batch = []
+    try:
+        for variant in parse_vcf(open_vcf(fileobj), gene_id_for, stats, default_impact):
+            batch.append(variant)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    except (gzip.BadGzipFile, EOFError, zlib.error) as exc:
+        # Los lotes ya confirmados quedan importados
+        raise VcfError(f"Archivo gzip inválido o truncado: {exc}") from exc
+    finally:
+        # También si se interrumpe (cancelación): los lotes confirmados quedan
+        upserted(stats.imported + stats.updated > 0, changed)
+    stats.finish()
+    return stats
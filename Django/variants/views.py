@@ -2,32 +2,93 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from .models import GeneticVariant
-from .serializers import VariantSerializer
-from .dtos import VariantDTO
+from .serializers import (
+    VARIANT_EXPANSIONS,
+    VARIANT_FILTERS,
+    VARIANT_ORDERINGS,
+    VariantSerializer,
+    variant_queryset_and_serializer,
+)
+from .dtos import VariantDTO, VariantBulkDTO, VariantBulkItemDTO, VariantPurgeDTO, RegionQueryDTO
+from .intervals import variant_index
+from .upsert import INSERTED, upsert_variants
+from .vcf import VcfError, import_vcf
 from genes.models import Gene
+from genes.registry import gene_registry
+from genomics.expand import ExpandError, expand_parameter, parse_expand
+from genomics.fastpath import fast_serializer_for
+from genomics.filtering import filter_parameters, ordering_parameter
+from genomics.pagination import LIST_PARAMETERS, list_response
+from genomics.renderers import EXPORT_RENDERERS
+from genomics.response_cache import cached_response
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from jobs.views import accepted_response
+from reports.purge import purge_variants, variant_purge_size
 
 from drf_spectacular.utils import (
     extend_schema,
+    OpenApiParameter,
     OpenApiRequest,
     OpenApiResponse,
     OpenApiExample,
 )
 
+
+def save_variant(serializer):
+    """Guarda la variante. Devuelve False si el gen ya no existe: el registro de
+    este proceso puede seguir viendo un gen borrado en otro worker."""
+    try:
+        with transaction.atomic():
+            serializer.save()
+    except IntegrityError:
+        gene_id = serializer.validated_data["gene"].pk
+        if Gene.objects.filter(pk=gene_id).exists():
+            raise
+        gene_registry.forget(gene_id)
+        return False
+    return True
+
+
 class VariantListCreateView(APIView):
+    renderer_classes = EXPORT_RENDERERS
+
     @extend_schema(
         summary="Listar variantes genéticas",
+        description="Admite filtros, orden (ordering), proyección de campos (fields), "
+                    "paginación por cursor (limit/cursor) y streaming (stream). "
+                    "Con Accept application/msgpack responde en MessagePack (los UUID como "
+                    "extensión tipo 1 con sus 16 bytes, decimales y fechas como texto) y con "
+                    "application/vnd.apache.arrow.stream (o ?format=arrow) exporta la "
+                    "tabla completa (filtrada) como stream Arrow IPC columnar; Arrow no "
+                    "admite expand, stream ni limit/cursor (responde 400).",
+        parameters=LIST_PARAMETERS + filter_parameters(VARIANT_FILTERS) + [
+            ordering_parameter(VARIANT_ORDERINGS),
+            expand_parameter(VARIANT_EXPANSIONS),
+        ],
         responses=OpenApiResponse(VariantSerializer(many=True)),
     )
+    # Con expand=gene la respuesta incluye datos del gen
+    @cached_response("variant", depends=["gene"])
     def get(self, request):
-        variants = GeneticVariant.objects.all()
-        serializer = VariantSerializer(variants, many=True)
-        return Response(serializer.data)
+        try:
+            expand = parse_expand(request, VARIANT_EXPANSIONS)
+        except ExpandError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        queryset, serializer_class = variant_queryset_and_serializer(GeneticVariant.objects.all(), expand)
+        return list_response(request, queryset, serializer_class, VARIANT_FILTERS, VARIANT_ORDERINGS)
 
     @extend_schema(
         summary="Crear variante genética",
         description="Crea una variante usando VariantDTO. "
-                    "El campo geneId debe corresponder a un gen existente.",
+                    "El campo geneId debe corresponder a un gen existente. "
+                    "(chromosome, position, referenceBase, alternateBase) es único: "
+                    "para cargas repetibles use /variants/upsert/.",
         request=OpenApiRequest(VariantDTO),
         responses={
             201: VariantSerializer,
@@ -54,40 +115,58 @@ class VariantListCreateView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            gene = Gene.objects.get(id=dto.geneId)
-        except Gene.DoesNotExist:
+        if not gene_registry.exists(dto.geneId):
             return Response({"error": "Gen no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
         data = dto.dict()
-        data["gene"] = gene.id
+        data["gene"] = dto.geneId
 
         serializer = VariantSerializer(data=data)
         if serializer.is_valid():
-            serializer.save()
+            if not save_variant(serializer):
+                return Response({"error": "Gen no encontrado"}, status=status.HTTP_404_NOT_FOUND)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class VariantDetailView(APIView):
-    def get_object(self, id):
+    def get_object(self, id, queryset=None):
+        if queryset is None:
+            queryset = GeneticVariant.objects.all()
         try:
-            return GeneticVariant.objects.get(id=id)
+            return queryset.get(id=id)
         except GeneticVariant.DoesNotExist:
             return None
 
     @extend_schema(
         summary="Obtener variante por ID",
+        parameters=[expand_parameter(VARIANT_EXPANSIONS)],
         responses={
             200: VariantSerializer,
+            400: OpenApiResponse(description="Parámetro expand inválido"),
             404: OpenApiResponse(description="Variante no encontrada"),
         }
     )
+    # variant-bulk cambia cuando un upsert masivo actualiza variantes existentes
+    @cached_response("variant", object_kwarg="id", depends=["gene", "variant-bulk"])
     def get(self, request, id):
-        variant = self.get_object(id)
+        try:
+            expand = parse_expand(request, VARIANT_EXPANSIONS)
+        except ExpandError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        queryset, serializer_class = variant_queryset_and_serializer(GeneticVariant.objects.all(), expand)
+
+        fast = fast_serializer_for(request, serializer_class)
+        if fast is not None:
+            row = fast.get(queryset.filter(id=id))
+            if row is None:
+                return Response({"error": "Variante no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+            return fast.response(row)
+
+        variant = self.get_object(id, queryset)
         if variant is None:
             return Response({"error": "Variante no encontrada"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = VariantSerializer(variant)
+        serializer = serializer_class(variant)
         return Response(serializer.data)
 
     @extend_schema(
@@ -109,27 +188,231 @@ class VariantDetailView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            gene = Gene.objects.get(id=dto.geneId)
-        except Gene.DoesNotExist:
+        if not gene_registry.exists(dto.geneId):
             return Response({"error": "Gen no encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
         data = dto.dict()
-        data["gene"] = gene.id
+        data["gene"] = dto.geneId
 
         serializer = VariantSerializer(variant, data=data)
         if serializer.is_valid():
-            serializer.save()
+            if not save_variant(serializer):
+                return Response({"error": "Gen no encontrado"}, status=status.HTTP_404_NOT_FOUND)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @extend_schema(
         summary="Eliminar variante genética",
-        responses={204: OpenApiResponse(description="Variante eliminada")}
+        description="Borra la variante y sus reportes por lotes SQL. Si entre la variante y "
+                    "sus reportes pasan de PURGE_SYNC_LIMIT filas, el borrado se encola como "
+                    "POST /variants/purge/ y se responde 202 con el trabajo.",
+        responses={
+            202: OpenApiResponse(JobSerializer, description="Variante con muchos reportes: borrado en cola"),
+            204: OpenApiResponse(description="Variante eliminada"),
+            404: OpenApiResponse(description="Variante no encontrada"),
+        }
     )
     def delete(self, request, id):
-        variant = self.get_object(id)
-        if variant is None:
+        if not GeneticVariant.objects.filter(id=id).exists():
+            return Response({"error": "Variante no encontrada"}, status=status.HTTP_404_NOT_FOUND)
+        if variant_purge_size([id], settings.PURGE_SYNC_LIMIT + 1) > settings.PURGE_SYNC_LIMIT:
+            return accepted_response(enqueue("variants.purge", {"variant_ids": [str(id)]}))
+        if not purge_variants([id])["variants"]:
             return Response({"error": "Variante no encontrada"}, status=status.HTTP_404_NOT_FOUND)
-        variant.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class VariantPurgeView(APIView):
+    @extend_schema(
+        summary="Purgar variantes en segundo plano",
+        description="Encola el borrado de las variantes indicadas y de sus reportes, en lotes "
+                    "de PURGE_CHUNK_SIZE con una transacción por lote. El progreso se consulta "
+                    "en /jobs/{id}/.",
+        request=OpenApiRequest(VariantPurgeDTO),
+        responses={
+            202: OpenApiResponse(JobSerializer, description="Trabajo en cola"),
+            400: OpenApiResponse(description="Lista de IDs inválida"),
+        }
+    )
+    def post(self, request):
+        try:
+            dto = VariantPurgeDTO(**request.data)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return accepted_response(enqueue("variants.purge", {"variant_ids": [str(pk) for pk in dto.ids]}))
+
+
+class VariantUpsertView(APIView):
+    @extend_schema(
+        summary="Crear o actualizar variantes en lote",
+        request=OpenApiRequest(VariantBulkDTO),
+        description="Recibe una lista de VariantDTO (el gen por geneId o por geneSymbol) e "
+                    "inserta o actualiza (gen e impacto) "
+                    "cada variante según su clave natural (chromosome, position, "
+                    "referenceBase, alternateBase). Es idempotente: reenviar el mismo lote "
+                    "no crea duplicados. Cada lote de escritura cuesta una consulta de "
+                    "lectura y un único INSERT ... ON CONFLICT. Devuelve el resultado de "
+                    "cada elemento en el mismo orden (201 creada, 200 actualizada o sin "
+                    "cambios).",
+        parameters=[
+            OpenApiParameter("batchSize", int, description="Filas por lote de escritura"),
+        ],
+        responses={
+            200: OpenApiResponse(description="Todas las variantes fueron guardadas"),
+            207: OpenApiResponse(description="Algunas variantes fallaron; ver results"),
+            400: OpenApiResponse(description="El cuerpo no es una lista válida"),
+        },
+    )
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"error": "Se esperaba una lista de variantes"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.VARIANT_UPSERT_MAX_ITEMS:
+            return Response(
+                {"error": f"Máximo {settings.VARIANT_UPSERT_MAX_ITEMS} variantes por lote"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            batch_size = int(request.query_params.get("batchSize", settings.VCF_IMPORT_BATCH_SIZE))
+        except ValueError:
+            return Response({"error": "batchSize debe ser un entero"}, status=status.HTTP_400_BAD_REQUEST)
+        if batch_size < 1:
+            return Response({"error": "batchSize debe ser mayor que 0"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                dto = VariantBulkItemDTO(**item)
+            except Exception as e:
+                results[index] = {"index": index, "status": 400, "error": str(e)}
+                continue
+            gene_id = dto.geneId if dto.geneId is not None else gene_registry.id_for(dto.geneSymbol)
+            if gene_id is None:
+                results[index] = {"index": index, "status": 404, "error": "Gen no encontrado"}
+                continue
+            variant = GeneticVariant(gene_id=gene_id, **dto.dict(exclude={"geneId", "geneSymbol"}))
+            try:
+                # Sin consultas: el gen se valida abajo en bloque y la unicidad
+                # del locus se resuelve con el upsert
+                variant.full_clean(exclude=["gene"], validate_unique=False, validate_constraints=False)
+            except ValidationError as e:
+                results[index] = {"index": index, "status": 400, "error": e.message_dict}
+                continue
+            valid.append((index, variant))
+
+        gene_ids = gene_registry.existing({variant.gene_id for _, variant in valid})
+        pending = []
+        for index, variant in valid:
+            if variant.gene_id in gene_ids:
+                pending.append((index, variant))
+            else:
+                results[index] = {"index": index, "status": 404, "error": "Gen no encontrado"}
+
+        saved = upsert_variants([variant for _, variant in pending], batch_size)
+        counts = {}
+        for (index, _), (variant, outcome) in zip(pending, saved):
+            counts[outcome] = counts.get(outcome, 0) + 1
+            results[index] = {
+                "index": index,
+                "status": 201 if outcome == INSERTED else 200,
+                "result": outcome,
+                "data": VariantSerializer(variant).data,
+            }
+
+        failed = len(items) - len(pending)
+        return Response(
+            {**{name: counts.get(name, 0) for name in ("inserted", "updated", "unchanged")},
+             "failed": failed, "results": results},
+            status=status.HTTP_200_OK if not failed else status.HTTP_207_MULTI_STATUS,
+        )
+
+
+class VariantRegionView(APIView):
+    # Tamaño de los lotes id__in al recuperar las variantes encontradas
+    FETCH_CHUNK_SIZE = 500
+
+    @extend_schema(
+        summary="Consultar variantes por región genómica",
+        description="Retorna las variantes que solapan el intervalo [start, end] "
+                    "del cromosoma indicado, ordenadas por posición.",
+        parameters=[
+            OpenApiParameter("chrom", str, required=True, description="Cromosoma, p. ej. 7"),
+            OpenApiParameter("start", int, required=True, description="Posición inicial (1-based)"),
+            OpenApiParameter("end", int, required=True, description="Posición final, inclusiva"),
+        ],
+        responses={
+            200: VariantSerializer(many=True),
+            400: OpenApiResponse(description="Parámetros inválidos"),
+        }
+    )
+    def get(self, request):
+        try:
+            dto = RegionQueryDTO(**request.query_params.dict())
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = variant_index.overlapping(dto.chrom, dto.start, dto.end)
+        variants = []
+        for i in range(0, len(ids), self.FETCH_CHUNK_SIZE):
+            chunk = ids[i:i + self.FETCH_CHUNK_SIZE]
+            found = GeneticVariant.objects.in_bulk(chunk)
+            variants.extend(found[pk] for pk in chunk if pk in found)
+
+        serializer = VariantSerializer(variants, many=True)
+        return Response(serializer.data)
+
+
+class VariantImportView(APIView):
+    parser_classes = [MultiPartParser]
+
+    @extend_schema(
+        summary="Importar variantes desde VCF",
+        description="Carga masiva de un archivo VCF (plano o bgzip) en el campo `file`. "
+                    "Los genes se resuelven por símbolo (INFO ANN, GENE o GENEINFO) y "
+                    "las líneas no válidas se rechazan sin detener la carga.",
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            }
+        },
+        parameters=[
+            OpenApiParameter("batchSize", int, description="Filas por lote de inserción"),
+            OpenApiParameter("defaultImpact", str, description="Impacto si el INFO no lo informa"),
+            OpenApiParameter("async", bool, description="Importar en segundo plano; responde "
+                                                       "202 con el trabajo (ver /jobs/)"),
+        ],
+        responses={
+            201: OpenApiResponse(description="Resumen de la importación"),
+            202: OpenApiResponse(JobSerializer, description="Trabajo en cola"),
+            400: OpenApiResponse(description="Archivo o parámetros inválidos"),
+        }
+    )
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Debe enviar el archivo en el campo 'file'"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            batch_size = int(request.query_params.get("batchSize", settings.VCF_IMPORT_BATCH_SIZE))
+        except ValueError:
+            return Response({"error": "batchSize debe ser un entero"}, status=status.HTTP_400_BAD_REQUEST)
+        if batch_size < 1:
+            return Response({"error": "batchSize debe ser mayor que 0"}, status=status.HTTP_400_BAD_REQUEST)
+
+        default_impact = request.query_params.get("defaultImpact", "UNKNOWN")
+        if request.query_params.get("async", "").lower() in ("1", "true"):
+            job = enqueue(
+                "variants.import_vcf",
+                {"batch_size": batch_size, "default_impact": default_impact},
+                files={"input.vcf": upload},
+            )
+            return accepted_response(job)
+
+        try:
+            stats = import_vcf(upload.file, batch_size, default_impact)
+        except VcfError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(stats.as_dict(), status=status.HTTP_201_CREATED)